@@ -1,38 +1,17 @@
 import streamlit as st
 import asyncio
-import os
 from dotenv import load_dotenv
-import json
 import uuid
 
 from agent import HealthPlannerAgent
 from context import UserSessionContext
+from guardrails.response_pipeline import history_turn, render_turn
+from storage.session_cache import SessionCache
+from storage.write_pipeline import SessionWriter
 
 # Load environment variables (e.g., GEMINI_API_KEY)
 load_dotenv()
 
-SESSION_DIR = "sessions"
-os.makedirs(SESSION_DIR, exist_ok=True)
-
-def save_session_context(session_id: str, ctx: UserSessionContext):
-    """Saves the UserSessionContext to a JSON file."""
-    file_path = os.path.join(SESSION_DIR, f"{session_id}.json")
-    with open(file_path, "w") as f:
-        json.dump(ctx.model_dump(), f, indent=4)
-
-def load_session_context(session_id: str) -> UserSessionContext:
-    """Loads the UserSessionContext from a JSON file, or creates a new one if not found."""
-    file_path = os.path.join(SESSION_DIR, f"{session_id}.json")
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-                return UserSessionContext(**data)
-        except (json.JSONDecodeError, TypeError):
-            # If file is corrupted or not a valid context, create a new one
-            return UserSessionContext(uid=session_id)
-    return UserSessionContext(uid=session_id) # Create new if not found, use existing session_id
-
 # Set Streamlit page configuration
 st.set_page_config(page_title="Health & Wellness Assistant", page_icon="🏋️‍♀️", layout="wide")
 
@@ -107,11 +86,19 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# Process-wide session cache: hot sessions stay in memory and a background writer persists them,
+# so saving a turn never waits on the disk
+@st.cache_resource
+def get_session_cache():
+    return SessionCache(writer=SessionWriter()).start()
+
+session_cache = get_session_cache()
+
 # Initialize user session context
 if "user_context" not in st.session_state:
     if "session_id" not in st.session_state:
         st.session_state.session_id = str(uuid.uuid4())
-    st.session_state.user_context = load_session_context(st.session_state.session_id)
+    st.session_state.user_context = session_cache.get(st.session_state.session_id)
 
 # Sidebar
 with st.sidebar:
@@ -121,7 +108,7 @@ with st.sidebar:
         # Clear the chat history
         st.session_state.user_context.chat_history = []
         # Save the cleared context to make it persistent
-        save_session_context(st.session_state.session_id, st.session_state.user_context)
+        session_cache.put(st.session_state.session_id, st.session_state.user_context)
         # Rerun the app to update the UI
         st.rerun()
 
@@ -161,7 +148,7 @@ st.warning("🚨 **Disclaimer:** I am an AI assistant and cannot provide medical
 # Display chat history from the context
 for message in st.session_state.user_context.chat_history:
     with st.chat_message(message["role"]):
-        st.markdown(message["content"])
+        st.markdown(render_turn(message))
 
 # User input
 if user_query := st.chat_input("How can I help you today?"):
@@ -180,10 +167,11 @@ if user_query := st.chat_input("How can I help you today?"):
             st.markdown(agent_response)
             
             # Add agent response to chat history in context
-            st.session_state.user_context.chat_history.append({"role": "assistant", "content": agent_response})
+            # Stored without the disclaimer text; render_turn adds it back when the history is shown.
+            st.session_state.user_context.chat_history.append(history_turn(response_dict))
             
             # Save the updated session context after each interaction
-            save_session_context(st.session_state.session_id, st.session_state.user_context)
+            session_cache.put(st.session_state.session_id, st.session_state.user_context)
 
         # Optionally display structured data if available
 
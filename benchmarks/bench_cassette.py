@@ -0,0 +1,65 @@
+# benchmarks/bench_cassette.py
+"""
+Full `HealthPlannerAgent.run` turns recorded against the mock model server,
+then replayed from the cassette with no server: as fast as possible, and
+paced with the recorded latencies.
+
+Run with: python -m benchmarks.bench_cassette [latency_s]
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+from llm.cassette import RECORD, REPLAY, CassetteModel
+from llm.mock_server import MockModelServer
+
+TURNS = [
+    "hello",
+    "what is a calorie?",
+    "i drank 500ml of water",
+    "why is sleep important?",
+]
+
+
+async def _turns_ms(model: Any) -> float:
+    from agent import HealthPlannerAgent
+    from context import UserSessionContext
+    from llm.model_router import ModelRouter
+
+    agent = HealthPlannerAgent()
+    agent.models = ModelRouter.single(model)
+    ctx = UserSessionContext(name="bench", uid="bench")
+    started = time.perf_counter()
+    for text in TURNS:
+        await agent.run(text, ctx)
+    return (time.perf_counter() - started) * 1000 / len(TURNS)
+
+
+def run(latency: float = 0.1) -> Dict[str, float]:
+    from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "turns.jsonl.gz")
+        with MockModelServer(latency=latency) as server:
+            client = AsyncOpenAI(api_key="mock-key", base_url=server.base_url)
+            live = OpenAIChatCompletionsModel(model="mock-model", openai_client=client)
+            recorded_ms = asyncio.run(_turns_ms(CassetteModel(path, live, mode=RECORD)))
+            calls = server.request_count
+        replay_ms = asyncio.run(_turns_ms(CassetteModel(path, mode=REPLAY)))
+        paced_ms = asyncio.run(_turns_ms(CassetteModel(path, mode=REPLAY, latency_scale=1.0)))
+        cassette_bytes = os.path.getsize(path)
+    return {
+        "model_calls": float(calls),
+        "cassette_bytes": float(cassette_bytes),
+        "turn_ms[recorded]": recorded_ms,
+        "turn_ms[replay]": replay_ms,
+        "turn_ms[replay_paced]": paced_ms,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(*(float(arg) for arg in sys.argv[1:])), indent=4))
@@ -0,0 +1,55 @@
+# benchmarks/bench_checkin_batch.py
+"""
+Throughput of the proactive check-in batch job against the local mock model server.
+
+Run with: python -m benchmarks.bench_checkin_batch [n_users] [latency_s]
+"""
+import asyncio
+import json
+import sys
+import tempfile
+from typing import Dict
+
+from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+
+from context import UserSessionContext
+from llm.mock_server import MockModelServer
+from scheduling.checkin_messages import CheckinBatchJob
+from scheduling.engine import CheckinScheduler
+from scheduling.timer_store import TimerStore
+from storage.session_store import save_session_contexts
+
+GOALS = ["Weight Loss", "Muscle Gain", "Improve Fitness", "General Health", "Increase Biceps Size"]
+
+
+def run(n_users: int = 2000, latency: float = 0.2) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as session_dir, MockModelServer(latency=latency) as server:
+        scheduler = CheckinScheduler(TimerStore(), clock=lambda: 1000.0)
+        contexts = []
+        for i in range(n_users):
+            uid = f"user-{i}"
+            contexts.append(UserSessionContext(uid=uid, name=f"User {i}", goal={"name": GOALS[i % len(GOALS)]}))
+            scheduler.schedule(uid, cadence="weekly", start_at=float(i % 1000))
+        save_session_contexts(contexts, session_dir)
+
+        model = OpenAIChatCompletionsModel(
+            model="mock-model",
+            openai_client=AsyncOpenAI(api_key="mock", base_url=server.base_url),
+        )
+        result = asyncio.run(CheckinBatchJob(model, scheduler, session_dir=session_dir).run())
+        return {
+            "n_users": n_users,
+            "latency_s": latency,
+            "groups": result["groups"],
+            "model_calls": server.request_count,
+            "elapsed_s": result["elapsed_s"],
+            "users_per_s": result["users_per_s"],
+            # One call per user at the same latency, fully serialized, as in agent.py today.
+            "per_user_call_users_per_s": 1.0 / latency if latency else float("inf"),
+        }
+
+
+if __name__ == "__main__":
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    print(json.dumps(run(n_users, latency), indent=4))
@@ -0,0 +1,67 @@
+# benchmarks/bench_energy.py
+"""
+Calorie and macro targets for a user population: parsed-goal normalization,
+the vectorized energy-balance math, and a per-user loop for comparison.
+
+Run with: python -m benchmarks.bench_energy [n_users]
+"""
+import json
+import sys
+import time
+from typing import Dict
+
+import numpy as np
+
+from nutrition.energy import UserStats, compute_targets, targets_for_goal, targets_for_goals
+
+_ACTIONS = ["lose", "gain", "maintain", "increase"]
+_UNITS = ["kg", "pounds", "lbs", "fitness_level"]
+_DURATIONS = ["weeks", "months", "days", None]
+
+
+def _population(n: int):
+    goals = [
+        {
+            "action": _ACTIONS[i % 4],
+            "quantity": (i % 15) + 1,
+            "unit": _UNITS[(i // 4) % 4],
+            "duration_value": (i % 6) + 1,
+            "duration_unit": _DURATIONS[(i // 16) % 4],
+        }
+        for i in range(n)
+    ]
+    stats = [UserStats(55 + i % 50, 150 + i % 45, 18 + i % 50, ("male", "female")[i % 2]) for i in range(n)]
+    return goals, stats
+
+
+def run(n_users: int = 100_000) -> Dict[str, float]:
+    results = {"n_users": n_users}
+    goals, stats = _population(n_users)
+
+    start = time.perf_counter()
+    batch = targets_for_goals(goals, stats)
+    results["batch_with_parsing_s"] = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    arrays = (
+        rng.integers(0, 3, n_users), rng.uniform(1, 10, n_users), rng.uniform(30, 180, n_users),
+        rng.uniform(50, 110, n_users), rng.uniform(150, 200, n_users), rng.uniform(18, 70, n_users),
+        np.full(n_users, -78.0), np.full(n_users, 1.55), np.full(n_users, 1350.0),
+    )
+    start = time.perf_counter()
+    compute_targets(*arrays)
+    results["vectorized_math_s"] = time.perf_counter() - start
+
+    sample = min(n_users, 5_000)
+    start = time.perf_counter()
+    for goal, user in zip(goals[:sample], stats[:sample]):
+        targets_for_goal(goal, user)
+    results["per_user_loop_s_extrapolated"] = (time.perf_counter() - start) / sample * n_users
+    results["users_per_s_batch"] = n_users / results["batch_with_parsing_s"]
+    results["mean_calories"] = float(batch[:, 0].mean())
+    return results
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(json.dumps(run(n), indent=2))
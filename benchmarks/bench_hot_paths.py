@@ -0,0 +1,166 @@
+# benchmarks/bench_hot_paths.py
+"""
+Per-turn hot paths of the agent, each timed as the best of several repeats:
+guardrail screening and post-processing, session save/load, history
+assembly, parsing of model-written meal and workout plans, the string
+assembly of `_generate_meal_plan`/`_generate_workout_plan`, and a full
+`HealthPlannerAgent.run` turn replayed from a cassette recorded against the
+mock model server.
+
+Run with: python -m benchmarks.bench_hot_paths
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+import timeit
+from types import SimpleNamespace
+from typing import Any, Callable, Dict
+
+from agent import HealthPlannerAgent
+from context import UserSessionContext, build_model_input
+from guardrails.guardrail_manager import GuardrailManager
+from llm.cassette import RECORD, REPLAY, CassetteModel
+from llm.mock_server import MockModelServer
+from llm.model_router import ModelRouter
+from storage.session_store import load_session_context, save_session_context
+
+GOAL = {"name": "Weight Loss", "action": "lose", "quantity": 5, "unit": "kg", "duration": "3 months"}
+QUERIES = [
+    "what is a calorie?",
+    "give me a workout plan for my legs",
+    "i think i broke my arm, what should i do",
+    "give advise on investing the money in bank",
+    "can you diagnose my chest pain",
+]
+TURNS = ["hello", "give me a workout plan", "give meal plan", "i drank 500ml of water", "i hurt my knee"]
+MEAL_TEXT = "\n".join(
+    f"day_{day}:\nBreakfast: oats with berries\nLunch: chicken salad\nDinner: salmon and rice\nSnack: yogurt"
+    for day in range(1, 8)
+)
+WORKOUT_TEXT = "\n".join(f"Day {day}: 3x10 squats, 3x10 push-ups, 20 min walk" for day in range(1, 8))
+_GUARDRAILS = GuardrailManager()
+
+
+def _best_us(fn: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def _session(turns: int = 40) -> UserSessionContext:
+    ctx = UserSessionContext(name="bench", uid="bench", goal=GOAL)
+    for i in range(turns):
+        ctx.chat_history.append({"role": "user", "content": f"question {i} about my training and meals"})
+        ctx.chat_history.append({"role": "assistant", "content": "A detailed answer about training. " * 8})
+    return ctx
+
+
+class _StubTool:
+    def __init__(self, name: str, result: Dict[str, Any]):
+        self.name = name
+        self.result = result
+
+    async def run(self, *args, **kwargs) -> Dict[str, Any]:
+        return self.result
+
+
+class _TextModel:
+    """Returns fixed text through both the `get_response` and the legacy `chat` shape."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    async def get_response(self, *args, **kwargs) -> Any:
+        return SimpleNamespace(output=[SimpleNamespace(content=[SimpleNamespace(text=self.text)])])
+
+    async def chat(self, *args, **kwargs) -> Any:
+        return SimpleNamespace(output_text=self.text)
+
+
+def _async_us(loop: asyncio.AbstractEventLoop, make: Callable[[], Any], number: int) -> float:
+    return _best_us(lambda: loop.run_until_complete(make()), number)
+
+
+async def _rendered(generate: Any) -> str:
+    # Assembly plus the one render the user sees, as `HealthPlannerAgent.run` does it.
+    result = await generate
+    return _GUARDRAILS.finalize(result["response"]).render()
+
+
+def _parsing_and_assembly(results: Dict[str, float]) -> None:
+    from nutrition.energy import targets_for_goal
+    from tools.meal_planner import MealPlannerTool
+    from tools.workout_recommender import WorkoutRecommenderTool
+
+    loop = asyncio.new_event_loop()
+    try:
+        meal_tool, workout_tool = MealPlannerTool(), WorkoutRecommenderTool()
+        targets = targets_for_goal(GOAL)
+        results["meal_parse_us"] = _async_us(
+            loop, lambda: meal_tool._generate_with_model(_TextModel(MEAL_TEXT), "none", GOAL, targets), 200)
+        results["workout_parse_us"] = _async_us(
+            loop, lambda: workout_tool._generate_with_model(_TextModel(WORKOUT_TEXT), "beginner", GOAL), 200)
+
+        meal_plan = asyncio.run(meal_tool._generate_with_model(_TextModel(MEAL_TEXT), "none", GOAL, targets))
+        agent = HealthPlannerAgent()
+        agent.models = ModelRouter.single(_TextModel(""))
+        agent.tools["meal_planner"] = _StubTool("meal_planner", meal_plan)
+        agent.tools["workout_recommender"] = _StubTool(
+            "workout_recommender", {"ok": True, "workout_plan": WORKOUT_TEXT.split("\n")})
+        ctx = _session()
+        results["meal_response_us"] = _async_us(loop, lambda: _rendered(agent._generate_meal_plan(ctx, "")), 200)
+        results["workout_response_us"] = _async_us(
+            loop, lambda: _rendered(agent._generate_workout_plan(ctx, "")), 200)
+    finally:
+        loop.close()
+
+
+async def _replay_turns(agent: HealthPlannerAgent) -> None:
+    # A fresh session each round, so every round sends the requests that were recorded.
+    ctx = UserSessionContext(name="bench", uid="bench", goal=dict(GOAL))
+    for text in TURNS:
+        await agent.run(text, ctx)
+
+
+def _agent_turn(results: Dict[str, float], rounds: int) -> None:
+    from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "turns.jsonl.gz")
+        with MockModelServer() as server:
+            client = AsyncOpenAI(api_key="mock-key", base_url=server.base_url)
+            live = OpenAIChatCompletionsModel(model="mock-model", openai_client=client)
+            agent = HealthPlannerAgent()
+            agent.models = ModelRouter.single(CassetteModel(path, live, mode=RECORD))
+            asyncio.run(_replay_turns(agent))
+
+        agent.models = ModelRouter.single(CassetteModel(path, mode=REPLAY))
+        best = float("inf")
+        for _ in range(rounds):
+            started = time.perf_counter()
+            asyncio.run(_replay_turns(agent))
+            best = min(best, time.perf_counter() - started)
+    results["agent_turn_ms"] = best * 1000 / len(TURNS)
+
+
+def run(rounds: int = 5) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    guardrails = _GUARDRAILS
+    results["guardrail_screen_us"] = _best_us(
+        lambda: [guardrails.pre_process_query(query) for query in QUERIES], 400) / len(QUERIES)
+    results["guardrail_post_process_us"] = _best_us(
+        lambda: guardrails.post_process_response("Here is your plan."), 20000)
+
+    ctx = _session()
+    results["history_assembly_us"] = _best_us(lambda: build_model_input(ctx, "what next?"), 2000)
+    with tempfile.TemporaryDirectory() as session_dir:
+        results["session_save_ms"] = _best_us(lambda: save_session_context("bench", ctx, session_dir), 50) / 1000
+        results["session_load_ms"] = _best_us(lambda: load_session_context("bench", session_dir), 50) / 1000
+
+    _parsing_and_assembly(results)
+    _agent_turn(results, rounds)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
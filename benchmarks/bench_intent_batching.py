@@ -0,0 +1,75 @@
+# benchmarks/bench_intent_batching.py
+"""
+Throughput versus latency of intent classification with micro-batching.
+
+Queries arrive at a fixed rate from many users at once and are classified
+through `IntentBatcher` against the mock model server, which answers each
+request after a fixed provider latency. Each batch size and wait setting
+reports classifications per second, p50/p99 latency per classification and
+the number of model requests. With batch=1 every query is a request of its
+own, as before batching.
+
+Run with: python -m benchmarks.bench_intent_batching [queries] [arrivals_per_s] [latency_s]
+"""
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from llm.intent_batcher import IntentBatcher
+from llm.mock_server import MockModelServer
+
+# (max_batch, max_wait_ms) settings compared.
+SETTINGS: List[Tuple[int, float]] = [(1, 0.0), (8, 2.0), (8, 10.0), (32, 10.0), (32, 25.0)]
+QUERIES = [
+    "i drank 500ml of water", "give me a meal plan", "suggest some exercises", "i hurt my knee",
+    "what is a calorie?", "my goal is to lose weight", "tell me a joke about cars",
+]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def _load(batcher: IntentBatcher, queries: int, arrivals_per_s: float) -> Tuple[float, List[float]]:
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        messages = [{"role": "user", "content": f"{QUERIES[i % len(QUERIES)]} ({i})"}]
+        started = time.perf_counter()
+        await batcher.classify(messages)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    tasks = []
+    for i in range(queries):
+        tasks.append(asyncio.create_task(one(i)))
+        await asyncio.sleep(1 / arrivals_per_s)
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - started, latencies
+
+
+def run(queries: int = 300, arrivals_per_s: float = 600.0, latency: float = 0.05) -> Dict[str, float]:
+    from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+
+    results: Dict[str, float] = {}
+    with MockModelServer(latency=latency) as server:
+        for max_batch, max_wait_ms in SETTINGS:
+            model: Any = OpenAIChatCompletionsModel(
+                model="mock-model", openai_client=AsyncOpenAI(api_key="mock", base_url=server.base_url))
+            batcher = IntentBatcher(lambda: model, max_batch=max_batch, max_wait_ms=max_wait_ms)
+            before = server.request_count
+            elapsed, latencies = asyncio.run(_load(batcher, queries, arrivals_per_s))
+            label = f"batch={max_batch},wait={max_wait_ms:g}"
+            results[f"classifications_per_s[{label}]"] = queries / elapsed
+            results[f"latency_ms_p50[{label}]"] = _percentile(latencies, 0.5)
+            results[f"latency_ms_p99[{label}]"] = _percentile(latencies, 0.99)
+            results[f"model_calls[{label}]"] = float(server.request_count - before)
+            results[f"fallbacks[{label}]"] = float(batcher.fallbacks)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(*(float(arg) for arg in sys.argv[1:])), indent=4))
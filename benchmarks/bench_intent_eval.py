@@ -0,0 +1,191 @@
+# benchmarks/bench_intent_eval.py
+"""
+Offline evaluation of intent routing: accuracy, confusion matrix, latency and
+cost of `HealthPlannerAgent._get_user_intent` over the labeled corpus in
+benchmarks/intent_corpus.jsonl (utterances from sessions/*.json plus written
+examples for every intent).
+
+Backends:
+    mock    the keyword classifier of `llm.mock_server`, through the regular client path
+    replay  a cassette recorded from an earlier run with --record (see llm/cassette.py)
+    live    the classify tier configured by the GEMINI_* variables
+
+Run with: python -m benchmarks.bench_intent_eval --backend mock
+Record a live run once, then replay it offline:
+    python -m benchmarks.bench_intent_eval --backend live --record intent_eval.jsonl.gz
+    python -m benchmarks.bench_intent_eval --backend replay --replay intent_eval.jsonl.gz
+Exits non-zero when accuracy falls below the backend's entry in
+benchmarks/intent_eval_baseline.json; refresh it with --update.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from llm.cassette import RECORD, REPLAY, CassetteModel
+from llm.model_router import CLASSIFY, DEFAULT_FAST_MODEL
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "intent_corpus.jsonl")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "intent_eval_baseline.json")
+BACKENDS = ("mock", "replay", "live")
+
+# USD per million input/output tokens. The mock and replay backends are priced as the
+# fast tier, which serves classification by default (see llm/model_router.py).
+PRICES_PER_M_TOKENS = {
+    "models/gemini-2.0-flash": (0.10, 0.40),
+    "models/gemini-2.0-flash-lite": (0.075, 0.30),
+}
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[Dict[str, str]]:
+    """Reads the labeled corpus: one {"text", "intent", "source"} object per line."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class UsageMeter:
+    """Passes calls through and keeps the token usage of the last response."""
+
+    def __init__(self, model: Any):
+        self._model = model
+        self.last: Dict[str, int] = {}
+
+    async def get_response(self, *args, **kwargs) -> Any:
+        response = await self._model.get_response(*args, **kwargs)
+        usage = getattr(response, "usage", None)
+        self.last = {
+            "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+            "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        }
+        return response
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+async def evaluate(
+    model: Any,
+    corpus: List[Dict[str, str]],
+    price: Tuple[float, float] = PRICES_PER_M_TOKENS[DEFAULT_FAST_MODEL],
+    record_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Classifies every corpus utterance through the agent's intent step and scores the labels.
+
+    Each utterance is classified in a fresh session, so the history of one example
+    cannot leak into the next.
+
+    Args:
+        model: The classifier backend; anything with the `Model.get_response` signature.
+        corpus: Labeled utterances from `load_corpus`.
+        price: USD per million input and output tokens.
+        record_path: If given, the backend's responses are recorded to this cassette for the replay backend.
+
+    Returns:
+        Accuracy, per-intent recall, the confusion matrix (expected -> predicted -> count),
+        latency percentiles, token totals and cost.
+    """
+    from agent import INTENTS, HealthPlannerAgent
+    from context import UserSessionContext
+    from llm.model_router import ModelRouter
+
+    if record_path:
+        model = CassetteModel(record_path, model, mode=RECORD, name=CLASSIFY)
+    meter = UsageMeter(model)
+    agent = HealthPlannerAgent()
+    agent.models = ModelRouter.single(meter)
+
+    confusion: Dict[str, Dict[str, int]] = {intent: {} for intent in INTENTS}
+    latencies_ms: List[float] = []
+    correct = input_tokens = output_tokens = 0
+    for example in corpus:
+        started = time.perf_counter()
+        predicted = await agent._get_user_intent(example["text"], UserSessionContext(name="eval", uid="eval"))
+        latencies_ms.append((time.perf_counter() - started) * 1000)
+        row = confusion.setdefault(example["intent"], {})
+        row[predicted] = row.get(predicted, 0) + 1
+        correct += predicted == example["intent"]
+        input_tokens += meter.last.get("input_tokens", 0)
+        output_tokens += meter.last.get("output_tokens", 0)
+
+    cost = (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+    return {
+        "examples": len(corpus),
+        "accuracy": correct / len(corpus) if corpus else 0.0,
+        "recall": {
+            intent: row.get(intent, 0) / sum(row.values())
+            for intent, row in confusion.items() if row
+        },
+        "confusion": confusion,
+        "latency_ms_p50": _percentile(latencies_ms, 0.5),
+        "latency_ms_p99": _percentile(latencies_ms, 0.99),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost_usd_per_1k": cost / len(corpus) * 1000 if corpus else 0.0,
+    }
+
+
+def _evaluate_backend(backend: str, replay_path: Optional[str], latency: float,
+                      record_path: Optional[str]) -> Dict[str, Any]:
+    corpus = load_corpus()
+    if backend == "mock":
+        from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+
+        from llm.mock_server import MockModelServer
+
+        with MockModelServer(latency=latency) as server:
+            client = AsyncOpenAI(api_key="mock-key", base_url=server.base_url)
+            model = OpenAIChatCompletionsModel(model="mock-model", openai_client=client)
+            return asyncio.run(evaluate(model, corpus, record_path=record_path))
+    if backend == "replay":
+        if not replay_path:
+            raise ValueError("The replay backend needs --replay PATH (a cassette written by --record).")
+        model = CassetteModel(replay_path, mode=REPLAY, name=CLASSIFY)
+        return asyncio.run(evaluate(model, corpus, record_path=record_path))
+    if backend == "live":
+        from llm.model_router import ModelRouter
+
+        router = ModelRouter.from_env()
+        name = os.environ.get("GEMINI_FAST_MODEL", DEFAULT_FAST_MODEL)
+        price = PRICES_PER_M_TOKENS.get(name, PRICES_PER_M_TOKENS[DEFAULT_FAST_MODEL])
+        return asyncio.run(evaluate(router.for_task(CLASSIFY), corpus, price=price, record_path=record_path))
+    raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}.")
+
+
+def run(backend: str = "mock", replay_path: Optional[str] = None, latency: float = 0.0) -> Dict[str, float]:
+    report = _evaluate_backend(backend, replay_path, latency, record_path=None)
+    results = {key: float(value) for key, value in report.items() if isinstance(value, (int, float))}
+    results.update({f"recall[{intent}]": value for intent, value in report["recall"].items()})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate intent routing accuracy, latency and cost.")
+    parser.add_argument("--backend", choices=BACKENDS, default="mock")
+    parser.add_argument("--replay", help="Cassette for the replay backend.")
+    parser.add_argument("--record", help="Record the backend's responses to this cassette for later replay.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated provider latency of the mock backend.")
+    parser.add_argument("--update", action="store_true", help="Store this run's accuracy as the backend's baseline.")
+    args = parser.parse_args()
+
+    report = _evaluate_backend(args.backend, args.replay, args.latency, args.record)
+    print(json.dumps(report, indent=4))
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+    if args.update:
+        baseline[args.backend] = {"accuracy": report["accuracy"]}
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=4)
+            f.write("\n")
+    expected = baseline.get(args.backend, {}).get("accuracy")
+    if expected is not None and report["accuracy"] < expected:
+        print(f"ACCURACY REGRESSION {args.backend}: {report['accuracy']:.3f} < baseline {expected:.3f}")
+        sys.exit(1)
@@ -0,0 +1,58 @@
+# benchmarks/bench_meal_solver.py
+"""
+Local meal planning: food database load (cold compile and memory-mapped warm
+load) and 7-day plan solving across diet and goal combinations.
+
+Run with: python -m benchmarks.bench_meal_solver [n_plans]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict
+
+from nutrition.energy import targets_for_goal
+from nutrition.food_db import FoodDatabase, parse_diet_preferences
+from nutrition.meal_solver import MealPlanSolver
+
+CASES = [
+    ("none", "maintain"),
+    ("vegetarian", "lose"),
+    ("vegan, gluten free", "gain"),
+    ("halal, no fish", "lose"),
+    ("dairy free, nut allergy", "maintain"),
+]
+
+
+def run(n_plans: int = 500) -> Dict[str, float]:
+    results = {"n_plans": n_plans}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "foods.npy")
+        start = time.perf_counter()
+        FoodDatabase.load(cache_path=cache_path)
+        results["db_cold_load_ms"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        food_db = FoodDatabase.load(cache_path=cache_path)
+        results["db_warm_load_ms"] = (time.perf_counter() - start) * 1000
+        results["foods"] = len(food_db)
+
+    solver = MealPlanSolver(food_db)
+    inputs = [(targets_for_goal({"action": action}), parse_diet_preferences(prefs)) for prefs, action in CASES]
+    errors = []
+    start = time.perf_counter()
+    for i in range(n_plans):
+        targets, diet = inputs[i % len(inputs)]
+        errors.append(solver.solve(targets, diet).max_calorie_error())
+    elapsed = time.perf_counter() - start
+    results["solve_ms"] = elapsed / n_plans * 1000
+    results["plans_per_s"] = n_plans / elapsed
+    results["max_calorie_error_pct"] = max(errors) * 100
+    return results
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(json.dumps(run(n), indent=2))
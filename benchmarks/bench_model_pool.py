@@ -0,0 +1,45 @@
+# benchmarks/bench_model_pool.py
+"""
+Calls served within a fixed window by a model pool of 1, 2 and 4 keys, each
+limited to the same requests per minute, against the local mock model server.
+
+Run with: python -m benchmarks.bench_model_pool
+"""
+import asyncio
+import json
+from typing import Dict
+
+from agents import ModelSettings
+
+from llm.mock_server import MockModelServer
+from llm.model_pool import ModelPool
+from llm.tracing import ModelTracing
+
+KEY_COUNTS = (1, 2, 4)
+
+
+async def _served(pool: ModelPool, calls: int, window_s: float) -> int:
+    async def call():
+        await pool.get_response(
+            system_instructions="You are helpful.", input="what is a calorie?", model_settings=ModelSettings(),
+            tools=[], output_schema=None, handoffs=[], tracing=ModelTracing.DISABLED,
+        )
+
+    results = await asyncio.gather(
+        *(asyncio.wait_for(call(), window_s) for _ in range(calls)), return_exceptions=True,
+    )
+    return sum(1 for result in results if not isinstance(result, BaseException))
+
+
+def run(calls: int = 100, rpm: int = 20, window_s: float = 2.0, latency: float = 0.05) -> Dict[str, float]:
+    results = {}
+    with MockModelServer(latency=latency) as server:
+        for keys in KEY_COUNTS:
+            pool = ModelPool.from_keys([f"mock-key-{i}" for i in range(keys)], model="mock-model",
+                                       base_urls=[server.base_url], rpm=rpm)
+            results[f"served_in_window[{keys}_keys]"] = float(asyncio.run(_served(pool, calls, window_s)))
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
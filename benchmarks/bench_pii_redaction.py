@@ -0,0 +1,92 @@
+# benchmarks/bench_pii_redaction.py
+"""
+Throughput of PII redaction on large transcripts, and what caching the
+redacted form on each stored turn saves when history is assembled for
+every model call.
+
+`redact_mb_per_s` is the raw single-pass matcher. `history_first_ms` is the
+first `build_model_input` over a freshly loaded transcript, which redacts every
+turn; `history_cached_ms` is every later call. `history_rescan_ms` is what each
+call would cost if history were redacted per call instead of per turn.
+
+Run with: python -m benchmarks.bench_pii_redaction [turns]
+"""
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from context import LeanSessionContext, UserSessionContext, build_model_input
+from guardrails.pii_redactor import redact
+
+# One in four user messages carries PII, the rest are ordinary questions with numbers in them.
+USER_MESSAGES = [
+    "I drank 500ml of water and walked 12000 steps today",
+    "give me a workout plan with 3x10 squats, I'm 35 and weigh 82 kg",
+    "what should I eat before a 10 km run at 7:30?",
+    "Hi, my name is Dana Whitfield, email me the plan at dana.whitfield@example.com or call 555-201-3344",
+    "i want to lose 5 kg in 3 months, I am vegetarian",
+    "can you swap the Greek yogurt for something else?",
+    "how much protein is in 200 g of chicken breast",
+    "my member ID: HX448812 and insurance policy no. 99102233 if the clinic asks",
+]
+ASSISTANT_MESSAGE = "Here is what I suggest for today: " + "keep a steady pace, stay hydrated and rest well. " * 6
+
+
+def _transcript(turns: int) -> List[Dict[str, str]]:
+    history = []
+    for i in range(turns // 2):
+        history.append({"role": "user", "content": USER_MESSAGES[i % len(USER_MESSAGES)] + f" (turn {i})"})
+        history.append({"role": "assistant", "content": ASSISTANT_MESSAGE})
+    return history
+
+
+def _best_ms(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(turns: int = 4000, repeat: int = 5) -> Dict[str, float]:
+    history = _transcript(turns)
+    texts = [turn["content"] for turn in history]
+    text_bytes = sum(len(text.encode()) for text in texts)
+    redact_s = _best_ms(lambda: [redact(text) for text in texts], repeat) / 1000
+    stored = json.dumps(UserSessionContext(uid="bench", chat_history=history).model_dump())
+
+    def first_call() -> None:
+        lean = LeanSessionContext.loads(stored, validate=False)
+        started = time.perf_counter()
+        build_model_input(lean, "next?")
+        first_ms.append((time.perf_counter() - started) * 1000)
+
+    first_ms: List[float] = []
+    for _ in range(repeat):
+        first_call()
+    lean = LeanSessionContext.loads(stored, validate=False)
+    build_model_input(lean, "next?")
+    cached_ms = _best_ms(lambda: build_model_input(lean, "next?"), repeat * 4)
+    rescan_ms = _best_ms(
+        lambda: [{"role": turn.role, "content": redact(turn.content)} for turn in lean.chat_history], repeat)
+
+    # Sessions are saved redacted, so after a reload only turns with a trigger (a digit, "@", a cue) rescan.
+    reloaded = LeanSessionContext.loads(lean.dumps(), validate=False)
+    reloaded_ms = _best_ms(lambda: build_model_input(reloaded, "next?"), 1)
+    return {
+        "turns": float(turns),
+        "redacted_turns": float(sum(1 for text in texts if redact(text) != text)),
+        "redact_mb_per_s": text_bytes / 1e6 / redact_s,
+        "redact_us_per_turn": redact_s * 1e6 / turns,
+        "history_first_ms": min(first_ms),
+        "history_cached_ms": cached_ms,
+        "history_rescan_ms": rescan_ms,
+        "history_after_reload_ms": reloaded_ms,
+        "cache_speedup": rescan_ms / cached_ms,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(*(int(arg) for arg in sys.argv[1:])), indent=4))
@@ -0,0 +1,97 @@
+# benchmarks/bench_plan_prefetch.py
+"""
+Latency of the follow-up plan request with and without background prefetch.
+
+A user asks for a workout routine before setting a goal, so the goal is
+parsed in that turn; after a short pause they ask for a meal plan. Model
+calls go to the mock model server and each costs the configured latency.
+The plan tools compose plans locally, so they are given the same latency to
+stand for a model-written plan. With prefetch, the meal plan is built while
+the user reads the workout plan.
+
+Run with: python -m benchmarks.bench_plan_prefetch [latency_s] [think_s]
+"""
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+from llm.mock_server import MockModelServer, default_responder
+
+GOAL = {"name": "Muscle Gain", "action": "gain", "quantity": None, "unit": "muscle_mass",
+        "duration_value": None, "duration_unit": None}
+FIRST_TURN = "i want to build muscle, give me a workout routine"
+FOLLOW_UP = "now give me a meal plan"
+
+
+class _SlowTool:
+    """A plan tool that takes as long as one model call."""
+
+    def __init__(self, tool: Any, latency: float):
+        self.tool = tool
+        self.name = tool.name
+        self.latency = latency
+
+    async def run(self, *args, **kwargs) -> Any:
+        await asyncio.sleep(self.latency)
+        return await self.tool.run(*args, **kwargs)
+
+
+def _responder(messages: List[Dict]) -> str:
+    system = " ".join(str(m.get("content")) for m in messages if m.get("role") in ("system", "developer"))
+    if "goal analyzer" in system:
+        return json.dumps(GOAL)
+    return default_responder(messages)
+
+
+async def _session(model: Any, concurrency: int, latency: float, think_s: float) -> Dict[str, float]:
+    from agent import HealthPlannerAgent
+    from context import UserSessionContext
+    from llm.budget import BudgetedModel
+    from llm.model_router import ModelRouter
+    from planning.plan_prefetch import PlanPrefetcher
+    from tools.meal_planner import MealPlannerTool
+    from tools.workout_recommender import WorkoutRecommenderTool
+
+    agent = HealthPlannerAgent()
+    agent.models = ModelRouter.single(BudgetedModel(model))
+    agent.plan_prefetcher = PlanPrefetcher(max_concurrent=concurrency)
+    agent.tools["meal_planner"] = _SlowTool(MealPlannerTool(), latency)
+    agent.tools["workout_recommender"] = _SlowTool(WorkoutRecommenderTool(), latency)
+    ctx = UserSessionContext(name="bench", uid="bench")
+
+    started = time.perf_counter()
+    await agent.run(FIRST_TURN, ctx)
+    first_ms = (time.perf_counter() - started) * 1000
+    await asyncio.sleep(think_s)
+    started = time.perf_counter()
+    await agent.run(FOLLOW_UP, ctx)
+    follow_up_ms = (time.perf_counter() - started) * 1000
+    hits = agent.plan_prefetcher.stats()["hits"]
+    agent.plan_prefetcher.close()
+    return {"first_ms": first_ms, "follow_up_ms": follow_up_ms, "prefetch_hits": hits}
+
+
+def run(latency: float = 0.1, think_s: float = 0.5) -> Dict[str, float]:
+    from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+
+    results: Dict[str, float] = {}
+    with MockModelServer(latency=latency, responder=_responder) as server:
+        # The first pass is a warm-up: it pays the imports and tool set-up.
+        for label, concurrency in (("warmup", 0), ("off", 0), ("on", 2)):
+            model = OpenAIChatCompletionsModel(
+                model="mock-model", openai_client=AsyncOpenAI(api_key="mock", base_url=server.base_url))
+            before = server.request_count
+            session = asyncio.run(_session(model, concurrency, latency, think_s))
+            if label == "warmup":
+                continue
+            results[f"first_turn_ms[prefetch_{label}]"] = session["first_ms"]
+            results[f"follow_up_turn_ms[prefetch_{label}]"] = session["follow_up_ms"]
+            results[f"model_calls[prefetch_{label}]"] = float(server.request_count - before)
+            results[f"prefetch_hits[prefetch_{label}]"] = float(session["prefetch_hits"])
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(*(float(arg) for arg in sys.argv[1:])), indent=4))
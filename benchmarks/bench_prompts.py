@@ -0,0 +1,38 @@
+# benchmarks/bench_prompts.py
+"""
+Prompt-token sizes per template, checked against benchmarks/prompt_baseline.json.
+
+Run with: python -m benchmarks.bench_prompts
+Exits non-zero when a template drifted from its baseline. After an intended
+prompt change, refresh the baseline with: python -m benchmarks.bench_prompts --update
+"""
+import json
+import os
+import sys
+from typing import Dict
+
+from llm.prompts import PROMPTS
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "prompt_baseline.json")
+
+
+def run() -> Dict[str, float]:
+    results = {f"tokens[{name}]": float(entry["tokens"]) for name, entry in PROMPTS.snapshot().items()}
+    # The tone prefix is shared by the general, medical and goal-fallback prompts.
+    shared = PROMPTS["tone"].static_tokens
+    medical = PROMPTS["medical"].static_tokens
+    results["medical_shared_prefix_ratio"] = shared / medical
+    return results
+
+
+if __name__ == "__main__":
+    if "--update" in sys.argv:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(PROMPTS.snapshot(), f, indent=4)
+            f.write("\n")
+    print(json.dumps(run(), indent=4))
+    with open(BASELINE_PATH) as f:
+        drifted = PROMPTS.drift(json.load(f))
+    for message in drifted:
+        print(f"PROMPT DRIFT {message}")
+    sys.exit(1 if drifted else 0)
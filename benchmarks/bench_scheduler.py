@@ -0,0 +1,62 @@
+# benchmarks/bench_scheduler.py
+"""
+Check-in scheduler at scale: bulk scheduling, cancel, due-batch firing and
+restart recovery for a large population of uids.
+
+Run with: python -m benchmarks.bench_scheduler [n_users]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict
+
+from scheduling.engine import CheckinScheduler
+from scheduling.timer_queue import TimerQueue
+from scheduling.timer_store import TimerStore
+
+
+def run(n_users: int = 200_000) -> Dict[str, float]:
+    results = {"n_users": n_users}
+
+    queue = TimerQueue()
+    start = time.perf_counter()
+    for i in range(n_users):
+        queue.push(f"user-{i}", float((i * 7919) % n_users))
+    results["queue_insert_us"] = (time.perf_counter() - start) / n_users * 1e6
+
+    start = time.perf_counter()
+    for i in range(0, n_users, 10):
+        queue.cancel(f"user-{i}")
+    results["queue_cancel_us"] = (time.perf_counter() - start) / (n_users // 10) * 1e6
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "checkins.db")
+        store = TimerStore(db_path)
+        start = time.perf_counter()
+        store.upsert_many((f"user-{i}", "daily", "beginner", float(i % 86400)) for i in range(n_users))
+        results["store_bulk_insert_s"] = time.perf_counter() - start
+        store.close()
+
+        start = time.perf_counter()
+        scheduler = CheckinScheduler(TimerStore(db_path), clock=lambda: 0.0)
+        results["recover_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fired = 0
+        while True:
+            batch = scheduler.pop_due(now=3600.0, limit=1000)
+            if not batch:
+                break
+            fired += len(batch)
+        elapsed = time.perf_counter() - start
+        results["fired"] = fired
+        results["fire_per_s"] = fired / elapsed if elapsed else 0.0
+        scheduler.store.close()
+
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000), indent=4))
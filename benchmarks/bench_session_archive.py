@@ -0,0 +1,59 @@
+# benchmarks/bench_session_archive.py
+"""
+Space saved by archiving idle sessions, and the latency of rehydrating one
+on access.
+
+Run with: python -m benchmarks.bench_session_archive
+"""
+import json
+import os
+import tempfile
+import time
+from typing import Dict
+
+from context import UserSessionContext
+from storage.session_archive import archive_cold_sessions, archive_for
+from storage.session_store import list_session_ids, load_session_context, save_session_context, session_path
+
+
+def run(sessions: int = 500, turns: int = 40) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as session_dir:
+        stamp = time.time() - 60 * 86400
+        for i in range(sessions):
+            history = []
+            for t in range(turns):
+                history.append({"role": "user", "content": f"turn {t}: what should I eat after my workout?"})
+                history.append({"role": "assistant", "content": "Aim for protein and carbs within two hours. " * 3})
+            save_session_context(f"s{i}", UserSessionContext(uid=f"s{i}", chat_history=history), session_dir)
+            os.utime(session_path(f"s{i}", session_dir), (stamp, stamp))
+
+        start = time.perf_counter()
+        list_session_ids(session_dir)
+        scan_before_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        report = archive_cold_sessions(session_dir, idle_days=30)
+        archive_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        list_session_ids(session_dir)
+        scan_after_ms = (time.perf_counter() - start) * 1000
+
+        for i in range(0, sessions, 10):
+            load_session_context(f"s{i}", session_dir)
+        stats = archive_for(session_dir).stats()
+
+    return {
+        "bytes_before": float(report.bytes_before),
+        "bytes_after": float(report.bytes_after),
+        "space_saved": report.space_saved,
+        "archive_ms": archive_ms,
+        "scan_before_ms": scan_before_ms,
+        "scan_after_ms": scan_after_ms,
+        "rehydrate_ms_p50": stats["rehydrate_ms_p50"],
+        "rehydrate_ms_max": stats["rehydrate_ms_max"],
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
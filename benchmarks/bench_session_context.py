@@ -0,0 +1,67 @@
+# benchmarks/bench_session_context.py
+"""
+Memory per session and (de)serialization time: pydantic UserSessionContext
+versus the slotted LeanSessionContext, at 10, 100 and 1000 chat turns.
+
+Run with: python -m benchmarks.bench_session_context
+"""
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+from context import LeanSessionContext, UserSessionContext
+
+TURN_COUNTS = (10, 100, 1000)
+
+
+def _session_dict(turns: int) -> Dict:
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i} about my workout and meal plan"})
+        history.append({"role": "assistant", "content": f"answer {i}: " + "stay hydrated and keep moving. " * 4})
+    return UserSessionContext(uid="bench", goal={"name": "Weight Loss"}, chat_history=history[:turns]).model_dump()
+
+
+def _memory_per_session(build: Callable[[], object], copies: int) -> float:
+    # Sessions are decoded from JSON text each time, as they are when loaded from disk.
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build() for _ in range(copies)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return (after - before) / copies
+
+
+def _time_per_call(fn: Callable[[], object], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run() -> Dict[str, float]:
+    results = {}
+    for turns in TURN_COUNTS:
+        data = _session_dict(turns)
+        text = json.dumps(data)
+        model = UserSessionContext(**data)
+        lean = LeanSessionContext.from_dict(data, validate=False)
+        copies = max(10, 2000 // turns)
+        repeat = max(20, 20000 // turns)
+
+        results[f"pydantic_bytes_per_session_{turns}"] = _memory_per_session(
+            lambda: UserSessionContext(**json.loads(text)), copies)
+        results[f"lean_bytes_per_session_{turns}"] = _memory_per_session(
+            lambda: LeanSessionContext.loads(text, validate=False), copies)
+
+        results[f"pydantic_dump_us_{turns}"] = _time_per_call(lambda: json.dumps(model.model_dump(), indent=4), repeat)
+        results[f"lean_dump_us_{turns}"] = _time_per_call(lean.dumps, repeat)
+        results[f"pydantic_load_us_{turns}"] = _time_per_call(lambda: UserSessionContext(**json.loads(text)), repeat)
+        results[f"lean_load_us_{turns}"] = _time_per_call(lambda: LeanSessionContext.loads(text, validate=False), repeat)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
@@ -0,0 +1,115 @@
+# benchmarks/bench_shared_cache.py
+"""
+Cost of the cross-process cache, and what it saves a pool of workers that
+are asked for the same plans.
+
+`get_hit_us`, `get_miss_us` and `set_us` time single operations on a
+`SharedCache` file. In the pool part, each of `workers` processes asks for the
+same `plans` workout plans in its own random order. Every plan costs
+`latency` seconds on top of local composition, standing for a model-written
+plan. Without the shared cache every worker builds every plan; with it, each
+plan is built about once and read by the other workers. `workers=0` skips the
+pool part.
+
+Run with: python -m benchmarks.bench_shared_cache [workers] [plans] [latency_s]
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+from caching.shared_cache import SharedCache
+
+LEVELS = ["beginner", "intermediate", "advanced"]
+GOALS = [
+    {"name": "Muscle Gain", "action": "gain", "unit": "muscle_mass"},
+    {"name": "Lose Weight", "action": "lose", "quantity": 5, "unit": "kg"},
+    {"name": "Run a 10k", "action": "improve", "unit": "endurance"},
+]
+INJURIES = [None, "sore knee", "lower back pain"]
+
+
+def _plan_inputs(plans: int):
+    combos = [(level, goal, injury) for injury in INJURIES for goal in GOALS for level in LEVELS]
+    return [combos[i % len(combos)] for i in range(plans)]
+
+
+async def _ask_for_plans(tool, path: Optional[str], seed: int, plans: int, latency: float) -> int:
+    from planning.plan_units import fingerprint
+
+    cache = SharedCache(path) if path else None
+    inputs = _plan_inputs(plans)
+    random.Random(seed).shuffle(inputs)
+    builds = 0
+    for level, goal, injury in inputs:
+        key = f"plan:workout:{fingerprint([level, goal, injury])}"
+        if cache is not None and cache.get_json(key) is not None:
+            continue
+        await asyncio.sleep(latency)
+        result = await tool.run(None, level, goal, injury_notes=injury)
+        builds += 1
+        if cache is not None:
+            cache.set_json(key, result)
+    return builds
+
+
+def _worker(path: Optional[str], seed: int, plans: int, latency: float, ready, start, builds) -> None:
+    from tools.workout_recommender import WorkoutRecommenderTool
+
+    tool = WorkoutRecommenderTool()
+    # Composing one plan loads the exercise catalog, which is not what is being measured.
+    asyncio.run(tool.run(None, LEVELS[0], GOALS[0]))
+    ready.put(True)
+    start.wait()
+    builds.put(asyncio.run(_ask_for_plans(tool, path, seed, plans, latency)))
+
+
+def _pool(path: Optional[str], workers: int, plans: int, latency: float) -> Dict[str, float]:
+    context = multiprocessing.get_context("spawn")
+    ready, start, builds = context.Queue(), context.Event(), context.Queue()
+    processes = [context.Process(target=_worker, args=(path, seed, plans, latency, ready, start, builds))
+                 for seed in range(workers)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        ready.get()
+    started = time.perf_counter()
+    start.set()
+    total = sum(builds.get() for _ in processes)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for process in processes:
+        process.join()
+    return {"builds": float(total), "elapsed_ms": elapsed_ms}
+
+
+def _time_us(operation, rounds: int) -> float:
+    started = time.perf_counter()
+    for i in range(rounds):
+        operation(i)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def run(workers: int = 4, plans: int = 27, latency: float = 0.05, rounds: int = 20000) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        with SharedCache(os.path.join(tmp, "micro")) as cache:
+            value = json.dumps({"ok": True, "workout_plan": ["Day 1: Squats 3x10"] * 40}).encode()
+            keys = [f"plan:workout:{i:016x}" for i in range(1024)]
+            results["set_us"] = _time_us(lambda i: cache.set(keys[i % 1024], value), rounds)
+            results["get_hit_us"] = _time_us(lambda i: cache.get(keys[i % 1024]), rounds)
+            results["get_miss_us"] = _time_us(lambda i: cache.get(f"missing:{i}"), rounds)
+        if workers:
+            for label, path in (("shared_off", None), ("shared_on", os.path.join(tmp, "pool"))):
+                pool = _pool(path, int(workers), int(plans), latency)
+                results[f"pool_ms[{label}]"] = pool["elapsed_ms"]
+                results[f"plan_builds[{label}]"] = pool["builds"]
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(*(float(arg) for arg in sys.argv[1:])), indent=4))
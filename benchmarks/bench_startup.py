@@ -0,0 +1,82 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start budget for the agent, measured with `python -X importtime` in a fresh
+interpreter so nothing is already cached in sys.modules.
+
+Run with: python -m benchmarks.bench_startup
+Exits non-zero when a measurement exceeds benchmarks/startup_budget.json.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BUDGET_PATH = os.path.join(os.path.dirname(__file__), "startup_budget.json")
+
+_PROBE = """
+import time
+start = time.perf_counter()
+import agent
+imported = time.perf_counter()
+agent.HealthPlannerAgent()
+constructed = time.perf_counter()
+import storage.session_cache, context
+app_modules = time.perf_counter()
+print("TIMINGS", (imported - start) * 1000, (constructed - imported) * 1000, (app_modules - start) * 1000)
+"""
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """Returns (module, cumulative_us) for top-level imports, slowest first."""
+    top_level = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            top_level.append((match.group(4), int(match.group(2))))
+    return sorted(top_level, key=lambda item: item[1], reverse=True)
+
+
+def run(repeat: int = 5) -> Dict[str, float]:
+    samples = []
+    slowest = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        timings = next(line for line in proc.stdout.splitlines() if line.startswith("TIMINGS"))
+        samples.append([float(value) for value in timings.split()[1:]])
+        slowest = _parse_importtime(proc.stderr)
+    # Report the best of N runs; cold-start noise is one-sided.
+    results = {
+        "import_agent_ms": min(s[0] for s in samples),
+        "construct_agent_ms": min(s[1] for s in samples),
+        "import_app_modules_ms": min(s[2] for s in samples),
+    }
+    for module, cumulative_us in slowest[:5]:
+        results[f"slowest_import_ms[{module}]"] = cumulative_us / 1000
+    return results
+
+
+def check_budget(results: Dict[str, float]) -> List[str]:
+    with open(BUDGET_PATH) as f:
+        budget = json.load(f)
+    return [
+        f"{metric}: {results[metric]:.1f}ms > budget {limit}ms"
+        for metric, limit in budget.items()
+        if results.get(metric, 0.0) > limit
+    ]
+
+
+if __name__ == "__main__":
+    results = run()
+    print(json.dumps(results, indent=4))
+    failures = check_budget(results)
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,91 @@
+# benchmarks/bench_worker_pool.py
+"""
+Worker-pool scaling from 1 to N processes, with every agent turn served by the
+local mock model server (run in its own process so it is not the bottleneck).
+
+Run with: python -m benchmarks.bench_worker_pool [max_workers] [turns] [latency_s]
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import wait
+from typing import Dict
+
+from serving.worker_pool import WorkerPool
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+QUESTIONS = [
+    "why is sleep important?",
+    "what is a calorie?",
+    "how much protein do I need?",
+    "tell me more about stretching",
+]
+
+
+def mock_agent():
+    """Agent factory for the workers: the real HealthPlannerAgent talking to the mock server."""
+    from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+    from agent import HealthPlannerAgent
+    from llm.model_router import ModelRouter
+
+    agent = HealthPlannerAgent()
+    agent.models = ModelRouter.single(OpenAIChatCompletionsModel(
+        model="mock-model",
+        openai_client=AsyncOpenAI(api_key="mock", base_url=os.environ["MOCK_MODEL_BASE_URL"]),
+    ))
+    return agent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run(max_workers: int = 0, turns: int = 400, latency: float = 0.0, sessions: int = 64) -> Dict[str, float]:
+    max_workers = max_workers or os.cpu_count() or 1
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "llm.mock_server", "--port", str(port), "--latency", str(latency)],
+        cwd=ROOT, stdout=subprocess.DEVNULL,
+    )
+    os.environ["MOCK_MODEL_BASE_URL"] = f"http://127.0.0.1:{port}/v1/"
+    results = {"turns": turns, "latency_s": latency, "sessions": sessions}
+    try:
+        time.sleep(0.5)
+        counts = sorted({1, 2, 4, max_workers} | set(range(8, max_workers + 1, 8)))
+        for workers in [n for n in counts if n <= max_workers]:
+            with tempfile.TemporaryDirectory() as session_dir:
+                with WorkerPool(workers, "benchmarks.bench_worker_pool:mock_agent", session_dir=session_dir) as pool:
+                    # Warm-up: start every worker's agent and SDK import before timing.
+                    wait([pool.submit(f"warm-{i}", "hello") for i in range(workers * 4)])
+                    start = time.perf_counter()
+                    futures = [
+                        pool.submit(f"user-{i % sessions}", QUESTIONS[i % len(QUESTIONS)])
+                        for i in range(turns)
+                    ]
+                    wait(futures)
+                    elapsed = time.perf_counter() - start
+                    errors = sum(1 for f in futures if not f.result().get("ok"))
+            results[f"turns_per_s_{workers}w"] = turns / elapsed
+            results[f"errors_{workers}w"] = errors
+        base = results["turns_per_s_1w"]
+        results["speedup_max"] = max(v for k, v in results.items() if k.startswith("turns_per_s_")) / base
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    print(json.dumps(run(
+        int(args[0]) if len(args) > 0 else 0,
+        int(args[1]) if len(args) > 1 else 400,
+        float(args[2]) if len(args) > 2 else 0.0,
+    ), indent=4))
@@ -0,0 +1,45 @@
+# benchmarks/bench_workout_composer.py
+"""
+Local workout composition: catalog load and weekly plan composition across
+goal, level and injury combinations.
+
+Run with: python -m benchmarks.bench_workout_composer [n_plans]
+"""
+import json
+import sys
+import time
+from typing import Dict
+
+from training.exercise_catalog import ExerciseCatalog
+from training.workout_composer import WorkoutComposer
+
+CASES = [
+    ({"name": "Weight Loss", "action": "lose"}, "beginner", None),
+    ({"name": "Muscle Gain", "action": "gain"}, "advanced", None),
+    ({"name": "Increase Biceps Size", "action": "increase", "unit": "biceps_size"}, "intermediate", "sore shoulder"),
+    ({"name": "Improve Fitness", "action": "improve"}, "intermediate", "I hurt my knee and my lower back"),
+]
+
+
+def run(n_plans: int = 5_000) -> Dict[str, float]:
+    results = {"n_plans": n_plans}
+
+    start = time.perf_counter()
+    catalog = ExerciseCatalog.load()
+    results["catalog_load_ms"] = (time.perf_counter() - start) * 1000
+    results["exercises"] = len(catalog)
+
+    composer = WorkoutComposer(catalog)
+    start = time.perf_counter()
+    for i in range(n_plans):
+        goal, level, injuries = CASES[i % len(CASES)]
+        composer.compose(goal, level, injuries).to_workout_plan()
+    elapsed = time.perf_counter() - start
+    results["compose_ms"] = elapsed / n_plans * 1000
+    results["plans_per_s"] = n_plans / elapsed
+    return results
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    print(json.dumps(run(n), indent=2))
@@ -0,0 +1,65 @@
+# benchmarks/bench_write_pipeline.py
+"""
+Time a turn spends persisting its session: a synchronous fsynced save versus
+handing the snapshot to the background SessionWriter.
+
+Run with: python -m benchmarks.bench_write_pipeline
+"""
+import json
+import os
+import tempfile
+import time
+from typing import Dict
+
+from context import LeanSessionContext
+from storage.write_pipeline import SessionWriter
+
+SESSIONS = 50
+
+
+def _session(i: int, turn: int) -> LeanSessionContext:
+    history = [{"role": "user", "content": f"turn {t}: what should I eat after training?"} for t in range(turn)]
+    return LeanSessionContext(uid=f"s{i}", name="Bench", chat_history=history)
+
+
+def _sync_save(session_dir: str, ctx: LeanSessionContext) -> None:
+    # What a fully durable save on the response path costs.
+    path = os.path.join(session_dir, f"{ctx.uid}.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(ctx.model_dump(), f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
+
+def run(turns: int = 4) -> Dict[str, float]:
+    contexts = [[_session(i, turn) for i in range(SESSIONS)] for turn in range(1, turns + 1)]
+    with tempfile.TemporaryDirectory() as session_dir:
+        start = time.perf_counter()
+        for batch in contexts:
+            for ctx in batch:
+                _sync_save(session_dir, ctx)
+        sync_ms = (time.perf_counter() - start) * 1000 / (SESSIONS * turns)
+
+    with tempfile.TemporaryDirectory() as session_dir:
+        writer = SessionWriter(session_dir).start()
+        start = time.perf_counter()
+        for batch in contexts:
+            for ctx in batch:
+                writer.submit(ctx.uid, ctx)
+        submit_ms = (time.perf_counter() - start) * 1000 / (SESSIONS * turns)
+        writer.close()
+        stats = writer.stats()
+
+    return {
+        "sync_save_ms_per_turn": sync_ms,
+        "submit_ms_per_turn": submit_ms,
+        "writer_write_ms_p50": stats["write_ms_p50"],
+        "writer_write_ms_p99": stats["write_ms_p99"],
+        "writer_coalesced": float(stats["coalesced"]),
+        "writer_batches": float(stats["batches"]),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
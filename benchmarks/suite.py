@@ -0,0 +1,234 @@
+# benchmarks/suite.py
+"""
+Performance regression suite over the benchmarks in this directory.
+
+`run` executes the suite and stores the metrics as
+benchmarks/results/<commit>.json. `compare` checks one stored result against
+another and exits non-zero when a metric regressed by more than the threshold.
+`check` runs and compares in one step, for CI:
+
+    python -m benchmarks.suite run
+    python -m benchmarks.suite compare <base commit or file> [<head commit or file>] [--threshold 0.35]
+    python -m benchmarks.suite check <base commit or file>
+
+Whether higher or lower is better is inferred from the metric name (see
+`direction`). Timings are noisy, so they gate at `DEFAULT_THRESHOLD` and each
+one is the best of `--repeat` suite runs. Deterministic metrics (token and
+byte counts, accuracy, cost) gate at `EXACT_THRESHOLD`. Counts and
+configuration echoes such as `n_plans` are reported but never gate.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_THRESHOLD = 0.35
+EXACT_THRESHOLD = 0.01
+
+# Benchmarks run by default, with arguments that keep one pass of the suite to about ten seconds.
+SUITE: Dict[str, Dict[str, Any]] = {
+    "hot_paths": {},
+    "startup": {"repeat": 3},
+    "prompts": {},
+    "intent_eval": {},
+    "cassette": {"latency": 0.02},
+    "session_context": {},
+    "pii_redaction": {"turns": 2000},
+    "write_pipeline": {},
+    "session_archive": {"sessions": 200},
+    "meal_solver": {"n_plans": 200},
+    "workout_composer": {"n_plans": 1000},
+}
+# Slower benchmarks, run only when named with --only.
+EXTENDED: Dict[str, Dict[str, Any]] = {
+    "energy": {},
+    "scheduler": {},
+    "model_pool": {},
+    "checkin_batch": {},
+    "intent_batching": {},
+    "plan_prefetch": {},
+    "shared_cache": {},
+    "worker_pool": {},
+}
+
+HIGHER, LOWER = "higher", "lower"
+TIMING, EXACT = "timing", "exact"
+# First match wins: (name pattern, better direction, kind).
+_DIRECTIONS = [
+    (re.compile(r"per_s(?![a-z])|speedup|served"), HIGHER, TIMING),
+    (re.compile(r"ratio|saved|accuracy|recall"), HIGHER, EXACT),
+    (re.compile(r"bytes|tokens|cost|error"), LOWER, EXACT),
+    (re.compile(r"_ms|_us|_s$|_s_|_s\["), LOWER, TIMING),
+]
+
+
+def direction(metric: str) -> Optional[str]:
+    """HIGHER or LOWER if the metric name says which way is better, else None (not gated)."""
+    return next((better for pattern, better, _ in _DIRECTIONS if pattern.search(metric)), None)
+
+
+def _kind(metric: str) -> Optional[str]:
+    return next((kind for pattern, _, kind in _DIRECTIONS if pattern.search(metric)), None)
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def current_commit() -> str:
+    return _git("rev-parse", "--short", "HEAD") or "unknown"
+
+
+def run_suite(names: Optional[List[str]] = None, repeat: int = 1) -> Dict[str, Any]:
+    """
+    Runs the named benchmarks (default: `SUITE`) and collects their metrics.
+
+    Args:
+        names: Benchmarks from `SUITE` or `EXTENDED`.
+        repeat: Runs per benchmark; each metric keeps its best value over the runs.
+
+    Returns:
+        The commit, environment and per-benchmark metrics, plus any benchmark errors.
+    """
+    report: Dict[str, Any] = {
+        "commit": current_commit(),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": {},
+        "errors": {},
+    }
+    for name in names or list(SUITE):
+        kwargs = SUITE.get(name, EXTENDED.get(name, {}))
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(f"benchmarks.bench_{name}")
+            runs = []
+            for _ in range(repeat):
+                # Benchmarks print progress (e.g. agent hooks); only their metrics belong in the report.
+                with contextlib.redirect_stdout(io.StringIO()):
+                    runs.append(module.run(**kwargs))
+        except Exception as e:
+            print(f"Benchmark {name} failed: {e}")
+            report["errors"][name] = str(e)
+            continue
+        report["results"][name] = {
+            metric: float((max if direction(metric) == HIGHER else min)(run[metric] for run in runs))
+            for metric in runs[0]
+        }
+        print(f"{name}: {len(runs[0])} metrics in {time.perf_counter() - started:.1f}s")
+    return report
+
+
+def save_report(report: Dict[str, Any], path: Optional[str] = None) -> str:
+    path = path or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=4)
+        f.write("\n")
+    return path
+
+
+def load_report(ref: str) -> Dict[str, Any]:
+    """Loads a stored result by file path or commit (resolved to benchmarks/results/<short sha>.json)."""
+    if os.path.exists(ref):
+        path = ref
+    else:
+        path = os.path.join(RESULTS_DIR, f"{_git('rev-parse', '--short', ref) or ref}.json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(
+    base: Dict[str, Any],
+    head: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    exact_threshold: float = EXACT_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Compares every metric present in both reports.
+
+    Args:
+        base: The stored baseline report.
+        head: The report under test.
+        threshold: Relative change in the worse direction that counts as a regression, for timings.
+        exact_threshold: The same for deterministic metrics.
+
+    Returns:
+        One row per metric with its base and head values, relative change and status:
+        "regressed", "improved", "ok" or "info" (no direction).
+    """
+    rows = []
+    for bench, metrics in sorted(head["results"].items()):
+        for metric, value in sorted(metrics.items()):
+            baseline = base["results"].get(bench, {}).get(metric)
+            if baseline is None:
+                continue
+            change = (value - baseline) / abs(baseline) if baseline else 0.0
+            better = direction(metric)
+            if better is None:
+                status = "info"
+            else:
+                limit = threshold if _kind(metric) == TIMING else exact_threshold
+                worse = change if better == LOWER else -change
+                status = "regressed" if worse > limit else "improved" if worse < -limit else "ok"
+            rows.append({"metric": f"{bench}.{metric}", "base": baseline, "head": value,
+                         "change": change, "status": status})
+    return rows
+
+
+def _print_comparison(rows: List[Dict[str, Any]], base: Dict[str, Any], head: Dict[str, Any]) -> bool:
+    print(f"{base['commit']} -> {head['commit']}{' (dirty)' if head.get('dirty') else ''}")
+    for row in rows:
+        if row["status"] in ("regressed", "improved"):
+            print(f"{row['status'].upper():9} {row['metric']}: {row['base']:.4g} -> {row['head']:.4g} "
+                  f"({row['change']:+.0%})")
+    regressed = [row for row in rows if row["status"] == "regressed"]
+    missing = sorted(set(base["results"]) - set(head["results"]))
+    for bench in missing:
+        print(f"MISSING   {bench}: in the baseline but not in this run")
+    print(f"{len(rows)} metrics compared, {len(regressed)} regressed")
+    return bool(regressed or missing)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare against stored baselines.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the suite and store benchmarks/results/<commit>.json.")
+    check_parser = commands.add_parser("check", help="Run the suite and compare it against a baseline.")
+    compare_parser = commands.add_parser("compare", help="Compare two stored results.")
+    for sub in (run_parser, check_parser):
+        sub.add_argument("--only", help="Comma-separated benchmark names, e.g. hot_paths,scheduler.")
+        sub.add_argument("--out", help="Where to store the result instead of benchmarks/results/<commit>.json.")
+        sub.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the best value is kept.")
+    for sub in (check_parser, compare_parser):
+        sub.add_argument("base", help="Baseline commit or result file.")
+        sub.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.add_argument("head", nargs="?", default="HEAD", help="Result under test (default: HEAD).")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        base_report, head_report = load_report(args.base), load_report(args.head)
+    else:
+        head_report = run_suite(args.only.split(",") if args.only else None, args.repeat)
+        print(f"Stored {save_report(head_report, args.out)}")
+        if args.command == "run":
+            sys.exit(1 if head_report["errors"] else 0)
+        base_report = load_report(args.base)
+    failed = _print_comparison(compare(base_report, head_report, args.threshold), base_report, head_report)
+    sys.exit(1 if failed or head_report["errors"] else 0)
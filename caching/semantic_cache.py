@@ -0,0 +1,214 @@
+# caching/semantic_cache.py
+
+import hashlib
+import math
+import re
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# Filler words only. Interrogatives and modals stay: "why do muscles cramp" and "how do muscles
+# cramp" (or "should I" and "can I") ask different things and must not share an answer.
+STOP_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "to", "in", "on", "for", "and", "or",
+    "do", "does", "you", "please", "tell", "me", "about", "so", "very", "really", "just", "some",
+    "any", "there", "exactly", "actually", "explain", "know",
+})
+# Contracted interrogatives ("what's", "hows") count as the bare word.
+_CONTRACTIONS = {"whats": "what", "hows": "how", "whys": "why", "whos": "who", "wheres": "where"}
+
+
+def _content_tokens(text: str) -> List[str]:
+    tokens = (t[:-2] if t.endswith("'s") else _CONTRACTIONS.get(t, t) for t in _TOKEN_RE.findall(text.lower()))
+    return [t for t in tokens if t not in STOP_WORDS]
+
+# Words that tie a question to the conversation or to the user, so a stored answer
+# for someone else's phrasing of it would not fit.
+_PERSONAL_RE = re.compile(
+    r"\b(i|i'm|im|i've|my|mine|myself|we|our|that|this|it|those|these|above|previous|again|more|else)\b"
+)
+
+
+def is_context_free(query: str) -> bool:
+    """True if the query reads the same for every user and does not refer back to earlier turns."""
+    return not _PERSONAL_RE.search(query.lower())
+
+
+def shared_key(question: str) -> str:
+    """
+    Key of a question in a shared cache: a hash of every word of it, in order.
+
+    A shared hit skips the similarity threshold, so only case and punctuation may differ;
+    stop words and question words all count.
+    """
+    words = _TOKEN_RE.findall(question.lower())
+    if not words:
+        return ""
+    return "answer:" + hashlib.blake2b(" ".join(words).encode(), digest_size=16).hexdigest()
+
+
+class HashedTfidfEmbedder:
+    """
+    Offline text embedder: unigrams and bigrams hashed into a fixed number of buckets,
+    weighted by sublinear term frequency and an IDF learned from the questions indexed
+    so far, then L2-normalized so a dot product is the cosine similarity.
+    """
+
+    def __init__(self, dim: int = 2048):
+        self.dim = dim
+        self._doc_freq = np.zeros(dim, dtype=np.float32)
+        self._docs = 0
+
+    def _features(self, text: str) -> Dict[int, int]:
+        tokens = _content_tokens(text)
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts: Dict[int, int] = {}
+        for gram in grams:
+            bucket = zlib.crc32(gram.encode()) % self.dim
+            counts[bucket] = counts.get(bucket, 0) + 1
+        return counts
+
+    def observe(self, text: str) -> None:
+        """Counts a document towards the IDF weights."""
+        for bucket in self._features(text):
+            self._doc_freq[bucket] += 1
+        self._docs += 1
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        counts = self._features(text)
+        if not counts:
+            return vector
+        buckets = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        tf = np.fromiter((1.0 + math.log(c) for c in counts.values()), dtype=np.float32, count=len(counts))
+        idf = np.log((1.0 + self._docs) / (1.0 + self._doc_freq[buckets])) + 1.0
+        vector[buckets] = tf * idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of answers to general, non-personal questions.
+
+    Vectors live in a fixed-size NumPy matrix, so a lookup is one matrix-vector
+    product. Entries expire after `ttl` seconds; when full, expired slots are reused
+    first, then the least recently hit entry is evicted.
+
+    With a `shared` backend (see caching/shared_cache.py), answers are also kept
+    there under the question's exact wording (case and punctuation aside), so other
+    worker processes get them too. A local miss that the shared cache answers is copied in locally,
+    where its paraphrases hit from then on.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 2000,
+        threshold: float = 0.85,
+        ttl: float = 24 * 3600,
+        embedder: Optional[HashedTfidfEmbedder] = None,
+        clock: Callable[[], float] = time.time,
+        shared: Optional[Any] = None,
+    ):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.embedder = embedder or HashedTfidfEmbedder()
+        self.clock = clock
+        self.shared = shared
+
+        self._vectors = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+        self._expires = np.full(capacity, -np.inf)
+        self._last_used = np.full(capacity, -np.inf)
+        self._questions: List[Optional[str]] = [None] * capacity
+        self._answers: List[Optional[str]] = [None] * capacity
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0,
+                          "shared_hits": 0}
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires > self.clock()))
+
+    def lookup(self, question: str) -> Optional[str]:
+        """Returns a stored answer for a sufficiently similar question, or None."""
+        query = self.embedder.embed(question)
+        with self._lock:
+            now = self.clock()
+            if not query.any():
+                self._counters["misses"] += 1
+                return None
+            scores = self._vectors @ query
+            scores[self._expires <= now] = -1.0
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                self._last_used[best] = now
+                self._counters["hits"] += 1
+                return self._answers[best]
+        answer = self._shared_lookup(question)
+        if answer is None:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        self._store_local(question, answer)
+        with self._lock:
+            self._counters["hits"] += 1
+            self._counters["shared_hits"] += 1
+        return answer
+
+    def store(self, question: str, answer: str) -> None:
+        self._store_local(question, answer)
+        key = shared_key(question)
+        if self.shared is not None and key:
+            self.shared.set(key, answer.encode(), self.ttl)
+
+    def _shared_lookup(self, question: str) -> Optional[str]:
+        key = shared_key(question)
+        if self.shared is None or not key:
+            return None
+        answer = self.shared.get(key)
+        return answer.decode() if answer is not None else None
+
+    def _store_local(self, question: str, answer: str) -> None:
+        with self._lock:
+            self.embedder.observe(question)
+            vector = self.embedder.embed(question)
+            if not vector.any():
+                return
+            now = self.clock()
+            slot = self._free_slot(now)
+            self._vectors[slot] = vector
+            self._expires[slot] = now + self.ttl
+            self._last_used[slot] = now
+            self._questions[slot] = question
+            self._answers[slot] = answer
+            self._counters["stores"] += 1
+
+    def _free_slot(self, now: float) -> int:
+        expired = np.flatnonzero(self._expires <= now)
+        if expired.size:
+            slot = int(expired[0])
+            if self._answers[slot] is not None:
+                self._counters["expirations"] += 1
+            return slot
+        self._counters["evictions"] += 1
+        return int(np.argmin(self._last_used))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires[:] = -np.inf
+            self._questions = [None] * self.capacity
+            self._answers = [None] * self.capacity
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "size": len(self),
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            }
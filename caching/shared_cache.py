@@ -0,0 +1,408 @@
+# caching/shared_cache.py
+"""
+Cross-process cache for results that are expensive to generate and the same
+for every worker: plans built from identical inputs and answers to general
+questions.
+
+`SharedCache` keeps fixed-size slots in a memory-mapped file that every
+worker process maps. The index is the slot table itself. A key's 64-bit hash
+picks one set of `ways` slots, and the key can only live in that set, so
+looking it up touches at most `ways` slot headers.
+
+Reads take no locks. Each slot carries a sequence number that a writer makes
+odd before changing the slot and even again afterwards. A reader copies the
+slot and keeps the copy only if it saw the same even number before and after.
+A read that keeps racing a writer counts as a miss. Writers serialize on an
+`fcntl` lock over the file. Without `fcntl` (Windows) they serialize within
+the process only, so there use `RedisCache` across processes.
+
+When a set is full, a new entry replaces one chosen by CLOCK: a hit sets the
+slot's reference bit, and a hand per set skips slots whose bit is set
+(clearing it on the way). Expired slots are reused first.
+
+Put the file on tmpfs (e.g. /dev/shm) to keep it in memory only. Otherwise it
+also survives restarts, subject to each entry's TTL. The file's layout is
+fixed when it is created; later openers use the layout in its header.
+
+`RedisCache` is the same interface over any server that speaks the Redis
+protocol: Redis, Valkey, or a local stand-in like KeyDB or Dragonfly. It needs
+the optional `redis` package.
+
+    SHARED_CACHE_URL         redis:// URL of a Redis-compatible server; takes precedence over the file
+    SHARED_CACHE_PATH        path of the shared cache file (unset: no shared cache)
+    SHARED_CACHE_SLOTS       slots in a newly created file (default 4096)
+    SHARED_CACHE_SLOT_BYTES  bytes per slot, header and key included (default 8192)
+"""
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Mapping, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_SLOTS = 4096
+DEFAULT_SLOT_BYTES = 8192
+DEFAULT_WAYS = 8
+DEFAULT_TTL = 24 * 3600
+
+_MAGIC = b"HPSC"
+_VERSION = 1
+# magic, version, sets, ways, slot size
+_FILE_HEADER = struct.Struct("<4sIIII")
+_FILE_HEADER_BYTES = 64
+# seq, referenced, key hash, expires, key length, value length
+_SLOT_HEADER = struct.Struct("<IB3xQdH2xI")
+_SEQ = struct.Struct("<I")
+_HASH = struct.Struct("<Q")
+# Attempts to get a consistent copy of a slot that a writer keeps changing.
+_READ_RETRIES = 16
+
+
+def _key_hash(key: bytes) -> int:
+    # Zero marks an empty slot, so no key may hash to it.
+    return _HASH.unpack(hashlib.blake2b(key, digest_size=8).digest())[0] | 1
+
+
+class CacheBackend(ABC):
+    """A byte-string key-value cache shared by worker processes, with JSON helpers on top."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """The value stored under `key`, or None."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float = DEFAULT_TTL) -> bool:
+        """Stores `value` under `key` for `ttl` seconds. Returns False if it was not stored."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Removes `key`, if present."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes every entry."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, float]:
+        """This process's counters."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Releases the backend's file or connection."""
+
+    def get_json(self, key: str) -> Any:
+        """The decoded value, or None if the key is missing or the value is not valid JSON."""
+        raw = self.get(key)
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def set_json(self, key: str, value: Any, ttl: float = DEFAULT_TTL) -> bool:
+        return self.set(key, json.dumps(value, separators=(",", ":")).encode(), ttl)
+
+
+class SharedCache(CacheBackend):
+    """Set-associative cache in a memory-mapped file, read without locks by any number of processes."""
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = DEFAULT_SLOTS,
+        slot_bytes: int = DEFAULT_SLOT_BYTES,
+        ways: int = DEFAULT_WAYS,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Opens the cache file at `path`, creating it with the given layout if it does not exist.
+
+        Args:
+            path: The file every sharing process opens.
+            slots: Number of slots in a new file, rounded up to a multiple of `ways`.
+            slot_bytes: Size of each slot in a new file; a key and value must fit in it with the slot header.
+            ways: Slots per set in a new file, i.e. how many entries whose hashes collide can be kept at once.
+            clock: Wall-clock time, shared by all processes, that TTLs are measured against.
+        """
+        if not 1 <= ways <= 255 or slot_bytes <= _SLOT_HEADER.size:
+            raise ValueError("ways must be 1-255 and slot_bytes must be larger than the slot header.")
+        self.path = path
+        self.clock = clock
+        self._thread_lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "too_large": 0, "torn_reads": 0}
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with self._write_lock():
+                if os.fstat(self._fd).st_size == 0:
+                    sets = max(1, -(-slots // ways))
+                    size = _FILE_HEADER_BYTES + sets + sets * ways * slot_bytes
+                    os.ftruncate(self._fd, size)
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    os.write(self._fd, _FILE_HEADER.pack(_MAGIC, _VERSION, sets, ways, slot_bytes))
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                header = os.read(self._fd, _FILE_HEADER.size)
+            magic, version, self.sets, self.ways, self.slot_bytes = _FILE_HEADER.unpack(header)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a shared cache file of version {_VERSION}.")
+            self._map = mmap.mmap(self._fd, 0)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        # One byte per set holds its CLOCK hand; the slots follow.
+        self._hands = _FILE_HEADER_BYTES
+        self._slots = _FILE_HEADER_BYTES + self.sets
+        self.capacity = self.sets * self.ways
+        self.max_item_bytes = self.slot_bytes - _SLOT_HEADER.size
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ) -> Optional["SharedCache"]:
+        path = env.get("SHARED_CACHE_PATH")
+        if not path:
+            return None
+        return cls(
+            path,
+            slots=int(env.get("SHARED_CACHE_SLOTS", DEFAULT_SLOTS)),
+            slot_bytes=int(env.get("SHARED_CACHE_SLOT_BYTES", DEFAULT_SLOT_BYTES)),
+        )
+
+    def _offset(self, index: int) -> int:
+        return self._slots + index * self.slot_bytes
+
+    def _set_of(self, key_hash: int) -> int:
+        return (key_hash >> 1) % self.sets
+
+    def get(self, key: str) -> Optional[bytes]:
+        """The value stored under `key` by any process, or None. Takes no locks."""
+        encoded = key.encode()
+        key_hash = _key_hash(encoded)
+        first = self._set_of(key_hash) * self.ways
+        for index in range(first, first + self.ways):
+            found = self._read(self._offset(index), encoded, key_hash)
+            if found is not None:
+                self._counters["hits"] += 1
+                return found
+        self._counters["misses"] += 1
+        return None
+
+    def _read(self, offset: int, key: bytes, key_hash: int) -> Optional[bytes]:
+        mapped = self._map
+        for _ in range(_READ_RETRIES):
+            seq = _SEQ.unpack_from(mapped, offset)[0]
+            if seq & 1:
+                continue  # A writer is changing the slot.
+            if _HASH.unpack_from(mapped, offset + 8)[0] != key_hash:
+                return None
+            _, _, stored_hash, expires, key_len, value_len = _SLOT_HEADER.unpack_from(mapped, offset)
+            # Lengths read mid-write may be garbage; the sequence check below discards such a copy.
+            start = offset + _SLOT_HEADER.size
+            end = min(start + key_len + value_len, offset + self.slot_bytes)
+            data = mapped[start:end]
+            if _SEQ.unpack_from(mapped, offset)[0] != seq:
+                continue
+            if stored_hash != key_hash or data[:key_len] != key or expires <= self.clock():
+                return None
+            mapped[offset + 4] = 1  # CLOCK reference bit; a lost update only makes eviction less exact.
+            return data[key_len:]
+        self._counters["torn_reads"] += 1
+        return None
+
+    def set(self, key: str, value: bytes, ttl: float = DEFAULT_TTL) -> bool:
+        """
+        Stores `value` under `key` for `ttl` seconds, replacing an entry of the key's set when it is full.
+
+        Returns:
+            False if the key and value do not fit in one slot.
+        """
+        encoded = key.encode()
+        if not encoded or len(encoded) + len(value) > self.max_item_bytes:
+            self._counters["too_large"] += 1
+            return False
+        key_hash = _key_hash(encoded)
+        with self._write_lock():
+            now = self.clock()
+            index = self._victim(self._set_of(key_hash), encoded, key_hash, now)
+            offset = self._offset(index)
+            self._write(offset, _SLOT_HEADER.pack(0, 0, key_hash, now + ttl, len(encoded), len(value)) + encoded + value)
+            self._counters["stores"] += 1
+        return True
+
+    def delete(self, key: str) -> None:
+        encoded = key.encode()
+        key_hash = _key_hash(encoded)
+        first = self._set_of(key_hash) * self.ways
+        with self._write_lock():
+            for index in range(first, first + self.ways):
+                offset = self._offset(index)
+                if self._slot_key(offset) == (key_hash, encoded):
+                    self._write(offset, bytes(_SLOT_HEADER.size))
+
+    def clear(self) -> None:
+        with self._write_lock():
+            for index in range(self.capacity):
+                offset = self._offset(index)
+                if _HASH.unpack_from(self._map, offset + 8)[0]:
+                    self._write(offset, bytes(_SLOT_HEADER.size))
+
+    def _victim(self, set_index: int, key: bytes, key_hash: int, now: float) -> int:
+        """The slot to write `key` to: its own, else an empty or expired one, else the CLOCK choice."""
+        first = set_index * self.ways
+        free = None
+        for index in range(first, first + self.ways):
+            offset = self._offset(index)
+            stored_hash, stored_key = self._slot_key(offset)
+            if stored_hash == key_hash and stored_key == key:
+                return index
+            if free is None and (not stored_hash or _SLOT_HEADER.unpack_from(self._map, offset)[3] <= now):
+                free = index
+        if free is not None:
+            return free
+        self._counters["evictions"] += 1
+        hand = self._map[self._hands + set_index] % self.ways
+        while True:
+            offset = self._offset(first + hand)
+            if self._map[offset + 4]:
+                self._map[offset + 4] = 0
+                hand = (hand + 1) % self.ways
+                continue
+            self._map[self._hands + set_index] = (hand + 1) % self.ways
+            return first + hand
+
+    def _slot_key(self, offset: int):
+        # Only called under the write lock, so the slot cannot change underneath.
+        _, _, stored_hash, _, key_len, _ = _SLOT_HEADER.unpack_from(self._map, offset)
+        start = offset + _SLOT_HEADER.size
+        return stored_hash, self._map[start:start + key_len]
+
+    def _write(self, offset: int, record: bytes) -> None:
+        # Odd while the slot changes, even again once it is whole; readers compare the two.
+        seq = _SEQ.unpack_from(self._map, offset)[0]
+        _SEQ.pack_into(self._map, offset, seq + 1)
+        self._map[offset + 4:offset + len(record)] = record[4:]
+        _SEQ.pack_into(self._map, offset, seq + 2)
+
+    def _write_lock(self):
+        return _FileLock(self._fd, self._thread_lock)
+
+    def __len__(self) -> int:
+        now = self.clock()
+        count = 0
+        for index in range(self.capacity):
+            offset = self._offset(index)
+            if _HASH.unpack_from(self._map, offset + 8)[0] and _SLOT_HEADER.unpack_from(self._map, offset)[3] > now:
+                count += 1
+        return count
+
+    def stats(self) -> Dict[str, float]:
+        """This process's counters, and the entries currently live across all processes."""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "size": len(self),
+            "capacity": self.capacity,
+            "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+            os.close(self._fd)
+
+    def __enter__(self) -> "SharedCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class _FileLock:
+    """Exclusive lock on the cache file across processes (and threads of this one)."""
+
+    def __init__(self, fd: int, thread_lock: threading.Lock):
+        self.fd = fd
+        self.thread_lock = thread_lock
+
+    def __enter__(self) -> None:
+        self.thread_lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info) -> None:
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.thread_lock.release()
+
+
+class RedisCache(CacheBackend):
+    """The shared cache interface over a Redis-compatible server, for deployments that already run one."""
+
+    def __init__(self, client: Any, prefix: str = "health-agent:"):
+        """
+        Args:
+            client: A `redis.Redis` client, or anything with the same get/set/delete/scan_iter methods.
+            prefix: Prepended to every key, so several deployments can share one server.
+        """
+        self.client = client
+        self.prefix = prefix
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "health-agent:") -> "RedisCache":
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("SHARED_CACHE_URL needs the optional 'redis' package: pip install redis") from e
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = self.client.get(self.prefix + key)
+        except Exception as e:
+            # An unreachable server costs a regeneration, never the turn.
+            self._counters["errors"] += 1
+            print(f"Shared cache read failed: {e}")
+            return None
+        self._counters["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float = DEFAULT_TTL) -> bool:
+        try:
+            self.client.set(self.prefix + key, value, ex=max(1, math.ceil(ttl)))
+        except Exception as e:
+            self._counters["errors"] += 1
+            print(f"Shared cache write failed: {e}")
+            return False
+        self._counters["stores"] += 1
+        return True
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {**self._counters, "hit_rate": self._counters["hits"] / lookups if lookups else 0.0}
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def open_shared_cache(env: Mapping[str, str] = os.environ) -> Optional[CacheBackend]:
+    """The backend configured by SHARED_CACHE_URL or SHARED_CACHE_PATH, or None if neither is set."""
+    url = env.get("SHARED_CACHE_URL")
+    if url:
+        return RedisCache.from_url(url)
+    return SharedCache.from_env(env)
@@ -12,10 +12,14 @@
 #     handoff_logs: List[str] = []
 #     progress_logs: List[Dict[str, str]] = []
 #context.py
-from typing import Optional, List, Dict
-from pydantic import BaseModel, Field
+from typing import Any, Optional, Iterable, List, Dict, Union
+from pydantic import BaseModel, Field, field_serializer
+import json
+import sys
 import uuid
 
+from guardrails.pii_redactor import redact, redacted_content
+
 class UserSessionContext(BaseModel):
     # Required but with defaults so instantiation won't break
     name: str = "Guest"
@@ -24,12 +28,252 @@ class UserSessionContext(BaseModel):
     # Session data
     goal: Optional[Dict] = None
     diet_preferences: Optional[str] = None
-    workout_plan: Optional[Dict] = None
-    meal_plan: Optional[List[str]] = None
+    # Rendered plans: workout lines per day, and meal lines keyed by "day_N".
+    workout_plan: Optional[Union[List[str], Dict]] = None
+    meal_plan: Optional[Union[Dict[str, List[str]], List[str]]] = None
+    # Structured per-day plan units with their input fingerprints (see planning/plan_units.py).
+    plan_units: Optional[Dict[str, Any]] = None
     injury_notes: Optional[str] = None
 
     # Logs with proper default factories (avoids shared mutable defaults)
     handoff_logs: List[str] = Field(default_factory=list)
     progress_logs: List[Dict[str, str]] = Field(default_factory=list)
     previous_response_id: Optional[str] = None
-    chat_history: List[Dict[str, str]] = Field(default_factory=list)
+    # Each turn is {"role", "content"}, plus optional render-time "meta" (see guardrails/response_pipeline.py).
+    chat_history: List[Dict[str, Any]] = Field(default_factory=list)
+
+    @field_serializer("chat_history")
+    def _redact_history(self, chat_history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Sessions are stored with PII redacted; the original wording only lives in memory.
+        return [{**turn, "content": redacted_content(turn)} for turn in chat_history]
+
+
+# --- Lean runtime representation ---
+# The pydantic model above is the schema used to validate sessions coming from
+# untrusted storage. Sessions held in memory by the server use the slotted
+# classes below: one small record per chat turn instead of a dict, interned
+# role strings, and no re-validation on every mutation or dump.
+
+_CONTEXT_FIELDS = (
+    "name", "uid", "goal", "diet_preferences", "workout_plan", "meal_plan", "plan_units", "injury_notes",
+    "handoff_logs", "progress_logs", "previous_response_id", "chat_history",
+)
+
+
+class ChatTurn:
+    """
+    A single chat message. Supports `turn["role"]` style access like the dicts it replaces.
+
+    `meta` holds render-time metadata such as disclaimers; it is stored with the
+    turn but never sent to the model. `redacted` is the content with PII
+    replaced (see guardrails/pii_redactor.py), computed on first use. It is what
+    the model is sent and what is stored; `content` keeps the original wording
+    in memory only.
+    """
+    __slots__ = ("role", "content", "meta", "redacted")
+
+    def __init__(self, role: str, content: str, meta: Optional[Dict[str, Any]] = None):
+        self.role = sys.intern(role)
+        self.content = content
+        self.meta = meta
+        self.redacted: Optional[str] = None
+
+    @classmethod
+    def from_message(cls, message: Union["ChatTurn", Dict[str, Any]]) -> "ChatTurn":
+        if isinstance(message, ChatTurn):
+            return message
+        return cls(message["role"], message["content"], message.get("meta"))
+
+    def redacted_content(self) -> str:
+        """The content with PII redacted, scanned once per turn."""
+        content = self.redacted
+        if content is None:
+            content = self.redacted = redact(self.content)
+        return content
+
+    def as_message(self) -> Dict[str, str]:
+        """The turn as model input, with PII redacted."""
+        return {"role": self.role, "content": self.redacted_content()}
+
+    def as_record(self) -> Dict[str, Any]:
+        """The turn as stored: PII redacted, metadata included."""
+        if self.meta:
+            return {"role": self.role, "content": self.redacted_content(), "meta": self.meta}
+        return {"role": self.role, "content": self.redacted_content()}
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        if key == "meta" and self.meta is not None:
+            return self.meta
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ChatTurn):
+            return self.role == other.role and self.content == other.content and self.meta == other.meta
+        if isinstance(other, dict):
+            record = {"role": self.role, "content": self.content}
+            if self.meta:
+                record["meta"] = self.meta
+            return other == record
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ChatTurn(role={self.role!r}, content={self.content!r})"
+
+
+def _to_turns(messages: Iterable[Union[ChatTurn, Dict[str, str]]]) -> List[ChatTurn]:
+    # Hot path when loading long transcripts: skips ChatTurn.__init__ per message.
+    intern = sys.intern
+    new = object.__new__
+    turns = []
+    for message in messages:
+        if isinstance(message, ChatTurn):
+            turns.append(message)
+            continue
+        turn = new(ChatTurn)
+        turn.role = intern(message["role"])
+        turn.content = message["content"]
+        turn.meta = message.get("meta")
+        turn.redacted = None
+        turns.append(turn)
+    return turns
+
+
+class ChatHistory(list):
+    """A list of ChatTurn records that converts message dicts as they are added."""
+    __slots__ = ()
+
+    def __init__(self, messages: Iterable[Union[ChatTurn, Dict[str, str]]] = ()):
+        super().__init__(_to_turns(messages))
+
+    def append(self, message: Union[ChatTurn, Dict[str, str]]) -> None:
+        super().append(ChatTurn.from_message(message))
+
+    def extend(self, messages: Iterable[Union[ChatTurn, Dict[str, str]]]) -> None:
+        super().extend(_to_turns(messages))
+
+    def as_messages(self) -> List[Dict[str, str]]:
+        return [turn.as_message() for turn in self]
+
+    def as_records(self) -> List[Dict[str, Any]]:
+        return [turn.as_record() for turn in self]
+
+
+class LeanSessionContext:
+    """
+    Slotted, low-overhead counterpart of UserSessionContext for sessions held in memory.
+
+    Exposes the same attributes and `model_dump()`, so it can be passed anywhere a
+    UserSessionContext is used. Validation only happens when loading with
+    `validate=True`, i.e. from storage we don't control.
+    """
+    __slots__ = (
+        "name", "uid", "goal", "diet_preferences", "workout_plan", "meal_plan", "plan_units", "injury_notes",
+        "handoff_logs", "progress_logs", "previous_response_id", "_chat_history",
+    )
+
+    def __init__(
+        self,
+        name: str = "Guest",
+        uid: Optional[str] = None,
+        goal: Optional[Dict] = None,
+        diet_preferences: Optional[str] = None,
+        workout_plan: Optional[Union[List[str], Dict]] = None,
+        meal_plan: Optional[Union[Dict[str, List[str]], List[str]]] = None,
+        plan_units: Optional[Dict[str, Any]] = None,
+        injury_notes: Optional[str] = None,
+        handoff_logs: Optional[List[str]] = None,
+        progress_logs: Optional[List[Dict[str, str]]] = None,
+        previous_response_id: Optional[str] = None,
+        chat_history: Optional[Iterable[Union[ChatTurn, Dict[str, str]]]] = None,
+    ):
+        self.name = name
+        self.uid = uid if uid is not None else str(uuid.uuid4())
+        self.goal = goal
+        self.diet_preferences = diet_preferences
+        self.workout_plan = workout_plan
+        self.meal_plan = meal_plan
+        self.plan_units = plan_units
+        self.injury_notes = injury_notes
+        self.handoff_logs = handoff_logs if handoff_logs is not None else []
+        self.progress_logs = progress_logs if progress_logs is not None else []
+        self.previous_response_id = previous_response_id
+        self.chat_history = chat_history or ()
+
+    @property
+    def chat_history(self) -> ChatHistory:
+        return self._chat_history
+
+    @chat_history.setter
+    def chat_history(self, messages: Iterable[Union[ChatTurn, Dict[str, str]]]) -> None:
+        self._chat_history = messages if isinstance(messages, ChatHistory) else ChatHistory(messages)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], validate: bool = True) -> "LeanSessionContext":
+        """
+        Builds a session from its stored dict form.
+
+        Args:
+            data: The dict produced by `model_dump()` / `to_dict()`.
+            validate: Run the pydantic schema first. Pass False only for data this
+                process wrote itself (e.g. an in-memory cache or its own journal).
+        """
+        if validate:
+            data = UserSessionContext(**data).model_dump()
+        return cls(**{field: data[field] for field in _CONTEXT_FIELDS if field in data})
+
+    @classmethod
+    def from_context(cls, ctx: UserSessionContext) -> "LeanSessionContext":
+        return cls(**{field: getattr(ctx, field) for field in _CONTEXT_FIELDS})
+
+    def to_context(self) -> UserSessionContext:
+        return UserSessionContext(**self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "uid": self.uid,
+            "goal": self.goal,
+            "diet_preferences": self.diet_preferences,
+            "workout_plan": self.workout_plan,
+            "meal_plan": self.meal_plan,
+            "plan_units": self.plan_units,
+            "injury_notes": self.injury_notes,
+            "handoff_logs": self.handoff_logs,
+            "progress_logs": self.progress_logs,
+            "previous_response_id": self.previous_response_id,
+            "chat_history": self._chat_history.as_records(),
+        }
+
+    # Same name as the pydantic method so storage code can treat both alike.
+    model_dump = to_dict
+
+    def dumps(self) -> str:
+        """Fast compact JSON serialization."""
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, text: str, validate: bool = True) -> "LeanSessionContext":
+        return cls.from_dict(json.loads(text), validate=validate)
+
+
+def build_model_input(ctx: Union[UserSessionContext, LeanSessionContext], user_input: str) -> List[Dict[str, str]]:
+    """Assembles the chat history plus the new user message as model input messages."""
+    # History is redacted (once per turn, see guardrails/pii_redactor.py); the new message is sent as typed.
+    # Stored dict turns may carry render-time "meta", which the model never sees.
+    messages = [
+        turn.as_message() if isinstance(turn, ChatTurn)
+        else {"role": turn["role"], "content": redacted_content(turn)}
+        for turn in ctx.chat_history
+    ]
+    messages.append({"role": "user", "content": user_input})
+    return messages
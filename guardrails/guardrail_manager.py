@@ -1,6 +1,6 @@
 # guardrails/guardrail_manager.py
 
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
 from guardrails.query_filters import (
     contains_emergency_request,
     contains_medical_diagnosis_request,
@@ -9,8 +9,8 @@ from guardrails.query_filters import (
 from guardrails.disclaimer_generator import (
     get_emergency_redirect,
     get_medical_disclaimer,
-    add_general_health_disclaimer
 )
+from guardrails.response_pipeline import GENERAL, Response, ResponsePipeline, add_disclaimer, trim_whitespace
 
 class GuardrailManager:
     OFF_TOPIC_REFUSAL_MESSAGE = (
@@ -22,6 +22,8 @@ class GuardrailManager:
     def __init__(self):
         self.medical_disclaimer_text = get_medical_disclaimer()
         self.emergency_redirect_text = get_emergency_redirect()
+        self.format_pipeline = ResponsePipeline(trim_whitespace)
+        self.response_pipeline = self.format_pipeline.then(add_disclaimer(GENERAL))
 
     def pre_process_query(self, query: str) -> Tuple[bool, Optional[str]]:
         """
@@ -36,10 +38,17 @@ class GuardrailManager:
             return False, self.OFF_TOPIC_REFUSAL_MESSAGE
         return True, None
 
+    def finalize(self, response: Union[str, Response], needs_disclaimer: bool = True) -> Response:
+        """
+        Runs the post-processing stages. Disclaimers are attached as metadata and only
+        become text when the response is rendered.
+        """
+        if needs_disclaimer:
+            return self.response_pipeline(response)
+        return self.format_pipeline(response)
+
     def post_process_response(self, response: str, needs_disclaimer: bool = True) -> str:
         """
         Applies post-processing guardrails to the response, such as adding disclaimers.
         """
-        if needs_disclaimer:
-            return add_general_health_disclaimer(response)
-        return response
+        return self.finalize(response, needs_disclaimer).render()
@@ -0,0 +1,108 @@
+# guardrails/pii_redactor.py
+"""
+Redaction of personal data in chat history before it is sent to the model
+or written to session storage.
+
+Every kind of PII is one branch of a single compiled pattern, so a message
+is scanned once however many kinds there are. Each turn is redacted once:
+`ChatTurn` keeps the result for later prompts, and sessions are saved with
+the redacted text as the turn's content, so the original wording never
+leaves memory. The message the user is typing right now is sent as typed;
+only history is redacted.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Pattern, Tuple
+
+EMAIL = "[EMAIL]"
+PHONE = "[PHONE]"
+ID = "[ID]"
+NAME = "[NAME]"
+
+# Capitalised words after an introduction cue that describe the user rather than name them.
+_NOT_A_NAME = (r"(?!(?:Vegan|Vegetarian|Pescatarian|Diabetic|Celiac|Lactose|Pregnant|Not|Trying|Going|Feeling"
+               r"|Very|Really|Currently|Still|Also|Just|So)\b)")
+
+# (group, replacement, kept prefix, value). The prefix (a label such as "my name is") stays in the text;
+# only the value is replaced.
+PII_PATTERNS: List[Tuple[str, str, str, str]] = [
+    ("email", EMAIL, "", r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+"),
+    ("ssn", ID, "", r"\b\d{3}-\d{2}-\d{4}\b"),
+    ("card", ID, "", r"\b(?:\d[ -]?){12,18}\d\b"),
+    ("labelled_id", ID,
+     r"(?i:\b(?:id|member(?:ship)?|policy|account|patient|mrn|passport|licen[cs]e|insurance)"
+     r"(?:\s+(?:id|number|no\.?))?(?:\s*[:#]|\s+is\b)?\s*)",
+     r"(?=[A-Za-z-]*\d)[A-Za-z0-9][A-Za-z0-9-]{4,}\b"),
+    ("intl_phone", PHONE, "", r"\+\d{1,3}(?:[ .-]?\d{2,4}){2,4}\b"),
+    ("phone", PHONE, "", r"(?:\(\d{3}\)|\b\d{3})[ .-]?\d{3}[ .-]?\d{4}\b"),
+    # Names are only recognised after an introduction or a title, which keeps capitalised foods
+    # and exercises ("Greek yogurt", "Romanian deadlift") out.
+    ("name", NAME,
+     r"(?:\b(?i:my name is|my name's|call me)\s+|\b(?:Mr|Mrs|Ms|Miss|Dr)\.?\s+)",
+     _NOT_A_NAME + r"[A-Z][a-z]+(?:[ -][A-Z][a-z]+)?"),
+    # Not after "I am" / "I'm": what follows is mostly health context ("I am Type Two diabetic",
+    # "I'm New York based"), and the stored history keeps only the redacted text.
+]
+
+
+# Every match contains a digit or "@", or starts with one of these, so text without any of them (most
+# assistant replies) skips the matcher. Both checks run as C-level scans.
+_TRIGGER = re.compile(r"[\d@]")
+_TITLES = ("Mr", "Ms", "Miss", "Dr")
+_CUES = ("name", "call me")
+
+
+@lru_cache(maxsize=None)
+def _matcher() -> Tuple[Pattern[str], Dict[str, str]]:
+    # Compiled on first use so importing the guardrails stays cheap at startup.
+    branches = "|".join(f"{prefix}(?P<{group}>{value})" for group, _, prefix, value in PII_PATTERNS)
+    # Every match starts a word (or a "(" / "+" phone prefix). Checking that once up front spares the
+    # engine trying each branch at every position inside words, which roughly halves the scan time.
+    pattern = rf"(?=[\w(+])(?<!\w)(?:{branches})"
+    return re.compile(pattern), {group: replacement for group, replacement, _, _ in PII_PATTERNS}
+
+
+def _may_contain_pii(text: str) -> bool:
+    if _TRIGGER.search(text) or any(title in text for title in _TITLES):
+        return True
+    lower = text.lower()
+    return any(cue in lower for cue in _CUES)
+
+
+def _replace(match: "re.Match[str]") -> str:
+    group = match.lastgroup
+    # Everything the match covered before the value is its label, which is kept.
+    return match.string[match.start():match.start(group)] + _matcher()[1][group]
+
+
+def redact(text: str) -> str:
+    """
+    Replaces emails, phone numbers, IDs and introduced names with placeholders.
+
+    Args:
+        text: A chat message.
+
+    Returns:
+        The redacted text; the same object when there was nothing to redact.
+    """
+    if not _may_contain_pii(text):
+        return text
+    return _matcher()[0].sub(_replace, text)
+
+
+# Turns held as plain dicts (UserSessionContext) have nowhere to keep their redacted form, so it is
+# remembered here instead of being scanned again on every prompt and every save.
+_cached_redact = lru_cache(maxsize=4096)(redact)
+
+
+def redacted_content(turn: Mapping[str, Any]) -> str:
+    """
+    The content of a dict history turn with PII redacted, as sent to the model and stored.
+
+    Args:
+        turn: A {"role", "content"[, "meta"]} history entry.
+
+    Returns:
+        The redacted content.
+    """
+    return _cached_redact(turn["content"])
@@ -0,0 +1,139 @@
+# guardrails/response_pipeline.py
+"""
+Response post-processing as a pipeline of composable stages.
+
+A `Response` is a list of body segments plus render-time metadata (the
+disclaimers to show). Stages append segments or metadata and never re-join
+the text. `render()` joins everything once, for display only. The body
+without disclaimers is what goes into chat history, so later prompts do not
+resend the same boilerplate every turn. Stored turns keep the disclaimer keys
+under "meta", and `render_turn` shows them again when a transcript is
+displayed.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Sequence, Union
+
+from guardrails.disclaimer_generator import GENERAL_HEALTH_DISCLAIMER, MEDICAL_DISCLAIMER
+
+GENERAL = "general"
+MEDICAL = "medical"
+DISCLAIMERS = {GENERAL: GENERAL_HEALTH_DISCLAIMER, MEDICAL: MEDICAL_DISCLAIMER}
+
+
+class Response:
+    """Body segments joined by newlines at render time, plus the disclaimers to show after them."""
+    __slots__ = ("parts", "disclaimers")
+
+    def __init__(self, *parts: str, disclaimers: Iterable[str] = ()):
+        self.parts: List[str] = list(parts)
+        self.disclaimers: List[str] = list(disclaimers)
+
+    @classmethod
+    def of(cls, response: Union[str, "Response"]) -> "Response":
+        return response if isinstance(response, Response) else cls(response)
+
+    def add(self, *parts: str) -> "Response":
+        """Appends lines to the body."""
+        self.parts.extend(parts)
+        return self
+
+    def paragraph(self, *parts: str) -> "Response":
+        """Appends lines after a blank line (an empty segment renders as one)."""
+        if self.parts:
+            self.parts.append("")
+        self.parts.extend(parts)
+        return self
+
+    def extend(self, other: Union[str, "Response"]) -> "Response":
+        """Appends another response as a new paragraph, merging its disclaimers."""
+        other = Response.of(other)
+        self.paragraph(*other.parts)
+        for key in other.disclaimers:
+            self.disclaim(key)
+        return self
+
+    def disclaim(self, key: str) -> "Response":
+        if key not in self.disclaimers:
+            self.disclaimers.append(key)
+        return self
+
+    @property
+    def body(self) -> str:
+        """The text without disclaimers: what is stored in history and sent back to the model."""
+        return "\n".join(self.parts)
+
+    def render(self) -> str:
+        """The text shown to the user, built with one join over body and disclaimers."""
+        return render(self.parts, self.disclaimers)
+
+    def __repr__(self) -> str:
+        return f"Response(parts={len(self.parts)}, disclaimers={self.disclaimers!r})"
+
+
+Stage = Callable[[Response], Response]
+
+
+def render(parts: Sequence[str], disclaimers: Sequence[str] = ()) -> str:
+    """Joins body lines and disclaimer texts in a single join."""
+    if not disclaimers:
+        return "\n".join(parts)
+    segments = list(parts)
+    for key in disclaimers:
+        # An empty segment before each disclaimer renders as the blank line that separates it.
+        segments.append("")
+        segments.append(DISCLAIMERS[key])
+    return "\n".join(segments)
+
+
+def add_disclaimer(key: str = GENERAL) -> Stage:
+    """A stage that attaches a disclaimer as metadata."""
+    if key not in DISCLAIMERS:
+        raise ValueError(f"Unknown disclaimer {key!r}; expected one of {sorted(DISCLAIMERS)}.")
+
+    def stage(response: Response) -> Response:
+        return response.disclaim(key)
+    return stage
+
+
+def trim_whitespace(response: Response) -> Response:
+    """Strips whitespace around the body (e.g. a model's trailing newline) without touching the middle."""
+    parts = response.parts
+    if parts and parts[0][:1].strip() and parts[-1][-1:].strip():
+        return response  # Nothing to trim: the common case.
+    while parts and not parts[0].strip():
+        parts.pop(0)
+    while parts and not parts[-1].strip():
+        parts.pop()
+    if parts:
+        parts[0] = parts[0].lstrip()
+        parts[-1] = parts[-1].rstrip()
+    return response
+
+
+class ResponsePipeline:
+    """Applies its stages in order; `then()` builds a longer pipeline without changing this one."""
+
+    def __init__(self, *stages: Stage):
+        self.stages = stages
+
+    def then(self, *stages: Stage) -> "ResponsePipeline":
+        return ResponsePipeline(*self.stages, *stages)
+
+    def __call__(self, response: Union[str, Response]) -> Response:
+        response = Response.of(response)
+        for stage in self.stages:
+            response = stage(response)
+        return response
+
+
+def history_turn(result: Mapping[str, Any]) -> Dict[str, Any]:
+    """The assistant turn to store for an agent result: the lean body, with disclaimers as metadata."""
+    turn: Dict[str, Any] = {"role": "assistant", "content": result.get("body", result.get("response", ""))}
+    if result.get("disclaimers"):
+        turn["meta"] = {"disclaimers": list(result["disclaimers"])}
+    return turn
+
+
+def render_turn(turn: Mapping[str, Any]) -> str:
+    """Display text of a stored turn, with the disclaimers its metadata lists."""
+    meta = turn.get("meta") or {}
+    return render([turn["content"]], meta.get("disclaimers", ()))
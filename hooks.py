@@ -9,3 +9,6 @@ class RunHooks:
 
     async def on_handoff(self, from_agent: str, to_agent: str, context):
         print(f"[HOOK] Handoff from {from_agent} to {to_agent} with context={context}")
+
+    async def on_degrade(self, step: str, fallback: str):
+        print(f"[HOOK] Turn budget ran short: {step} degraded to {fallback}")
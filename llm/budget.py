@@ -0,0 +1,140 @@
+# llm/budget.py
+"""
+Per-turn latency budget.
+
+`HealthPlannerAgent.run` opens one `TurnBudget` per turn and makes it the
+current budget for everything awaited inside the turn. `BudgetedModel`
+wraps the model, so every `get_response` call made by the agent or by a
+tool is cancelled once the turn's deadline passes. Before an optional step,
+the agent checks `allows(seconds)`. When too little time is left, it skips
+the step or serves a fallback and records the degradation in the turn's
+trace.
+"""
+import contextlib
+import contextvars
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+# End-to-end budget for one turn. Gemini Flash answers in about 1-2 s at p50, so
+# this leaves room for the usual two or three calls and cuts off the slow tail.
+DEFAULT_TURN_BUDGET_S = 8.0
+# Time a typical model call needs; optional calls are skipped when less is left.
+MODEL_CALL_ESTIMATE_S = 2.0
+# Kept back from every call for post-processing and the fallback path.
+RESPONSE_RESERVE_S = 0.25
+
+_current: contextvars.ContextVar[Optional["TurnBudget"]] = contextvars.ContextVar("turn_budget", default=None)
+
+
+class BudgetExceeded(TimeoutError):
+    """Raised when a step cannot finish inside the turn's remaining budget."""
+
+
+class TurnBudget:
+    """A deadline for one turn plus a trace of the steps run and degraded under it."""
+
+    def __init__(self, seconds: float = DEFAULT_TURN_BUDGET_S, clock: Callable[[], float] = time.monotonic):
+        self.seconds = seconds
+        self.clock = clock
+        self.started = clock()
+        self.deadline = self.started + seconds
+        self.trace: List[Dict[str, Any]] = []
+
+    def elapsed(self) -> float:
+        return self.clock() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - self.clock())
+
+    def allows(self, seconds: float) -> bool:
+        """True if at least `seconds` are left, after the response reserve."""
+        return self.remaining() - RESPONSE_RESERVE_S >= seconds
+
+    async def run(self, awaitable: Awaitable, step: str) -> Any:
+        """
+        Awaits `awaitable`, cancelling it when the budget runs out.
+
+        Args:
+            awaitable: The model or tool call.
+            step: Name recorded in the trace.
+
+        Returns:
+            The awaitable's result.
+
+        Raises:
+            BudgetExceeded: If the call did not finish before the deadline minus the response reserve.
+        """
+        import asyncio  # Deferred: importing asyncio would dominate `import agent` (see bench_startup).
+
+        timeout = self.remaining() - RESPONSE_RESERVE_S
+        started = self.clock()
+        if timeout <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            self._record(step, "skipped", started)
+            raise BudgetExceeded(f"no budget left for {step}")
+        try:
+            result = await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            self._record(step, "timeout", started)
+            raise BudgetExceeded(f"{step} did not finish within {timeout:.2f}s") from None
+        self._record(step, "ok", started)
+        return result
+
+    def degrade(self, step: str, fallback: str) -> None:
+        """Records that `step` was cut short and what was served instead."""
+        self.trace.append({"step": step, "status": "degraded", "fallback": fallback,
+                           "at_ms": round(self.elapsed() * 1000, 1)})
+
+    @property
+    def degradations(self) -> List[Dict[str, Any]]:
+        return [event for event in self.trace if event["status"] == "degraded"]
+
+    def _record(self, step: str, status: str, started: float) -> None:
+        self.trace.append({"step": step, "status": status,
+                           "duration_ms": round((self.clock() - started) * 1000, 1)})
+
+
+def current_budget() -> Optional[TurnBudget]:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def use_budget(budget: TurnBudget) -> Iterator[TurnBudget]:
+    """Makes `budget` the current budget for the calls made inside the block."""
+    token = _current.set(budget)
+    try:
+        yield budget
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def no_budget() -> Iterator[None]:
+    """Runs the calls inside the block outside any turn, e.g. one request shared by several turns."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class BudgetedModel:
+    """
+    Wraps a model so `get_response` runs under the current turn budget.
+
+    Outside a turn (no current budget) calls pass straight through. Everything
+    else is delegated to the wrapped model.
+    """
+
+    def __init__(self, model: Any):
+        self._model = model
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
+
+    async def get_response(self, *args, **kwargs) -> Any:
+        budget = current_budget()
+        if budget is None:
+            return await self._model.get_response(*args, **kwargs)
+        return await budget.run(self._model.get_response(*args, **kwargs), "get_response")
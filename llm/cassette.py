@@ -0,0 +1,245 @@
+# llm/cassette.py
+"""
+Record/replay of model calls.
+
+`CassetteModel` wraps a model. In record mode it passes every `get_response`
+and `stream_response` call through and appends the response to a cassette
+file. Each stored entry holds the request fingerprint, the output items and
+usage (or the stream events), and the timings. In replay mode it serves the
+recorded response for the same fingerprint without calling any model, so
+agent benchmarks and regression gates run without network access. Replay can
+also sleep for the recorded latency (and between stream events), scaled by
+`latency_scale`, so timing-sensitive paths see realistic delays.
+
+A cassette is a gzip file of JSON lines. Each recorded call is appended as
+its own gzip member, so recording never rewrites the file and a crash loses
+at most the call in flight.
+
+The fingerprint covers everything that decides the answer: the cassette's
+`name` (the model tier), system instructions, input, model settings, tool
+and handoff names, output schema and previous response ID. When one request
+was recorded several times, replay serves the recordings in order and then
+starts over.
+"""
+import functools
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
+
+RECORD = "record"
+REPLAY = "replay"
+# Replays what the cassette has and records the rest.
+AUTO = "auto"
+MODES = (RECORD, REPLAY, AUTO)
+
+_ARG_NAMES = ("system_instructions", "input", "model_settings", "tools", "output_schema", "handoffs", "tracing")
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when the cassette has no recording for a request."""
+
+
+def _call_args(args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return {**dict(zip(_ARG_NAMES, args)), **kwargs}
+
+
+def fingerprint(name: str, call: Dict[str, Any]) -> str:
+    """Stable hash of the parts of a model call that decide its response."""
+    settings = call.get("model_settings")
+    schema = call.get("output_schema")
+    request = {
+        "name": name,
+        "system_instructions": call.get("system_instructions"),
+        "input": call.get("input"),
+        "model_settings": settings.to_json_dict() if hasattr(settings, "to_json_dict") else settings,
+        "tools": [getattr(tool, "name", str(tool)) for tool in call.get("tools") or []],
+        "handoffs": [getattr(handoff, "tool_name", str(handoff)) for handoff in call.get("handoffs") or []],
+        "output_schema": schema.name() if schema is not None else None,
+        "previous_response_id": call.get("previous_response_id"),
+    }
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _dump_response(response: Any) -> Dict[str, Any]:
+    usage = response.usage
+    return {
+        "output": [item.model_dump(mode="json") for item in response.output],
+        "usage": {
+            "requests": usage.requests,
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "total_tokens": usage.total_tokens,
+            "cached_tokens": getattr(usage.input_tokens_details, "cached_tokens", 0),
+            "reasoning_tokens": getattr(usage.output_tokens_details, "reasoning_tokens", 0),
+        },
+        "response_id": response.response_id,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _adapter(kind: str) -> Any:
+    # Building a TypeAdapter for these unions takes tens of milliseconds, so each is built once.
+    from openai.types.responses import ResponseOutputItem, ResponseStreamEvent
+    from pydantic import TypeAdapter
+
+    return TypeAdapter(ResponseOutputItem if kind == "response" else ResponseStreamEvent)
+
+
+def _load_response(data: Dict[str, Any]) -> Any:
+    from agents.items import ModelResponse
+    from agents.usage import Usage
+    from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+    usage = data["usage"]
+    return ModelResponse(
+        output=[_adapter("response").validate_python(item) for item in data["output"]],
+        usage=Usage(
+            requests=usage["requests"],
+            input_tokens=usage["input_tokens"],
+            output_tokens=usage["output_tokens"],
+            total_tokens=usage["total_tokens"],
+            input_tokens_details=InputTokensDetails(cached_tokens=usage.get("cached_tokens", 0)),
+            output_tokens_details=OutputTokensDetails(reasoning_tokens=usage.get("reasoning_tokens", 0)),
+        ),
+        response_id=data.get("response_id"),
+    )
+
+
+def _load_event(data: Dict[str, Any]) -> Any:
+    return _adapter("stream").validate_python(data)
+
+
+class CassetteModel:
+    """A model that records its calls to a cassette file, or replays them from it."""
+
+    def __init__(
+        self,
+        path: str,
+        model: Any = None,
+        mode: str = REPLAY,
+        name: str = "",
+        latency_scale: float = 0.0,
+    ):
+        """
+        Args:
+            path: The cassette file (gzip JSON lines); created on the first recording.
+            model: The model to record; not needed for replay.
+            mode: RECORD, REPLAY or AUTO.
+            name: Part of every fingerprint, so tiers sharing a cassette keep separate recordings.
+            latency_scale: In replay, sleep for this fraction of the recorded latency (0 for none, 1 for the original).
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {MODES}.")
+        if mode != REPLAY and model is None:
+            raise ValueError(f"Cassette mode {mode!r} needs a model to record.")
+        self.path = path
+        self.mode = mode
+        self.name = name
+        self.latency_scale = latency_scale
+        self._model = model
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.recorded = 0
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["fingerprint"], []).append(entry)
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str], model: Any = None, name: str = "") -> Optional["CassetteModel"]:
+        """
+        The cassette configured by MODEL_CASSETTE (path), MODEL_CASSETTE_MODE (default replay)
+        and MODEL_CASSETTE_LATENCY (replay latency scale), or None when MODEL_CASSETTE is unset.
+        """
+        path = env.get("MODEL_CASSETTE")
+        if not path:
+            return None
+        return cls(path, model, mode=env.get("MODEL_CASSETTE_MODE", REPLAY), name=name,
+                   latency_scale=float(env.get("MODEL_CASSETTE_LATENCY", 0.0)))
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def __getattr__(self, name: str) -> Any:
+        if self._model is None:
+            raise AttributeError(name)
+        return getattr(self._model, name)
+
+    async def get_response(self, *args, **kwargs) -> Any:
+        """Same call as `Model.get_response`, served from or recorded to the cassette."""
+        key = fingerprint(self.name, _call_args(args, kwargs))
+        entry = self._replay_entry(key, "response")
+        if entry is not None:
+            await self._sleep(entry["latency_s"])
+            return _load_response(entry["response"])
+
+        started = time.perf_counter()
+        response = await self._model.get_response(*args, **kwargs)
+        self._append({"fingerprint": key, "kind": "response", "latency_s": time.perf_counter() - started,
+                      "response": _dump_response(response)})
+        return response
+
+    async def stream_response(self, *args, **kwargs) -> AsyncIterator[Any]:
+        """Same call as `Model.stream_response`; replay reproduces the recorded event timing."""
+        import asyncio  # Deferred: importing asyncio would dominate `import agent` (see bench_startup).
+
+        key = fingerprint(self.name, _call_args(args, kwargs))
+        entry = self._replay_entry(key, "stream")
+        if entry is not None:
+            started = time.perf_counter()
+            for event in entry["events"]:
+                if self.latency_scale:
+                    await asyncio.sleep(max(0.0, event["at_s"] * self.latency_scale - (time.perf_counter() - started)))
+                yield _load_event(event["event"])
+            return
+
+        started = time.perf_counter()
+        events = []
+        async for event in self._model.stream_response(*args, **kwargs):
+            events.append({"at_s": time.perf_counter() - started, "event": event.model_dump(mode="json")})
+            yield event
+        self._append({"fingerprint": key, "kind": "stream", "latency_s": time.perf_counter() - started,
+                      "events": events})
+
+    def stats(self) -> Dict[str, float]:
+        return {"entries": len(self), "hits": self.hits, "recorded": self.recorded}
+
+    def _replay_entry(self, key: str, kind: str) -> Optional[Dict[str, Any]]:
+        if self.mode == RECORD:
+            return None
+        with self._lock:
+            entries = [entry for entry in self._entries.get(key, []) if entry["kind"] == kind]
+            if not entries:
+                if self.mode == REPLAY:
+                    raise CassetteMiss(f"No {kind} recorded for this request in {self.path}; record it first.")
+                return None
+            cursor = self._cursor.get(key, 0)
+            self._cursor[key] = cursor + 1
+            self.hits += 1
+            return entries[cursor % len(entries)]
+
+    async def _sleep(self, seconds: float) -> None:
+        if self.latency_scale:
+            import asyncio
+
+            await asyncio.sleep(seconds * self.latency_scale)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._entries.setdefault(entry["fingerprint"], []).append(entry)
+            self.recorded += 1
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(gzip.compress(line.encode(), mtime=0))
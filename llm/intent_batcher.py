@@ -0,0 +1,264 @@
+# llm/intent_batcher.py
+"""
+Micro-batching for the intent classifier.
+
+Under load, turns from many users reach intent classification within a few
+milliseconds of each other. `IntentBatcher` collects those classifications
+for up to `max_wait_ms`, or until `max_batch` are pending, and sends them as
+one request with the "intent_batch" prompt. That prompt answers with a JSON
+array of labels in order, and each label is handed back to its waiting turn.
+
+When no classification is in flight, a new one is sent at once as the
+ordinary single-query request. An idle server therefore sees the same
+requests, with no added latency. Batching only starts once requests overlap.
+
+    INTENT_BATCH_SIZE     most classifications per request (default 16; 1 disables batching)
+    INTENT_BATCH_WAIT_MS  longest a classification waits for others (default 5)
+
+If a batched answer does not hold one label per query, each query of that
+batch is classified on its own instead.
+
+Batches never span event loops. The Streamlit app shares one agent between
+script threads that each run their turn with `asyncio.run`. So the queue,
+timer and in-flight count are kept per loop, and every future is resolved
+on the loop that awaits it.
+"""
+import json
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from llm.budget import current_budget, no_budget
+from llm.prompts import PROMPTS
+from llm.tracing import ModelTracing
+
+DEFAULT_MAX_BATCH = 16
+DEFAULT_MAX_WAIT_MS = 5.0
+# History sent with each query of a batch: enough to resolve "tell me more about that" without
+# resending every user's whole conversation.
+BATCH_CONTEXT_MESSAGES = 2
+BATCH_CONTEXT_CHARS = 300
+
+
+def _request(system_instructions: str, messages: List[Dict[str, str]],
+             previous_response_id: Optional[str] = None) -> Dict[str, Any]:
+    from agents import ModelSettings
+
+    return dict(
+        system_instructions=system_instructions,
+        input=messages,
+        model_settings=ModelSettings(temperature=0.0),
+        tools=[],
+        output_schema=None,
+        handoffs=[],
+        tracing=ModelTracing.DISABLED,
+        previous_response_id=previous_response_id,
+    )
+
+
+def _response_text(response_obj: Any) -> Optional[str]:
+    if response_obj and getattr(response_obj, 'output', None):
+        content = getattr(response_obj.output[0], 'content', None)
+        if content and hasattr(content[0], 'text'):
+            return content[0].text.strip()
+    return None
+
+
+def batch_input(conversations: List[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    """
+    The single user message of a batched request.
+
+    Args:
+        conversations: Model input of each turn, as built by `build_model_input` (the query last).
+
+    Returns:
+        One message whose content is a JSON array of {"id", "context", "query"} objects.
+    """
+    items = []
+    for i, messages in enumerate(conversations):
+        context = [
+            {"role": message["role"], "content": message["content"][:BATCH_CONTEXT_CHARS]}
+            for message in messages[-1 - BATCH_CONTEXT_MESSAGES:-1]
+        ]
+        items.append({"id": i, "context": context, "query": messages[-1]["content"]})
+    return [{"role": "user", "content": json.dumps(items, ensure_ascii=False)}]
+
+
+def parse_labels(text: str, count: int) -> Optional[List[str]]:
+    """The labels of a batched answer, or None unless it is a JSON array of exactly `count` labels."""
+    text = text.strip()
+    if text.startswith("```"):
+        # Models sometimes wrap JSON in a fenced block despite the instructions.
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        labels = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(labels, dict):
+        labels = labels.get("labels")
+    if not isinstance(labels, list) or len(labels) != count:
+        return None
+    return [str(label).strip() for label in labels]
+
+
+class _Pending:
+    __slots__ = ("messages", "previous_response_id", "future")
+
+    def __init__(self, messages: List[Dict[str, str]], previous_response_id: Optional[str], future: Any):
+        self.messages = messages
+        self.previous_response_id = previous_response_id
+        self.future = future
+
+
+class _LoopQueue:
+    """The batching state of one event loop."""
+    __slots__ = ("pending", "timer", "in_flight", "tasks")
+
+    def __init__(self):
+        self.pending: List[_Pending] = []
+        self.timer: Any = None
+        self.in_flight = 0
+        self.tasks: set = set()
+
+
+class IntentBatcher:
+    """Collects concurrent intent classifications and sends them as batched requests."""
+
+    def __init__(self, model: Callable[[], Any], max_batch: int = DEFAULT_MAX_BATCH,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        """
+        Args:
+            model: Returns the classifier model at send time, so a replaced model is picked up.
+            max_batch: Most classifications per request; 1 sends each one on its own.
+            max_wait_ms: Longest a classification waits for others to share its request.
+        """
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be at least 1, got {max_batch}.")
+        self._model = model
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        # Keyed weakly by loop, so the loop of a finished `asyncio.run` takes its queue with it.
+        self._queues: "weakref.WeakKeyDictionary[Any, _LoopQueue]" = weakref.WeakKeyDictionary()
+        self._queues_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_env(cls, model: Callable[[], Any], env: Mapping[str, str] = os.environ) -> "IntentBatcher":
+        return cls(
+            model,
+            max_batch=int(env.get("INTENT_BATCH_SIZE", DEFAULT_MAX_BATCH)),
+            max_wait_ms=float(env.get("INTENT_BATCH_WAIT_MS", DEFAULT_MAX_WAIT_MS)),
+        )
+
+    async def classify(self, messages: List[Dict[str, str]],
+                       previous_response_id: Optional[str] = None) -> Optional[str]:
+        """
+        Classifies one turn, sharing a request with other turns classified at about the same time.
+
+        Args:
+            messages: The turn's model input, the query last.
+            previous_response_id: Passed through when the turn is sent on its own.
+
+        Returns:
+            The label the model answered with, or None if it answered nothing usable.
+
+        Raises:
+            BudgetExceeded: If the current turn's budget runs out while waiting.
+        """
+        import asyncio  # Deferred: importing asyncio would dominate `import agent` (see bench_startup).
+
+        loop = asyncio.get_running_loop()
+        queue = self._queue(loop)
+        if self.max_batch == 1 or (queue.in_flight == 0 and not queue.pending):
+            queue.in_flight += 1
+            try:
+                return await self._classify_one(messages, previous_response_id)
+            finally:
+                queue.in_flight -= 1
+
+        future = loop.create_future()
+        queue.pending.append(_Pending(messages, previous_response_id, future))
+        if len(queue.pending) >= self.max_batch:
+            self._flush(queue)
+        elif queue.timer is None:
+            queue.timer = loop.call_later(self.max_wait_ms / 1000, self._flush, queue)
+
+        budget = current_budget()
+        if budget is None:
+            return await future
+        # The request is shared, so running out of time stops this turn's wait, not the request.
+        return await budget.run(asyncio.shield(future), "classify_batch")
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "batched_items": self.batched_items,
+            "mean_batch_size": self.batched_items / self.batches if self.batches else 0.0,
+            "fallbacks": self.fallbacks,
+        }
+
+    def _queue(self, loop: Any) -> _LoopQueue:
+        with self._queues_lock:
+            queue = self._queues.get(loop)
+            if queue is None:
+                queue = self._queues[loop] = _LoopQueue()
+            return queue
+
+    def _flush(self, queue: _LoopQueue) -> None:
+        import asyncio
+
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+        batch, queue.pending = queue.pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._send(queue, batch))
+            queue.tasks.add(task)
+            task.add_done_callback(queue.tasks.discard)
+
+    async def _send(self, queue: _LoopQueue, batch: List[_Pending]) -> None:
+        queue.in_flight += 1
+        try:
+            # The request serves several turns, so no single turn's deadline may cancel it.
+            with no_budget():
+                if len(batch) == 1:
+                    labels = [await self._classify_one(batch[0].messages, batch[0].previous_response_id)]
+                else:
+                    labels = await self._classify_batch(batch)
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        finally:
+            queue.in_flight -= 1
+        for pending, label in zip(batch, labels):
+            if not pending.future.done():
+                pending.future.set_result(label)
+
+    async def _classify_one(self, messages: List[Dict[str, str]],
+                            previous_response_id: Optional[str]) -> Optional[str]:
+        self.requests += 1
+        response_obj = await self._model().get_response(
+            **_request(PROMPTS.render("intent"), messages, previous_response_id))
+        return _response_text(response_obj)
+
+    async def _classify_batch(self, batch: List[_Pending]) -> List[Optional[str]]:
+        import asyncio
+
+        self.requests += 1
+        self.batches += 1
+        self.batched_items += len(batch)
+        response_obj = await self._model().get_response(
+            **_request(PROMPTS.render("intent_batch"), batch_input([pending.messages for pending in batch])))
+        labels = parse_labels(_response_text(response_obj) or "", len(batch))
+        if labels is not None:
+            return labels
+        self.fallbacks += 1
+        return list(await asyncio.gather(
+            *(self._classify_one(pending.messages, pending.previous_response_id) for pending in batch)))
@@ -0,0 +1,212 @@
+# llm/mock_server.py
+"""
+A local, OpenAI-compatible chat-completions server for offline benchmarks.
+
+Point an `AsyncOpenAI` client at `MockModelServer.base_url` and the regular
+`OpenAIChatCompletionsModel` code path runs end to end without network access.
+Responses are deterministic and each request can be delayed to simulate
+provider latency.
+
+Run standalone with: python -m llm.mock_server --port 8808 --latency 0.2
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+Responder = Callable[[List[Dict]], str]
+
+_INTENT_RULES = [
+    ("handle_injury", r"\b(hurt|injur\w*|pain|sprain\w*|sore)\b"),
+    ("log_water", r"\b(water|drank|ml|hydrat\w*)\b"),
+    ("ask_meal_plan", r"\b(meal|diet|eat|food|breakfast|lunch|dinner)\b"),
+    ("ask_workout_plan", r"\b(workout|exercises?|routine|training|gym)\b"),
+    ("set_or_update_goal", r"\b(goal|lose|gain|want to|build muscle|get fit)\b"),
+    ("ask_general_question", r"\b(what|why|how|tell me|can you)\b"),
+]
+
+
+def _text(content) -> str:
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def classify_intent(text: str) -> str:
+    """Keyword stand-in for the intent classifier prompt."""
+    lowered = text.lower()
+    for intent, pattern in _INTENT_RULES:
+        if re.search(pattern, lowered):
+            return intent
+    return "other"
+
+
+def default_responder(messages: List[Dict]) -> str:
+    """Returns a deterministic reply shaped like the one the real prompt expects."""
+    system = " ".join(_text(m.get("content")) for m in messages if m.get("role") in ("system", "developer"))
+    user_turns = [_text(m.get("content")) for m in messages if m.get("role") == "user"]
+    last_user = user_turns[-1] if user_turns else ""
+
+    if "classifying user intent" in system:
+        if "Batch mode" in system:
+            return json.dumps([classify_intent(item["query"]) for item in json.loads(last_user)])
+        return classify_intent(last_user)
+    if "check-in message template" in system:
+        return (
+            "Hi {name}! Time for your {cadence} check-in on your {goal} goal. "
+            "How has the past stretch gone? Reply with any wins or struggles and we'll adjust your plan."
+        )
+    if "diet preferences" in system:
+        return "None"
+    return f"Mock response to: {last_user}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_MockHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        owner = self.server.owner
+        owner._record_request()
+        if owner.latency:
+            time.sleep(owner.latency)
+
+        messages = body.get("messages", [])
+        text = owner.responder(messages)
+        model = body.get("model", "mock-model")
+        prompt_tokens = sum(len(_text(m.get("content")).split()) for m in messages)
+        completion_tokens = len(text.split())
+
+        if body.get("stream"):
+            self._send_stream(model, text)
+            return
+
+        payload = {
+            "id": f"chatcmpl-mock-{owner.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, model: str, text: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        created = int(time.time())
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": "chatcmpl-mock-stream",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"role": "assistant", "content": word if i == 0 else " " + word},
+                    "finish_reason": None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        final = {
+            "id": "chatcmpl-mock-stream",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    owner: "MockModelServer"
+
+
+class MockModelServer:
+    """
+    Background-thread HTTP server speaking the chat-completions protocol.
+
+    Usage:
+        with MockModelServer(latency=0.05) as server:
+            client = AsyncOpenAI(api_key="mock", base_url=server.base_url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 responder: Optional[Responder] = None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.responder = responder or default_responder
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._httpd: Optional[_MockHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1/"
+
+    def _record_request(self):
+        with self._count_lock:
+            self.request_count += 1
+
+    def start(self) -> "MockModelServer":
+        self._httpd = _MockHTTPServer((self.host, self.port), _Handler)
+        self._httpd.owner = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "MockModelServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the local mock model server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to delay each response.")
+    args = parser.parse_args()
+    server = MockModelServer(args.host, args.port, args.latency).start()
+    print(f"Mock model server listening on {server.base_url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
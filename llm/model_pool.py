@@ -0,0 +1,205 @@
+# llm/model_pool.py
+"""
+Model client pool spanning several API keys and/or endpoints.
+
+Each member wraps its own `OpenAIChatCompletionsModel` and tracks its own
+requests-per-minute window, in-flight calls and health. `get_response` routes
+each call to the least-loaded healthy member, with load weighted by the
+member's share of capacity. A 429 or 5xx puts the member on cooldown (the
+provider's Retry-After when given, else exponential from `COOLDOWN_S`) and
+the call is retried on another member. The pool has the same
+`get_response` signature as a single model, so the agent and tools use it
+unchanged, and throughput grows with the number of keys configured.
+
+Configuration (see `ModelPool.from_env`):
+    GEMINI_API_KEYS   comma-separated keys; falls back to GEMINI_API_KEY
+    GEMINI_MODEL      model name, default models/gemini-2.0-flash
+    GEMINI_BASE_URLS  comma-separated endpoints, paired with the keys in order
+                      (a single URL applies to every key)
+    GEMINI_RPM        requests per minute allowed per key (unset: no client-side limit,
+                      the provider's 429s alone drive cooldown)
+"""
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+DEFAULT_MODEL = "models/gemini-2.0-flash"
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+COOLDOWN_S = 15.0
+MAX_COOLDOWN_S = 300.0
+_WINDOW_S = 60.0
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits and provider-side failures are worth retrying on another key."""
+    status = _status_code(error)
+    return status is not None and (status == 429 or status >= 500)
+
+
+@dataclass
+class PoolMember:
+    name: str
+    model: Any
+    weight: float = 1.0
+    # Requests per minute; None leaves rate limiting to the provider.
+    rpm: Optional[int] = None
+    inflight: int = 0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    cooldown_until: float = 0.0
+    _recent: deque = field(default_factory=deque, repr=False)
+
+    def _trim(self, now: float) -> None:
+        while self._recent and self._recent[0] <= now - _WINDOW_S:
+            self._recent.popleft()
+
+    def available_at(self, now: float) -> float:
+        """Earliest time this member may take a request: after its cooldown and within its RPM."""
+        self._trim(now)
+        at = max(now, self.cooldown_until)
+        if self.rpm is not None and len(self._recent) >= self.rpm:
+            at = max(at, self._recent[len(self._recent) - self.rpm] + _WINDOW_S)
+        return at
+
+    def load(self, now: float) -> float:
+        self._trim(now)
+        return (self.inflight + len(self._recent)) / ((self.rpm or 1) * self.weight)
+
+
+class ModelPool:
+    """Routes model calls across keys and endpoints by weighted least load, with cooldown on errors."""
+
+    def __init__(self, members: Sequence[PoolMember], clock: Callable[[], float] = time.monotonic):
+        if not members:
+            raise ValueError("A model pool needs at least one member.")
+        self.members = list(members)
+        self.clock = clock
+
+    @classmethod
+    def from_keys(
+        cls,
+        api_keys: Sequence[str],
+        model: str = DEFAULT_MODEL,
+        base_urls: Sequence[str] = (DEFAULT_BASE_URL,),
+        rpm: Optional[int] = None,
+        weights: Optional[Sequence[float]] = None,
+    ) -> "ModelPool":
+        """Builds one client per key; `base_urls` pairs with the keys in order, or one URL serves all."""
+        from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+
+        members = []
+        for i, key in enumerate(api_keys):
+            base_url = base_urls[i] if len(base_urls) > 1 else base_urls[0]
+            # No SDK retries: a 429 or 5xx must reach the pool at once, so its cooldown and failover decide.
+            client = AsyncOpenAI(api_key=key, base_url=base_url, max_retries=0)
+            members.append(PoolMember(
+                # Only the key's tail is kept, so stats and logs never carry the secret.
+                name=f"key{i}-{key[-4:]}",
+                model=OpenAIChatCompletionsModel(model=model, openai_client=client),
+                weight=weights[i] if weights else 1.0,
+                rpm=rpm,
+            ))
+        return cls(members)
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ, model: Optional[str] = None) -> "ModelPool":
+        """
+        Builds the pool from the GEMINI_* environment variables described in the module docstring.
+
+        `model` overrides GEMINI_MODEL, e.g. for the fast tier in `llm.model_router`.
+
+        Raises:
+            ValueError: If no API key is configured.
+        """
+        keys = [key.strip() for key in (env.get("GEMINI_API_KEYS") or env.get("GEMINI_API_KEY") or "").split(",")]
+        keys = [key for key in keys if key]
+        if not keys:
+            raise ValueError("GEMINI_API_KEY is not set.")
+        base_urls = [url.strip() for url in env.get("GEMINI_BASE_URLS", "").split(",") if url.strip()]
+        if len(base_urls) > 1 and len(base_urls) != len(keys):
+            raise ValueError("GEMINI_BASE_URLS must list one URL, or one URL per key.")
+        return cls.from_keys(
+            keys,
+            model=model or env.get("GEMINI_MODEL", DEFAULT_MODEL),
+            base_urls=base_urls or [DEFAULT_BASE_URL],
+            rpm=int(env["GEMINI_RPM"]) if env.get("GEMINI_RPM") else None,
+        )
+
+    def pick(self, exclude: frozenset = frozenset()) -> Optional[PoolMember]:
+        """The least-loaded member that can take a request now, or None."""
+        now = self.clock()
+        ready = [m for m in self.members if m.name not in exclude and m.available_at(now) <= now]
+        return min(ready, key=lambda m: m.load(now)) if ready else None
+
+    async def get_response(self, *args, **kwargs) -> Any:
+        """Same call as `Model.get_response`, served by one member and retried on others after 429/5xx."""
+        import asyncio
+
+        tried = set()
+        last_error: Optional[BaseException] = None
+        while True:
+            member = self.pick(frozenset(tried))
+            if member is None:
+                candidates = [m for m in self.members if m.name not in tried]
+                if not candidates:
+                    raise last_error
+                # Every remaining member is cooling down or at its RPM; wait for the first to free up.
+                # Under a turn budget this wait is cut off like any other call.
+                now = self.clock()
+                await asyncio.sleep(min(m.available_at(now) for m in candidates) - now)
+                continue
+
+            member.inflight += 1
+            member.requests += 1
+            member._recent.append(self.clock())
+            try:
+                result = await member.model.get_response(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                member.failures += 1
+                member.consecutive_failures += 1
+                backoff = min(MAX_COOLDOWN_S, COOLDOWN_S * 2 ** (member.consecutive_failures - 1))
+                member.cooldown_until = self.clock() + (_retry_after(e) or backoff)
+                print(f"Model pool member {member.name} returned {_status_code(e)}; cooling down.")
+                tried.add(member.name)
+                last_error = e
+                continue
+            finally:
+                member.inflight -= 1
+            member.consecutive_failures = 0
+            return result
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-member utilization: share of the RPM quota used in the last minute (0 without one), plus counters."""
+        now = self.clock()
+        report = {}
+        for m in self.members:
+            m._trim(now)
+            report[m.name] = {
+                "utilization": len(m._recent) / m.rpm if m.rpm else 0.0,
+                "inflight": m.inflight,
+                "requests": m.requests,
+                "failures": m.failures,
+                "healthy": m.cooldown_until <= now,
+                "cooldown_s": max(0.0, m.cooldown_until - now),
+            }
+        return report
@@ -0,0 +1,166 @@
+# llm/model_router.py
+"""
+Model tiering: each call site declares its task, and the task maps to a model tier.
+
+Classification and extraction calls return a label or a short JSON object, so
+they go to a small, fast model. Open-ended generation goes to the standard
+model. The routes and the model of each tier are configuration:
+
+    GEMINI_MODEL         standard tier, default models/gemini-2.0-flash
+    GEMINI_FAST_MODEL    fast tier, default models/gemini-2.0-flash-lite
+    GEMINI_MODEL_ROUTES  overrides, e.g. "extract=standard,classify=fast"
+    MODEL_CASSETTE       record to or replay from a cassette (see llm/cassette.py)
+
+Every tier counts calls, errors, latency and quality outcomes reported by the
+call sites (`record_quality`), so the latency/quality trade-off of each route
+can be checked online with `stats()`.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Mapping, Optional
+
+CLASSIFY = "classify"
+EXTRACT = "extract"
+GENERATE = "generate"
+TASKS = (CLASSIFY, EXTRACT, GENERATE)
+
+FAST = "fast"
+STANDARD = "standard"
+DEFAULT_ROUTES = {CLASSIFY: FAST, EXTRACT: FAST, GENERATE: STANDARD}
+DEFAULT_FAST_MODEL = "models/gemini-2.0-flash-lite"
+
+
+def parse_routes(spec: str) -> Dict[str, str]:
+    """Parses "task=tier,task=tier" overrides."""
+    routes = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        task, _, tier = item.partition("=")
+        if task.strip() not in TASKS:
+            raise ValueError(f"Unknown task {task.strip()!r} in model routes; expected one of {TASKS}.")
+        routes[task.strip()] = tier.strip()
+    return routes
+
+
+class _TierCounters:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.quality_ok = 0
+        self.quality_bad = 0
+        self.latencies_ms = deque(maxlen=1024)
+
+    def to_dict(self) -> Dict[str, float]:
+        latencies = sorted(self.latencies_ms)
+        judged = self.quality_ok + self.quality_bad
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_ms_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+            "latency_ms_p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0,
+            "quality_ok": self.quality_ok,
+            "quality_bad": self.quality_bad,
+            "quality_rate": self.quality_ok / judged if judged else 0.0,
+        }
+
+
+class TieredModel:
+    """The model of one tier as seen by one task; records latency and errors for the tier."""
+
+    def __init__(self, router: "ModelRouter", task: str, tier: str, model: Any):
+        self.router = router
+        self.task = task
+        self.tier = tier
+        self._model = model
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
+
+    async def get_response(self, *args, **kwargs) -> Any:
+        started = time.perf_counter()
+        try:
+            response = await self._model.get_response(*args, **kwargs)
+        except Exception:
+            self.router._record(self.tier, started, error=True)
+            raise
+        self.router._record(self.tier, started, error=False)
+        return response
+
+
+class ModelRouter:
+    """Maps tasks to model tiers and keeps per-tier latency and quality counters."""
+
+    def __init__(self, tiers: Dict[str, Any], routes: Optional[Dict[str, str]] = None):
+        self.tiers = dict(tiers)
+        self.routes = {**DEFAULT_ROUTES, **(routes or {})}
+        for task, tier in self.routes.items():
+            if tier not in self.tiers:
+                raise ValueError(f"Task {task!r} is routed to unknown tier {tier!r}.")
+        self._counters = {tier: _TierCounters() for tier in self.tiers}
+        self._views = {task: TieredModel(self, task, tier, self.tiers[tier]) for task, tier in self.routes.items()}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def single(cls, model: Any) -> "ModelRouter":
+        """A router that sends every task to one model, e.g. in tests or with a single local endpoint."""
+        return cls({FAST: model, STANDARD: model})
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ, wrap: Callable[[Any], Any] = lambda model: model) -> "ModelRouter":
+        """
+        Builds one model pool per tier from the GEMINI_* variables.
+
+        With MODEL_CASSETTE set, each tier records to or replays from that cassette;
+        replay needs no API key.
+
+        Args:
+            env: Environment to read.
+            wrap: Applied to each tier's pool, e.g. `BudgetedModel` so calls respect the turn budget.
+
+        Raises:
+            ValueError: If no API key is configured or a route names an unknown tier.
+        """
+        from llm.cassette import REPLAY, CassetteModel
+        from llm.model_pool import DEFAULT_MODEL, ModelPool
+
+        models = {
+            STANDARD: env.get("GEMINI_MODEL", DEFAULT_MODEL),
+            FAST: env.get("GEMINI_FAST_MODEL", DEFAULT_FAST_MODEL),
+        }
+        tiers = {}
+        for tier, name in models.items():
+            if env.get("MODEL_CASSETTE") and env.get("MODEL_CASSETTE_MODE", REPLAY) == REPLAY:
+                tiers[tier] = wrap(CassetteModel.from_env(env, name=tier))
+                continue
+            # Each tier gets its own pool: providers rate-limit per key and per model.
+            model = ModelPool.from_env(env, model=name)
+            tiers[tier] = wrap(CassetteModel.from_env(env, model, name=tier) or model)
+        return cls(tiers, parse_routes(env.get("GEMINI_MODEL_ROUTES", "")))
+
+    def for_task(self, task: str) -> TieredModel:
+        """The model a call site declaring `task` should use."""
+        return self._views[task]
+
+    def record_quality(self, task: str, ok: bool) -> None:
+        """Records whether a task's output was usable (e.g. a known intent, a parseable goal)."""
+        with self._lock:
+            counters = self._counters[self.routes[task]]
+            if ok:
+                counters.quality_ok += 1
+            else:
+                counters.quality_bad += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            report = {tier: counters.to_dict() for tier, counters in self._counters.items()}
+        for tier, entry in report.items():
+            entry["tasks"] = sorted(task for task, routed in self.routes.items() if routed == tier)
+        return report
+
+    def _record(self, tier: str, started: float, error: bool) -> None:
+        with self._lock:
+            counters = self._counters[tier]
+            counters.calls += 1
+            counters.errors += int(error)
+            counters.latencies_ms.append((time.perf_counter() - started) * 1000)
@@ -0,0 +1,276 @@
+# llm/prompts.py
+"""
+Prompt registry: system prompts compiled once, with a stable prefix.
+
+Each template is split into a static part, which is normalized and hashed
+when it is registered, and an optional dynamic suffix filled in per call.
+The static part always comes first. A template may also extend a base
+template, so that related prompts (for example the shared tone and the
+medical instructions) begin with the same bytes. Keeping the prefix
+byte-identical across calls lets provider-side context caching reuse it.
+
+The registry counts the static and dynamic tokens sent for each template.
+`drift` compares the current templates with a recorded baseline, so a
+prompt edit that grows a prompt or breaks its cache key is noticed.
+"""
+import hashlib
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Rough tokenizer: a word or a single punctuation mark. English BPE vocabularies land within
+# about 20% of this, which is enough to compare templates against their own baseline.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+DRIFT_TOLERANCE = 0.10
+
+
+def estimate_tokens(text: str) -> int:
+    return len(_TOKEN_RE.findall(text))
+
+
+def _normalize(text: str) -> str:
+    """Drops trailing whitespace and surrounding blank lines so editor noise never changes the prefix."""
+    return "\n".join(line.rstrip() for line in text.strip().splitlines())
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    static: str
+    suffix: str = ""
+    hash: str = ""
+    static_tokens: int = 0
+
+    def render(self, values: Dict[str, Any]) -> str:
+        if not self.suffix:
+            return self.static
+        return f"{self.static} {self.suffix.format(**values)}"
+
+
+class PromptRegistry:
+    """Compiled prompt templates plus per-template token accounting."""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, static: str, suffix: str = "", base: Optional[str] = None) -> PromptTemplate:
+        """
+        Compiles a template.
+
+        Args:
+            name: Template name used with `render`.
+            static: Text that is the same on every call.
+            suffix: `str.format` text appended after the static part for per-call values.
+            base: Name of a registered template whose static text is prepended, so both share a prefix.
+
+        Returns:
+            The compiled template.
+        """
+        static = _normalize(static)
+        if base is not None:
+            static = f"{self._templates[base].static} {static}"
+        template = PromptTemplate(
+            name=name,
+            static=static,
+            suffix=_normalize(suffix),
+            hash=hashlib.blake2b(static.encode(), digest_size=8).hexdigest(),
+            static_tokens=estimate_tokens(static),
+        )
+        self._templates[name] = template
+        self._usage[name] = {"calls": 0, "static_tokens": 0, "dynamic_tokens": 0}
+        return template
+
+    def __getitem__(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+
+    def render(self, name: str, **values: Any) -> str:
+        """Renders a template, static prefix first, and records the tokens it will send."""
+        template = self._templates[name]
+        text = template.render(values)
+        dynamic_tokens = estimate_tokens(text) - template.static_tokens if template.suffix else 0
+        with self._lock:
+            usage = self._usage[name]
+            usage["calls"] += 1
+            usage["static_tokens"] += template.static_tokens
+            usage["dynamic_tokens"] += dynamic_tokens
+        return text
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Hash and static token size per template, the shape stored as a drift baseline."""
+        return {
+            name: {"hash": template.hash, "tokens": template.static_tokens}
+            for name, template in sorted(self._templates.items())
+        }
+
+    def usage(self) -> Dict[str, Any]:
+        """
+        Tokens sent per template since start-up.
+
+        `cacheable_ratio` is the share of prompt tokens that sit in a static prefix and
+        can be served from the provider's context cache after the first call.
+        """
+        with self._lock:
+            usage = {name: dict(counts) for name, counts in self._usage.items()}
+        static = sum(counts["static_tokens"] for counts in usage.values())
+        total = static + sum(counts["dynamic_tokens"] for counts in usage.values())
+        return {"templates": usage, "cacheable_ratio": static / total if total else 0.0}
+
+    def drift(self, baseline: Dict[str, Dict[str, Any]], tolerance: float = DRIFT_TOLERANCE) -> List[str]:
+        """
+        Compares the templates with a baseline from `snapshot`.
+
+        Returns:
+            One message per template whose static size moved by more than `tolerance`,
+            whose text changed (a new cache key), or that is missing from either side.
+        """
+        messages = []
+        for name, current in self.snapshot().items():
+            recorded = baseline.get(name)
+            if recorded is None:
+                messages.append(f"{name}: not in baseline ({current['tokens']} tokens)")
+                continue
+            change = (current["tokens"] - recorded["tokens"]) / max(recorded["tokens"], 1)
+            if abs(change) > tolerance:
+                messages.append(
+                    f"{name}: {recorded['tokens']} -> {current['tokens']} tokens ({change:+.0%})"
+                )
+            elif current["hash"] != recorded["hash"]:
+                messages.append(f"{name}: text changed ({recorded['tokens']} -> {current['tokens']} tokens)")
+        messages.extend(f"{name}: in baseline but no longer registered" for name in baseline if name not in self)
+        return messages
+
+
+PROMPTS = PromptRegistry()
+
+PROMPTS.register("tone", """
+You are a specialized AI assistant with expertise in health, biology, and medical queries.
+Your primary goal is to provide accurate, safe, and helpful information.
+Purpose: To provide general health, nutrition, workout, and biology information.
+Topics: Meal plans, workout routines, goal tracking, injury support, nutrition expert advice,
+and general health inquiries, as well as personalized meal plans based on dietary preferences.
+Goals: To assist users in achieving their health and wellness objectives by offering personalized
+(where applicable) and informative guidance.
+""")
+
+PROMPTS.register("medical", """
+You are a health information assistant, not a medical professional.
+Provide general information and append the disclaimer:
+""", suffix='"{disclaimer}".', base="tone")
+
+PROMPTS.register("goal_not_parsed", "User query couldn't be parsed by goal analyzer.", base="tone")
+
+PROMPTS.register("out_of_scope", """
+You are a specialized AI assistant with expertise in health, biology, and medical queries.
+Provide accurate, safe, and helpful information. If the user's query is outside the scope,
+state that you are a specialized health and wellness assistant.
+""")
+
+PROMPTS.register("diet_preferences", """
+You are a helpful assistant specialized in identifying diet preferences.
+Extract specific dietary restrictions, preferences, and food likes/dislikes.
+Respond ONLY with a concise comma-separated string. If none, respond with 'None'.
+""")
+
+PROMPTS.register("intent", """
+You are an expert at classifying user intent. Your task is to classify the user's query into ONLY one of the following categories:
+
+- "set_or_update_goal": The user is explicitly stating a goal or a desire to change their goal.
+  Examples: "my goal is to lose weight", "i want to get fit", "change my goal to build muscle", "i want to increase my biceps".
+
+- "ask_meal_plan": The user is specifically asking for a diet or meal plan.
+  Examples: "give me a meal plan", "what should I eat for a week?", "suggest a diet plan".
+
+- "ask_workout_plan": The user is specifically asking for a workout plan or exercises.
+  Examples: "suggest some exercises", "can you give me a workout routine?", "what are some good bicep exercises?".
+
+- "ask_general_question": The user is asking a general "what", "why", or "how" question, or is making a general statement that requires a conversational response. This is the default for most questions that are not a direct request for a plan or goal setting.
+  Examples: "why is exercise important?", "what is a calorie?", "tell me more about that", "what can you do?".
+
+- "log_water": The user wants to log their water intake.
+  Examples: "i drank 500ml of water", "log my water".
+
+- "handle_injury": The user is mentioning an injury, pain, or asking for medical advice.
+  Examples: "i hurt my knee", "my back is in pain".
+
+- "other": If the query does not fit any other category.
+Answer should not exceed from 400 words where necessary.
+You are not allowed to answer any off topic query.
+You have to only answer the queries of health,wellness,medical,biology and exercises and the questions which are related to these fields.
+Respond ONLY with the single category name.
+""")
+
+# Several users' queries in one request (see llm/intent_batcher.py); shares the intent prompt's prefix.
+PROMPTS.register("intent_batch", """
+Batch mode: the user message is a JSON array of objects, each with an "id", a "query" to classify, and the
+"context" messages that came before it. Classify each query on its own, using only its own context.
+Instead of a single category name, respond ONLY with a JSON array of category names, one per query, in the
+order given. Example: ["log_water", "ask_meal_plan"]
+""", base="intent")
+
+PROMPTS.register("goal_analyzer", """
+You are a highly intelligent goal analyzer. Your task is to parse the user's raw text and extract their health and fitness goal into a structured JSON object.
+
+The JSON object should have the following fields:
+- "name": A short, descriptive name for the goal (e.g., "Weight Loss", "Muscle Gain", "Improve Fitness").
+- "action": The primary action (e.g., "lose", "gain", "increase", "improve").
+- "quantity": The target amount, if specified (e.g., 10, 5).
+- "unit": The unit for the quantity (e.g., "pounds", "kg", "percent", "biceps_size").
+- "duration_value": The duration value, if specified (e.g., 3).
+- "duration_unit": The unit for the duration (e.g., "months", "weeks").
+
+Analyze the text and respond ONLY with the JSON object. Do not include any other text or formatting.
+
+Example 1:
+User raw text: "i want to lose 10 pounds in 3 months"
+Your JSON response:
+{
+    "name": "Weight Loss",
+    "action": "lose",
+    "quantity": 10,
+    "unit": "pounds",
+    "duration_value": 3,
+    "duration_unit": "months"
+}
+
+Example 2:
+User raw text: "my goal is to get fit"
+Your JSON response:
+{
+    "name": "Improve Fitness",
+    "action": "improve",
+    "quantity": null,
+    "unit": "fitness_level",
+    "duration_value": null,
+    "duration_unit": null
+}
+
+Example 3:
+User raw text: "i have goal of fitness and i want to increase biceps"
+Your JSON response:
+{
+    "name": "Increase Biceps Size",
+    "action": "increase",
+    "quantity": null,
+    "unit": "biceps_size",
+    "duration_value": null,
+    "duration_unit": null
+}
+
+Example 4:
+User raw text: "i just want a meal plan"
+Your JSON response:
+{
+    "name": "General Health",
+    "action": "maintain",
+    "quantity": null,
+    "unit": null,
+    "duration_value": null,
+    "duration_unit": null
+}
+""")
@@ -0,0 +1,25 @@
+# llm/tracing.py
+import enum
+
+
+class ModelTracing(enum.Enum):
+    """
+    Tracing mode passed to `Model.get_response`.
+
+    Mirrors `agents.ModelTracing` so agent and tool modules can pass it without
+    importing the SDK at module import time.
+    """
+    DISABLED = 0
+    """Tracing is disabled entirely."""
+
+    ENABLED = 1
+    """Tracing is enabled, and all data is included."""
+
+    ENABLED_WITHOUT_DATA = 2
+    """Tracing is enabled, but inputs/outputs are not included."""
+
+    def is_disabled(self) -> bool:
+        return self == ModelTracing.DISABLED
+
+    def include_data(self) -> bool:
+        return self == ModelTracing.ENABLED
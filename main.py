@@ -1,28 +1,17 @@
 import streamlit as st
 from agent import HealthPlannerAgent
 from context import UserSessionContext
+from storage.session_store import load_session_context
+from storage.write_pipeline import SessionWriter
 import asyncio
-import os
-import json
 import uuid
 
-SESSION_DIR = "sessions"
-os.makedirs(SESSION_DIR, exist_ok=True)
+# Process-wide background writer, so saving a turn never waits on the disk
+@st.cache_resource
+def get_session_writer():
+    return SessionWriter().start()
 
-def save_session_context(session_id: str, ctx: UserSessionContext):
-    """Saves the UserSessionContext to a JSON file."""
-    file_path = os.path.join(SESSION_DIR, f"{session_id}.json")
-    with open(file_path, "w") as f:
-        json.dump(ctx.model_dump(), f, indent=4)
-
-def load_session_context(session_id: str) -> UserSessionContext:
-    """Loads the UserSessionContext from a JSON file, or creates a new one if not found."""
-    file_path = os.path.join(SESSION_DIR, f"{session_id}.json")
-    if os.path.exists(file_path):
-        with open(file_path, "r") as f:
-            data = json.load(f)
-            return UserSessionContext(**data)
-    return UserSessionContext(uid=session_id) # Create new if not found, use existing session_id
+session_writer = get_session_writer()
 
 # Initialize the agent and session context
 if "health_agent" not in st.session_state:
@@ -94,4 +83,4 @@ if prompt := st.chat_input("Ask me anything about your health goals..."):
             st.session_state.messages.append(("assistant", response_content))
             
             # Save the updated session context after each interaction
-            save_session_context(st.session_state.session_id, st.session_state.session_ctx)
\ No newline at end of file
+            session_writer.submit(st.session_state.session_id, st.session_state.session_ctx)
\ No newline at end of file
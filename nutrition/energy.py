@@ -0,0 +1,203 @@
+# nutrition/energy.py
+"""
+Energy-balance engine: turns parsed goals plus user stats into daily calorie
+and macro targets.
+
+All arithmetic runs on NumPy arrays, so one call computes targets for a single
+session or for a whole user population (see `compute_targets`). Parsing the goal
+dicts produced by `GoalAnalyzerTool` into arrays is the only per-user Python work.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from nutrition.food_db import MACROS
+
+KCAL_PER_KG = 7700.0
+KCAL_PER_G = {"protein_g": 4.0, "carbs_g": 4.0, "fat_g": 9.0}
+
+WEIGHT_UNITS = {
+    "kg": 1.0, "kgs": 1.0, "kilo": 1.0, "kilos": 1.0, "kilogram": 1.0, "kilograms": 1.0,
+    "lb": 0.45359237, "lbs": 0.45359237, "pound": 0.45359237, "pounds": 0.45359237,
+    "stone": 6.35029318, "stones": 6.35029318,
+}
+DURATION_UNITS = {
+    "day": 1.0, "days": 1.0,
+    "week": 7.0, "weeks": 7.0,
+    "month": 30.44, "months": 30.44,
+    "year": 365.25, "years": 365.25,
+}
+ACTIVITY_FACTORS = {"sedentary": 1.2, "light": 1.375, "moderate": 1.55, "active": 1.725, "very_active": 1.9}
+# Mifflin-St Jeor sex constant; "unspecified" is the midpoint.
+SEX_CONSTANTS = {"male": 5.0, "female": -161.0, "unspecified": -78.0}
+MIN_CALORIES = {"male": 1500.0, "female": 1200.0, "unspecified": 1350.0}
+
+# Goal kinds, stored as small ints so a population fits in one array.
+MAINTAIN, LOSE, GAIN = 0, 1, 2
+_ACTIONS = {
+    "lose": LOSE, "reduce": LOSE, "cut": LOSE, "decrease": LOSE,
+    "gain": GAIN, "increase": GAIN, "build": GAIN, "bulk": GAIN,
+}
+# Used when a goal names no weight, e.g. "get fit" or "increase biceps".
+DEFAULT_DAILY_DELTA = {MAINTAIN: 0.0, LOSE: -500.0, GAIN: 300.0}
+MAX_DAILY_DEFICIT = 1000.0
+MAX_DAILY_SURPLUS = 500.0
+PROTEIN_G_PER_KG = np.array([1.4, 2.0, 1.8])  # indexed by goal kind
+FAT_SHARE = np.array([0.30, 0.25, 0.25])
+
+
+@dataclass
+class UserStats:
+    """Body measurements; the defaults stand in for users who have not shared theirs."""
+    weight_kg: float = 70.0
+    height_cm: float = 170.0
+    age: float = 30.0
+    sex: str = "unspecified"
+    activity: str = "moderate"
+
+
+@dataclass
+class DailyTargets:
+    calories: float
+    protein_g: float
+    carbs_g: float
+    fat_g: float
+
+    def as_array(self) -> np.ndarray:
+        return np.array([self.calories, self.protein_g, self.carbs_g, self.fat_g], dtype=np.float32)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {macro: round(float(v), 1) for macro, v in zip(MACROS, self.as_array())}
+
+    def compact(self) -> str:
+        """Short form for prompts, e.g. "1850 kcal, P140/C180/F60 g"."""
+        return f"{self.calories:.0f} kcal, P{self.protein_g:.0f}/C{self.carbs_g:.0f}/F{self.fat_g:.0f} g"
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def normalize_goal(goal: Optional[Dict]) -> Dict[str, float]:
+    """
+    Normalizes a parsed goal to a goal kind, a weight change in kg and a duration in days.
+
+    Args:
+        goal: A goal dict from `GoalAnalyzerTool` (action, quantity, unit, duration_value, duration_unit).
+
+    Returns:
+        A dictionary with "kind" (MAINTAIN/LOSE/GAIN), "delta_kg" (NaN unless the goal names a
+        weight) and "days" (NaN unless the goal names a duration).
+    """
+    goal = goal or {}
+    kind = _ACTIONS.get(str(goal.get("action") or "").lower(), MAINTAIN)
+    unit = str(goal.get("unit") or "").lower()
+    delta_kg = _number(goal.get("quantity")) * WEIGHT_UNITS[unit] if unit in WEIGHT_UNITS else np.nan
+    duration_unit = str(goal.get("duration_unit") or "").lower()
+    days = _number(goal.get("duration_value")) * DURATION_UNITS.get(duration_unit, np.nan)
+    return {"kind": kind, "delta_kg": delta_kg, "days": days}
+
+
+def compute_targets(
+    kind: np.ndarray,
+    delta_kg: np.ndarray,
+    days: np.ndarray,
+    weight_kg: np.ndarray,
+    height_cm: np.ndarray,
+    age: np.ndarray,
+    sex_constant: np.ndarray,
+    activity_factor: np.ndarray,
+    min_calories: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized targets for a population. Every argument is a length-n array.
+
+    Energy need is Mifflin-St Jeor BMR times the activity factor. A weight goal
+    adds the daily deficit or surplus that reaches it in time, capped to a safe
+    rate and floored at a minimum intake. Protein scales with body weight, fat
+    is a share of calories and carbohydrate takes the rest.
+
+    Returns:
+        An (n, 4) float array of calories, protein_g, carbs_g and fat_g.
+    """
+    kind = np.asarray(kind, dtype=np.int64)
+    bmr = 10.0 * weight_kg + 6.25 * height_cm - 5.0 * age + sex_constant
+    tdee = bmr * activity_factor
+
+    sign = np.where(kind == LOSE, -1.0, np.where(kind == GAIN, 1.0, 0.0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        planned = sign * np.abs(delta_kg) * KCAL_PER_KG / days
+    default = np.select([kind == LOSE, kind == GAIN], [DEFAULT_DAILY_DELTA[LOSE], DEFAULT_DAILY_DELTA[GAIN]], 0.0)
+    daily_delta = np.where(np.isfinite(planned) & (days > 0), planned, default)
+    daily_delta = np.clip(daily_delta, -MAX_DAILY_DEFICIT, MAX_DAILY_SURPLUS)
+    calories = np.maximum(tdee + daily_delta, min_calories)
+
+    protein = PROTEIN_G_PER_KG[kind] * weight_kg
+    fat = FAT_SHARE[kind] * calories / KCAL_PER_G["fat_g"]
+    carbs = np.maximum(calories - protein * KCAL_PER_G["protein_g"] - fat * KCAL_PER_G["fat_g"], 0.0)
+    carbs = carbs / KCAL_PER_G["carbs_g"]
+    return np.stack([calories, protein, carbs, fat], axis=1)
+
+
+def targets_for_goals(
+    goals: Sequence[Optional[Dict]],
+    stats: Optional[Sequence[Optional[UserStats]]] = None,
+) -> np.ndarray:
+    """
+    Targets for many users at once, e.g. every session on disk for analytics.
+
+    Args:
+        goals: Parsed goal dicts, one per user (None for users without a goal).
+        stats: Matching `UserStats`, or None to use the defaults for everyone.
+
+    Returns:
+        An (n, 4) float array of calories, protein_g, carbs_g and fat_g.
+    """
+    n = len(goals)
+    stats = stats if stats is not None else [None] * n
+    columns = np.empty((n, 3))
+    body = np.empty((n, 3))
+    sex_constant = np.empty(n)
+    activity = np.empty(n)
+    floor = np.empty(n)
+    default = UserStats()
+    for i, (goal, user) in enumerate(zip(goals, stats)):
+        parsed = normalize_goal(goal)
+        columns[i] = (parsed["kind"], parsed["delta_kg"], parsed["days"])
+        user = user or default
+        body[i] = (user.weight_kg, user.height_cm, user.age)
+        sex_constant[i] = SEX_CONSTANTS.get(user.sex, SEX_CONSTANTS["unspecified"])
+        floor[i] = MIN_CALORIES.get(user.sex, MIN_CALORIES["unspecified"])
+        activity[i] = ACTIVITY_FACTORS.get(user.activity, ACTIVITY_FACTORS["moderate"])
+    return compute_targets(
+        columns[:, 0], columns[:, 1], columns[:, 2],
+        body[:, 0], body[:, 1], body[:, 2],
+        sex_constant, activity, floor,
+    )
+
+
+def targets_for_goal(goal: Optional[Dict], stats: Optional[UserStats] = None) -> DailyTargets:
+    """Daily calorie and macro targets for one user."""
+    calories, protein, carbs, fat = targets_for_goals([goal], [stats])[0]
+    return DailyTargets(float(calories), float(protein), float(carbs), float(fat))
+
+
+def describe_goal(goal: Optional[Dict]) -> str:
+    """
+    One-line, unit-normalized summary of a goal for prompts,
+    e.g. "Weight Loss: lose 4.5 kg in 91 days (0.35 kg/week)".
+    """
+    parsed = normalize_goal(goal)
+    action = {LOSE: "lose", GAIN: "gain"}.get(parsed["kind"], "maintain")
+    name = (goal or {}).get("name") or action
+    if not np.isfinite(parsed["delta_kg"]):
+        return name
+    change = f"{action} {abs(parsed['delta_kg']):.1f} kg"
+    if np.isfinite(parsed["days"]) and parsed["days"] > 0:
+        rate = abs(parsed["delta_kg"]) / parsed["days"] * 7
+        change += f" in {parsed['days']:.0f} days ({rate:.2f} kg/week)"
+    return f"{name}: {change}"
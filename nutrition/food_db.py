@@ -0,0 +1,241 @@
+# nutrition/food_db.py
+"""
+Offline food database used to assemble meal plans without a model call.
+
+Foods are read from the bundled CSV once and compiled into a single NumPy
+structured array (one fixed-width record per food, columns addressable as
+`db.records["calories"]`). The compiled array is cached as a `.npy` file next
+to the CSV and memory-mapped on later loads, so starting a worker does not
+re-parse the CSV and concurrent workers share the same pages.
+"""
+import csv
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_FOODS_CSV = os.path.join(DATA_DIR, "foods.csv")
+
+SLOTS = ("breakfast", "lunch", "dinner", "snack")
+DIET_TAGS = ("vegetarian", "vegan", "halal", "gluten_free", "dairy_free", "nut_free")
+MACROS = ("calories", "protein_g", "carbs_g", "fat_g")
+
+SLOT_BITS = {slot: 1 << i for i, slot in enumerate(SLOTS)}
+TAG_BITS = {tag: 1 << i for i, tag in enumerate(DIET_TAGS)}
+
+FOOD_DTYPE = np.dtype([
+    ("name", "U48"),
+    ("category", "U16"),
+    ("serving", "U24"),
+    ("slots", "u1"),
+    ("tags", "u1"),
+    ("calories", "f4"),
+    ("protein_g", "f4"),
+    ("carbs_g", "f4"),
+    ("fat_g", "f4"),
+])
+
+# Phrases in free-text diet preferences that map onto a diet tag.
+_TAG_PATTERNS = {
+    "vegan": r"\b(?:vegan|plant[- ]based)\b",
+    "vegetarian": r"\b(?:vegetarian|veggie|no meat)\b",
+    "halal": r"\bhalal\b",
+    "gluten_free": r"\b(?:gluten[- ]?free|no gluten|celiac|coeliac)\b",
+    "dairy_free": r"\b(?:dairy[- ]?free|no dairy|lactose)",
+    "nut_free": r"\b(?:nut[- ]?free|no nuts?|(?:pea)?nut allerg)",
+}
+_TAG_RES = {tag: re.compile(pattern) for tag, pattern in _TAG_PATTERNS.items()}
+_EXCLUDE_RE = re.compile(r"\b(?:no|without|avoid|avoids|hate|hates|dislike|dislikes|allergic to)\s+([a-z]+)")
+# Exclusions already covered by a tag, so they are not also matched against food names.
+_TAG_WORDS = {"meat", "gluten", "dairy", "nut", "nuts", "lactose"}
+
+
+@dataclass
+class DietFilter:
+    """Hard constraints on which foods may appear in a plan."""
+    tags: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+    mask: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        tags = set(self.tags)
+        if "vegan" in tags:
+            tags.update({"vegetarian", "dairy_free"})
+        self.tags = tuple(sorted(tags))
+        self.mask = 0
+        for tag in self.tags:
+            self.mask |= TAG_BITS[tag]
+
+
+def _singular(word: str) -> str:
+    # Only used for substring matching, so "potatoes" -> "potato" and "apples" -> "appl" both work.
+    if len(word) > 4 and word.endswith("es"):
+        return word[:-2]
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def parse_diet_preferences(text: Optional[str]) -> DietFilter:
+    """
+    Maps the free-text preferences stored in `ctx.diet_preferences` onto diet tags
+    and excluded words, e.g. "vegetarian, no mushrooms" -> (vegetarian, mushroom).
+    """
+    if not text or text.strip().lower() == "none":
+        return DietFilter()
+    lowered = text.lower()
+    tags = tuple(tag for tag, pattern in _TAG_RES.items() if pattern.search(lowered))
+    exclude = tuple(
+        _singular(word) for word in _EXCLUDE_RE.findall(lowered) if word not in _TAG_WORDS
+    )
+    return DietFilter(tags=tags, exclude=exclude)
+
+
+def _bits(value: str, table: Dict[str, int]) -> int:
+    bits = 0
+    for item in filter(None, (part.strip() for part in value.split("|"))):
+        if item not in table:
+            raise ValueError(f"Unknown value {item!r}, expected one of {sorted(table)}")
+        bits |= table[item]
+    return bits
+
+
+def compile_foods(csv_path: str) -> np.ndarray:
+    """Parses the food CSV into a structured array."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    records = np.zeros(len(rows), dtype=FOOD_DTYPE)
+    for i, row in enumerate(rows):
+        records[i] = (
+            row["name"], row["category"], row["serving"],
+            _bits(row["slots"], SLOT_BITS), _bits(row["tags"], TAG_BITS),
+            float(row["calories"]), float(row["protein_g"]), float(row["carbs_g"]), float(row["fat_g"]),
+        )
+    return records
+
+
+def load_records(csv_path: str = DEFAULT_FOODS_CSV, cache_path: Optional[str] = None) -> np.ndarray:
+    """
+    Returns the compiled food records, memory-mapped from the `.npy` cache.
+
+    The cache is rebuilt when it is missing or older than the CSV. If it cannot be
+    written (read-only install), the freshly compiled in-memory array is returned.
+    """
+    cache_path = cache_path or os.path.splitext(csv_path)[0] + ".npy"
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(csv_path):
+            return np.load(cache_path, mmap_mode="r")
+    except OSError:
+        pass
+    records = compile_foods(csv_path)
+    try:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, records)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Could not cache compiled food database at {cache_path}: {e}")
+        return records
+    return np.load(cache_path, mmap_mode="r")
+
+
+class FoodDatabase:
+    """
+    Columnar food table with indexes for diet tags, meal slots and nutrient ranges.
+
+    Tag and slot membership are bitmask columns, so filtering by any combination
+    of tags is a single vectorized AND. Each nutrient has a precomputed sort order,
+    so range queries are two binary searches.
+    """
+
+    def __init__(self, records: np.ndarray):
+        self.records = records
+        self.nutrients = np.stack([np.asarray(records[m], dtype=np.float32) for m in MACROS], axis=1)
+        self._slots = np.asarray(records["slots"])
+        self._tags = np.asarray(records["tags"])
+        # Exclusions match the category too, so "no fish" also removes salmon and cod.
+        self._search_text = np.char.lower(
+            np.char.add(np.char.add(np.asarray(records["name"]), " "), np.asarray(records["category"]))
+        )
+        self._index = {str(name): i for i, name in enumerate(records["name"])}
+        self._sorted = {}
+        for column, macro in enumerate(MACROS):
+            order = np.argsort(self.nutrients[:, column], kind="stable")
+            self._sorted[macro] = (order, self.nutrients[order, column])
+
+    @classmethod
+    def load(cls, csv_path: str = DEFAULT_FOODS_CSV, cache_path: Optional[str] = None) -> "FoodDatabase":
+        return cls(load_records(csv_path, cache_path))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def name(self, index: int) -> str:
+        return str(self.records["name"][index])
+
+    def index_of(self, name: str) -> Optional[int]:
+        """Row of the food called `name`, or None if it is no longer in the database."""
+        return self._index.get(name)
+
+    def allows(self, index: int, diet: DietFilter) -> bool:
+        """True if the food satisfies the diet's tags and exclusions."""
+        if int(self._tags[index]) & diet.mask != diet.mask:
+            return False
+        return not any(word in self._search_text[index] for word in diet.exclude)
+
+    def in_range(self, nutrient: str, low: float = -np.inf, high: float = np.inf) -> np.ndarray:
+        """Indices of foods whose per-serving `nutrient` lies in [low, high]."""
+        order, values = self._sorted[nutrient]
+        start = np.searchsorted(values, low, side="left")
+        stop = np.searchsorted(values, high, side="right")
+        return np.sort(order[start:stop])
+
+    def query(
+        self,
+        slot: Optional[str] = None,
+        diet: Optional[DietFilter] = None,
+        ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+    ) -> np.ndarray:
+        """
+        Returns indices of foods matching all constraints.
+
+        Args:
+            slot: Meal slot the food must be suitable for.
+            diet: Diet tags every food must carry and words its name or category must not contain.
+            ranges: Per-serving nutrient ranges, e.g. {"protein_g": (20, 60)}.
+
+        Returns:
+            A sorted array of row indices.
+        """
+        keep = np.ones(len(self.records), dtype=bool)
+        if slot is not None:
+            keep &= (self._slots & SLOT_BITS[slot]) != 0
+        if diet is not None:
+            if diet.mask:
+                keep &= (self._tags & diet.mask) == diet.mask
+            for word in diet.exclude:
+                keep &= np.char.find(self._search_text, word) < 0
+        for nutrient, (low, high) in (ranges or {}).items():
+            in_range = np.zeros_like(keep)
+            in_range[self.in_range(nutrient, low, high)] = True
+            keep &= in_range
+        return np.flatnonzero(keep)
+
+    def describe(self, indices: Iterable[int]) -> Dict[str, Dict[str, float]]:
+        """Name -> per-serving nutrients for the given rows, for display and prompts."""
+        return {
+            self.name(i): {macro: float(self.nutrients[i, c]) for c, macro in enumerate(MACROS)}
+            for i in indices
+        }
+
+
+_default_db: Optional[FoodDatabase] = None
+
+
+def default_food_db() -> FoodDatabase:
+    """The bundled database, loaded once per process."""
+    global _default_db
+    if _default_db is None:
+        _default_db = FoodDatabase.load()
+    return _default_db
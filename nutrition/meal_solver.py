@@ -0,0 +1,133 @@
+# nutrition/meal_solver.py
+"""
+Assembles a 7-day meal plan from the food database against daily calorie and
+macro targets. Everything is local: a plan is computed in a few milliseconds
+and can be checked against its targets without any model call.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from nutrition.energy import DailyTargets
+from nutrition.food_db import SLOTS, DietFilter, FoodDatabase, default_food_db
+
+# Share of the daily targets given to each meal slot. The last slot of the day
+# takes whatever is left instead, which absorbs rounding in the earlier picks.
+SLOT_SHARES = {"breakfast": 0.25, "lunch": 0.35, "dinner": 0.30, "snack": 0.10}
+SERVING_OPTIONS = np.array([0.5, 0.75, 1.0, 1.25, 1.5, 2.0], dtype=np.float32)
+# Relative weight of each nutrient's error; hitting calories matters most.
+NUTRIENT_WEIGHTS = np.array([3.0, 1.5, 1.0, 1.0], dtype=np.float32)
+# Added to the score of a food already eaten today or in the last `variety_days` days.
+REPEAT_PENALTY = 0.5
+
+
+class NoMatchingFoods(ValueError):
+    """Raised when the diet constraints leave a meal slot with no foods at all."""
+
+
+@dataclass
+class MealChoice:
+    slot: str
+    food: int
+    name: str
+    serving: str
+    servings: float
+    nutrients: np.ndarray
+
+    def describe(self) -> str:
+        calories, protein, _, _ = self.nutrients
+        portion = self.serving if self.servings == 1 else f"{self.servings:g} x {self.serving}"
+        return f"{self.slot.title()}: {self.name} ({portion}) - {calories:.0f} kcal, {protein:.0f}g protein"
+
+
+@dataclass
+class MealPlan:
+    days: List[List[MealChoice]]
+    targets: DailyTargets
+
+    def daily_totals(self) -> np.ndarray:
+        """(days, 4) array of calories, protein, carbs and fat per day."""
+        return np.array([np.sum([m.nutrients for m in day], axis=0) for day in self.days])
+
+    def to_meal_plan(self) -> Dict[str, List[str]]:
+        """The `{"day_1": [...], ...}` shape stored in `ctx.meal_plan`."""
+        return {f"day_{d + 1}": [meal.describe() for meal in day] for d, day in enumerate(self.days)}
+
+    def max_calorie_error(self) -> float:
+        """Largest relative deviation of a day's calories from the target."""
+        calories = self.daily_totals()[:, 0]
+        return float(np.max(np.abs(calories - self.targets.calories)) / self.targets.calories)
+
+
+class MealPlanSolver:
+    """
+    Greedy constraint solver over the food database.
+
+    For each day it fills the slots in order, scoring every allowed food at every
+    serving size against the slot's share of the remaining targets in one
+    vectorized pass, with a penalty for recently repeated foods to keep variety.
+    """
+
+    def __init__(self, food_db: Optional[FoodDatabase] = None, variety_days: int = 2):
+        self.food_db = food_db or default_food_db()
+        self.variety_days = variety_days
+
+    def _candidates(self, diet: DietFilter) -> Dict[str, tuple]:
+        db = self.food_db
+        candidates = {}
+        for slot in SLOTS:
+            indices = db.query(slot=slot, diet=diet)
+            if indices.size == 0:
+                raise NoMatchingFoods(f"No {slot} foods match the diet constraints {diet.tags + diet.exclude}")
+            # (foods, servings, nutrients) for every allowed food at every serving size.
+            options = db.nutrients[indices][:, None, :] * SERVING_OPTIONS[None, :, None]
+            candidates[slot] = (indices, options)
+        return candidates
+
+    def solve(self, targets: DailyTargets, diet: Optional[DietFilter] = None, days: int = 7) -> MealPlan:
+        candidates = self._candidates(diet or DietFilter())
+        plan: List[List[MealChoice]] = []
+        for _ in range(days):
+            avoid = set().union(*(
+                {meal.food for meal in day} for day in plan[-self.variety_days:]
+            )) if plan else set()
+            plan.append(self._solve_day(candidates, targets, avoid))
+        return MealPlan(days=plan, targets=targets)
+
+    def solve_day(self, targets: DailyTargets, diet: Optional[DietFilter] = None, avoid: Iterable[int] = ()) -> List[MealChoice]:
+        """Solves a single day, penalising the foods in `avoid` (e.g. those eaten on neighbouring days)."""
+        return self._solve_day(self._candidates(diet or DietFilter()), targets, set(avoid))
+
+    def _solve_day(self, candidates: Dict[str, tuple], targets: DailyTargets, eaten: set) -> List[MealChoice]:
+        db = self.food_db
+        daily = targets.as_array()
+        scale = np.maximum(daily, 1.0)
+        remaining = daily.copy()
+        eaten = set(eaten)
+        today = []
+        for position, slot in enumerate(SLOTS):
+            indices, options = candidates[slot]
+            last = position == len(SLOTS) - 1
+            target = np.maximum(remaining, 0.0) if last else daily * SLOT_SHARES[slot]
+            error = (((options - target) / scale) ** 2 * NUTRIENT_WEIGHTS).sum(axis=2)
+            repeated = np.fromiter((i in eaten for i in indices), dtype=bool, count=indices.size)
+            error[repeated] += REPEAT_PENALTY
+            food_pos, serving_pos = np.unravel_index(int(np.argmin(error)), error.shape)
+            food = int(indices[food_pos])
+            today.append(self.choice(slot, food, float(SERVING_OPTIONS[serving_pos])))
+            eaten.add(food)
+            remaining = remaining - today[-1].nutrients
+        return today
+
+    def choice(self, slot: str, food: int, servings: float) -> MealChoice:
+        """Builds the meal choice for `servings` of a food, e.g. when restoring a stored plan."""
+        db = self.food_db
+        return MealChoice(
+            slot=slot,
+            food=food,
+            name=db.name(food),
+            serving=str(db.records["serving"][food]),
+            servings=servings,
+            nutrients=db.nutrients[food] * np.float32(servings),
+        )
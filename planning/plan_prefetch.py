@@ -0,0 +1,199 @@
+# planning/plan_prefetch.py
+"""
+Background plan generation after a goal change.
+
+When a turn changes the goal without producing every plan (the plans were
+deferred because the turn ran out of time, or the goal was parsed while
+answering a workout request), the follow-up request for the missing plan is
+the likely next turn. `PlanPrefetcher` starts that plan's tool call in the
+background and keeps the result keyed by the inputs it was built from. The
+follow-up turn `take`s it instead of calling the tool, or joins the call if
+it is still running. Results whose inputs have since changed are dropped.
+
+Prefetch never competes with turns for more than `max_concurrent` calls at a
+time, each job runs under its own `TurnBudget` rather than the turn's, and
+any job can be cancelled. A newer job for the same session and plan replaces
+the older one.
+
+Jobs run on an event loop of the prefetcher's own, in a daemon thread started
+with the first job. The entry points run each turn on a loop of its own
+(`asyncio.run` in app.py, a closed loop per turn in main.py), which would
+cancel a job started on it as soon as the turn that scheduled it ends.
+
+    PLAN_PREFETCH_CONCURRENCY  prefetch jobs running at once across all sessions (default 2; 0 disables)
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+from llm.budget import DEFAULT_TURN_BUDGET_S, TurnBudget, current_budget, use_budget
+
+DEFAULT_MAX_CONCURRENT = 2
+# Finished results kept for follow-ups, oldest dropped first.
+DEFAULT_CAPACITY = 1024
+
+
+class _Job:
+    __slots__ = ("key", "future")
+
+    def __init__(self, key: str, future: Any):
+        self.key = key
+        # A concurrent.futures.Future for the job's task on the prefetch loop.
+        self.future = future
+
+
+class PlanPrefetcher:
+    """Runs plan tool calls in the background and hands their results to the next turn that needs them."""
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT, capacity: int = DEFAULT_CAPACITY,
+                 budget_s: float = DEFAULT_TURN_BUDGET_S):
+        """
+        Args:
+            max_concurrent: Prefetch jobs running at once across all sessions; 0 disables prefetching.
+            capacity: Results and jobs kept, oldest dropped (and cancelled) first.
+            budget_s: Time limit of each job.
+        """
+        self.max_concurrent = max_concurrent
+        self.capacity = capacity
+        self.budget_s = budget_s
+        self._jobs: "OrderedDict[Tuple[str, str], _Job]" = OrderedDict()
+        # Guards `_jobs`, the counters and the loop thread, used both by turns and by the prefetch loop.
+        self._lock = threading.Lock()
+        self._loop: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._slots: Any = None
+        self._counters = {"scheduled": 0, "hits": 0, "joined": 0, "stale": 0, "cancelled": 0, "failed": 0}
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str] = os.environ) -> "PlanPrefetcher":
+        return cls(max_concurrent=int(env.get("PLAN_PREFETCH_CONCURRENCY", DEFAULT_MAX_CONCURRENT)))
+
+    def schedule(self, session: str, plan: str, key: str,
+                 factory: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> bool:
+        """
+        Starts generating a plan in the background, replacing any earlier job for the same session and plan.
+
+        Args:
+            session: The session (uid) the plan is for.
+            plan: "workout" or "meal".
+            key: Fingerprint of the inputs `factory` builds the plan from.
+            factory: Makes the tool call; its arguments must be taken from the session now, not when it runs.
+
+        Returns:
+            False if prefetching is disabled.
+        """
+        import asyncio  # Deferred: importing asyncio would dominate `import agent` (see bench_startup).
+
+        if self.max_concurrent <= 0:
+            return False
+        with self._lock:
+            existing = self._jobs.get((session, plan))
+            if existing is not None and existing.key == key and not existing.future.cancelled():
+                return True
+            self._cancel_locked(session, plan)
+            loop = self._start_loop()
+            self._jobs[(session, plan)] = _Job(key, asyncio.run_coroutine_threadsafe(self._run(self._slots, factory), loop))
+            self._counters["scheduled"] += 1
+            while len(self._jobs) > self.capacity:
+                (old_session, old_plan), _ = next(iter(self._jobs.items()))
+                self._cancel_locked(old_session, old_plan)
+        return True
+
+    async def take(self, session: str, plan: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        The prefetched result for these inputs, waiting for it if the job is still running.
+
+        Args:
+            session: The session (uid).
+            plan: "workout" or "meal".
+            key: Fingerprint of the inputs the caller would call the tool with.
+
+        Returns:
+            The tool result, or None if nothing usable was prefetched and the caller should call the tool itself.
+        """
+        import asyncio
+
+        with self._lock:
+            job = self._jobs.pop((session, plan), None)
+            if job is None:
+                return None
+            if job.key != key or job.future.cancelled():
+                job.future.cancel()
+                self._counters["stale"] += 1
+                return None
+            if job.future.done():
+                result = job.future.result()
+                self._counters["hits"] += result is not None
+                return result
+            self._counters["joined"] += 1
+        budget = current_budget()
+        # Only this turn's wait is bounded by its budget; the shield keeps a timed-out wait from cancelling the job.
+        waiter = asyncio.shield(asyncio.wrap_future(job.future))
+        try:
+            return await (budget.run(waiter, "plan_prefetch") if budget else waiter)
+        except asyncio.CancelledError:
+            if not job.future.cancelled():
+                raise
+            return None
+
+    def has(self, session: str, plan: str) -> bool:
+        """True if a job for this session and plan is running or finished, so `take` may have a result."""
+        with self._lock:
+            return (session, plan) in self._jobs
+
+    def cancel(self, session: str, plan: Optional[str] = None) -> None:
+        """Cancels a session's prefetch jobs (both plans unless `plan` is given) and drops their results."""
+        with self._lock:
+            for job_plan in ((plan,) if plan else ("workout", "meal")):
+                self._cancel_locked(session, job_plan)
+
+    def cancel_all(self) -> None:
+        with self._lock:
+            for session, plan in list(self._jobs):
+                self._cancel_locked(session, plan)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Cancels every job and stops the prefetch loop's thread."""
+        self.cancel_all()
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = self._slots = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if not job.future.done())
+            return {**self._counters, "pending": running, "ready": len(self._jobs) - running}
+
+    def _cancel_locked(self, session: str, plan: str) -> None:
+        job = self._jobs.pop((session, plan), None)
+        if job is not None and not job.future.done():
+            job.future.cancel()
+            self._counters["cancelled"] += 1
+
+    def _start_loop(self) -> Any:
+        import asyncio
+
+        if self._loop is None:
+            loop = asyncio.new_event_loop()
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+            self._thread = threading.Thread(target=loop.run_forever, name="plan-prefetch", daemon=True)
+            self._thread.start()
+            self._loop = loop
+        return self._loop
+
+    async def _run(self, slots: Any,
+                   factory: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        async with slots:
+            try:
+                # The turn that scheduled the job may end long before it; the job gets a budget of its own.
+                with use_budget(TurnBudget(self.budget_s)):
+                    return await factory()
+            except Exception as e:
+                with self._lock:
+                    self._counters["failed"] += 1
+                print(f"Plan prefetch failed: {e}")
+                return None
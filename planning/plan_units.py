@@ -0,0 +1,270 @@
+# planning/plan_units.py
+"""
+Structured, per-day plan storage with dependency metadata.
+
+Plans are kept in `ctx.plan_units` as one unit per day. Each unit records the
+fingerprints of the inputs it was built from and which of those inputs it
+depends on. When the goal, diet or injuries change, only days whose inputs
+changed are looked at, and of those only the days that no longer satisfy the
+new constraints are regenerated. The returned `PlanDiff` describes exactly
+which days changed and how, so the response can show just that.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from nutrition.energy import DailyTargets
+from nutrition.food_db import DietFilter
+from nutrition.meal_solver import MealChoice, MealPlan, MealPlanSolver
+from training.workout_composer import SESSIONS, WeekSpec, WorkoutComposer, WorkoutDay, WorkoutItem, WorkoutWeek
+
+MEAL_DEPENDENCIES = ["targets", "diet"]
+STRENGTH_DEPENDENCIES = ["split", "injuries", "emphasis"]
+CONDITIONING_DEPENDENCIES = ["split", "injuries"]
+# A kept meal day may miss the new calorie target by at most this fraction.
+CALORIE_TOLERANCE = 0.10
+PROTEIN_TOLERANCE = 0.20
+
+
+def fingerprint(value: Any) -> str:
+    """Short stable hash of a JSON-serializable input."""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+
+@dataclass
+class PlanDiff:
+    """Which inputs changed and which days were regenerated because of them."""
+    plan: str
+    changed_inputs: List[str] = field(default_factory=list)
+    regenerated: List[int] = field(default_factory=list)
+    changes: Dict[int, Tuple[List[str], List[str]]] = field(default_factory=dict)
+    total_days: int = 7
+
+    def summary(self) -> str:
+        if not self.changed_inputs:
+            return f"Your {self.plan} plan is unchanged."
+        reasons = " and ".join(name.replace("_", " ") for name in self.changed_inputs)
+        if not self.regenerated:
+            return f"Your {self.plan} plan still fits your updated {reasons}, so no days changed."
+        days = ", ".join(str(day) for day in self.regenerated)
+        kept = self.total_days - len(self.regenerated)
+        lines = [f"Updated your {self.plan} plan for day(s) {days} ({reasons} changed); {kept} day(s) stay the same."]
+        for day in self.regenerated:
+            removed, added = self.changes.get(day, ([], []))
+            if not removed and not added:
+                continue
+            lines.append(f"Day {day}:")
+            lines.extend(f"  - {line}" for line in removed)
+            lines.extend(f"  + {line}" for line in added)
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "plan": self.plan,
+            "changed_inputs": list(self.changed_inputs),
+            "regenerated": list(self.regenerated),
+            "summary": self.summary(),
+        }
+
+
+def _line_diff(old: List[str], new: List[str]) -> Tuple[List[str], List[str]]:
+    return [line for line in old if line not in new], [line for line in new if line not in old]
+
+
+def _changed(stored: Dict[str, str], current: Dict[str, str]) -> List[str]:
+    return [name for name, value in current.items() if stored.get(name) != value]
+
+
+# --- Meal plans ---
+
+def meal_inputs(targets: DailyTargets, diet: DietFilter) -> Dict[str, str]:
+    # Targets are rounded so recomputing the same goal never registers as a change.
+    rounded = [round(float(v)) for v in targets.as_array()]
+    return {"targets": fingerprint(rounded), "diet": fingerprint([diet.tags, diet.exclude])}
+
+
+def meal_units_from_plan(plan: MealPlan, inputs: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "inputs": dict(inputs),
+        "days": [_meal_day_unit(number, meals, inputs) for number, meals in enumerate(plan.days, start=1)],
+    }
+
+
+def _meal_day_unit(number: int, meals: List[MealChoice], inputs: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "day": number,
+        "depends_on": list(MEAL_DEPENDENCIES),
+        "inputs": {name: inputs[name] for name in MEAL_DEPENDENCIES},
+        "meals": [[meal.slot, meal.name, meal.servings] for meal in meals],
+    }
+
+
+def _restore_meals(unit: Dict[str, Any], solver: MealPlanSolver) -> Optional[List[MealChoice]]:
+    meals = []
+    for slot, name, servings in unit["meals"]:
+        food = solver.food_db.index_of(name)
+        if food is None:
+            return None
+        meals.append(solver.choice(slot, food, servings))
+    return meals
+
+
+def _meal_day_fits(meals: List[MealChoice], affected: List[str], targets: DailyTargets,
+                   diet: DietFilter, solver: MealPlanSolver) -> bool:
+    if "diet" in affected and not all(solver.food_db.allows(meal.food, diet) for meal in meals):
+        return False
+    if "targets" in affected:
+        calories, protein = sum(meal.nutrients[0] for meal in meals), sum(meal.nutrients[1] for meal in meals)
+        if abs(calories - targets.calories) > CALORIE_TOLERANCE * targets.calories:
+            return False
+        if abs(protein - targets.protein_g) > PROTEIN_TOLERANCE * targets.protein_g:
+            return False
+    return True
+
+
+def update_meal_units(
+    units: Dict[str, Any],
+    targets: DailyTargets,
+    diet: DietFilter,
+    solver: MealPlanSolver,
+) -> Tuple[Dict[str, Any], MealPlan, PlanDiff]:
+    """
+    Brings a stored meal plan in line with new targets and diet, regenerating only the days that no longer fit.
+
+    Args:
+        units: The stored meal plan units (`ctx.plan_units["meal"]`).
+        targets: The new daily targets.
+        diet: The new diet constraints.
+        solver: Solver used for the days that need regenerating.
+
+    Returns:
+        The updated units, the resulting meal plan and the diff against the stored plan.
+    """
+    inputs = meal_inputs(targets, diet)
+    diff = PlanDiff(plan="meal", changed_inputs=_changed(units.get("inputs", {}), inputs),
+                    total_days=len(units["days"]))
+    days: List[Optional[List[MealChoice]]] = []
+    stale = []
+    for unit in units["days"]:
+        meals = _restore_meals(unit, solver)
+        affected = [name for name in unit.get("depends_on", MEAL_DEPENDENCIES)
+                    if unit.get("inputs", {}).get(name) != inputs.get(name)]
+        if meals is None or (affected and not _meal_day_fits(meals, affected, targets, diet, solver)):
+            stale.append(len(days))
+        days.append(meals)
+
+    for position in stale:
+        old_lines = [meal.describe() for meal in days[position]] if days[position] else []
+        # Penalise the neighbouring days' foods so the regenerated day keeps the week varied.
+        neighbours = [days[i] for i in (position - 1, position + 1) if 0 <= i < len(days) and days[i]]
+        avoid = {meal.food for day in neighbours for meal in day}
+        days[position] = solver.solve_day(targets, diet, avoid)
+        day_number = position + 1
+        diff.regenerated.append(day_number)
+        diff.changes[day_number] = _line_diff(old_lines, [meal.describe() for meal in days[position]])
+
+    plan = MealPlan(days=days, targets=targets)
+    return meal_units_from_plan(plan, inputs), plan, diff
+
+
+# --- Workout plans ---
+
+def workout_inputs(spec: WeekSpec) -> Dict[str, str]:
+    return {
+        "split": fingerprint([spec.split, spec.difficulty, spec.scheme, spec.cardio_minutes]),
+        "injuries": fingerprint(sorted(spec.injuries)),
+        "emphasis": fingerprint(spec.emphasis),
+    }
+
+
+def _workout_day_inputs(spec: WeekSpec, number: int) -> Dict[str, str]:
+    # A day only depends on its own session and prescription, not on the rest of the split.
+    session_key = spec.split[number - 1]
+    inputs = workout_inputs(spec)
+    inputs["split"] = fingerprint([session_key, spec.difficulty, spec.scheme, spec.cardio_minutes])
+    return {name: inputs[name] for name in _workout_dependencies(session_key)}
+
+
+def _workout_dependencies(session_key: str) -> List[str]:
+    return list(CONDITIONING_DEPENDENCIES if session_key in ("cardio", "rest") else STRENGTH_DEPENDENCIES)
+
+
+def workout_units_from_week(week: WorkoutWeek, spec: WeekSpec, missing: Optional[Dict[int, List[str]]] = None) -> Dict[str, Any]:
+    missing = missing or {}
+    days = []
+    for day in week.days:
+        session_key = spec.split[day.day - 1]
+        days.append({
+            "day": day.day,
+            "session": session_key,
+            "depends_on": _workout_dependencies(session_key),
+            "inputs": _workout_day_inputs(spec, day.day),
+            "items": [[item.exercise, item.pattern, item.prescription] for item in day.items],
+            "missing": list(missing.get(day.day, [])),
+        })
+    return {"inputs": workout_inputs(spec), "days": days}
+
+
+def _restore_workout_day(unit: Dict[str, Any]) -> WorkoutDay:
+    return WorkoutDay(
+        day=unit["day"],
+        session=SESSIONS[unit["session"]][0],
+        items=[WorkoutItem(exercise, pattern, prescription) for exercise, pattern, prescription in unit["items"]],
+    )
+
+
+def _workout_day_fits(unit: Dict[str, Any], affected: List[str], spec: WeekSpec, composer: WorkoutComposer) -> bool:
+    if "split" in affected or "emphasis" in affected:
+        return False
+    if "injuries" in affected:
+        if unit.get("missing"):
+            return False  # A pattern skipped for an old injury may be possible now.
+        by_name = {exercise.name: exercise for exercise in composer.catalog.exercises}
+        for exercise_name, _, _ in unit["items"]:
+            exercise = by_name.get(exercise_name)
+            if exercise is None or exercise.contraindications & spec.injury_mask:
+                return False
+    return True
+
+
+def update_workout_units(
+    units: Dict[str, Any],
+    spec: WeekSpec,
+    composer: WorkoutComposer,
+) -> Tuple[Dict[str, Any], WorkoutWeek, PlanDiff]:
+    """
+    Brings a stored workout plan in line with a new goal, level or injuries, regenerating only affected days.
+
+    Args:
+        units: The stored workout plan units (`ctx.plan_units["workout"]`).
+        spec: The week spec for the new inputs.
+        composer: Composer used for the days that need regenerating.
+
+    Returns:
+        The updated units, the resulting week and the diff against the stored plan.
+    """
+    diff = PlanDiff(plan="workout", changed_inputs=_changed(units.get("inputs", {}), workout_inputs(spec)),
+                    total_days=len(spec.split))
+    stored = {unit["day"]: unit for unit in units["days"]}
+    days, missing = [], {}
+    for number in range(1, len(spec.split) + 1):
+        unit = stored.get(number)
+        if unit is not None and unit["session"] == spec.split[number - 1]:
+            inputs = _workout_day_inputs(spec, number)
+            affected = [name for name in unit.get("depends_on", STRENGTH_DEPENDENCIES)
+                        if unit.get("inputs", {}).get(name) != inputs.get(name)]
+            if not affected or _workout_day_fits(unit, affected, spec, composer):
+                days.append(_restore_workout_day(unit))
+                missing[number] = unit.get("missing", [])
+                continue
+        old = [_restore_workout_day(unit).describe()] if unit is not None else []
+        day, missing[number] = composer.compose_day(spec, number)
+        days.append(day)
+        diff.regenerated.append(number)
+        diff.changes[number] = _line_diff(old, [day.describe()])
+
+    skipped = [f"day {number} {pattern}" for number, patterns in missing.items() for pattern in patterns]
+    week = WorkoutWeek(days=days, level=spec.difficulty, injuries=spec.injuries, skipped=skipped)
+    return workout_units_from_week(week, spec, missing), week, diff
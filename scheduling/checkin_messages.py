@@ -0,0 +1,185 @@
+# scheduling/checkin_messages.py
+
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from agents import ModelSettings, OpenAIChatCompletionsModel
+
+from context import UserSessionContext
+from llm.tracing import ModelTracing
+from scheduling.engine import CheckinScheduler, DueCheckin
+from storage.session_store import SESSION_DIR, load_session_context, load_session_contexts, save_session_context
+
+FALLBACK_TEMPLATE = (
+    "Hi {name}! It's time for your {cadence} check-in on your {goal} goal. "
+    "How are things going? Let me know and I can adjust your plan."
+)
+
+TEMPLATE_SYSTEM_PROMPT = """
+You write a short, friendly check-in message template for a group of users of a health and wellness assistant.
+All users in the group share the goal: "{goal}".
+Use these placeholders exactly, they are filled in per user: {{name}}, {{goal}}, {{cadence}}.
+Do not use any other curly braces. Keep it under 60 words and end with a question.
+Respond ONLY with the check-in message template.
+"""
+
+
+# Serializes check-in appends to one session file within this process (see `CheckinBatchJob._append`).
+_session_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+_session_locks_guard = threading.Lock()
+
+
+class _KeepMissing(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def goal_group_key(goal: Optional[Dict]) -> str:
+    """Normalizes a parsed goal into the key used to group users for one template."""
+    if not goal:
+        return "general health"
+    name = goal.get("name") or " ".join(str(goal.get(k) or "") for k in ("action", "unit"))
+    return " ".join(name.replace("_", " ").lower().split()) or "general health"
+
+
+def fill_template(template: str, ctx: UserSessionContext, cadence: str) -> str:
+    """Fills the per-user fields of a group template locally."""
+    fields = _KeepMissing(name=ctx.name, goal=goal_group_key(ctx.goal), cadence=cadence)
+    try:
+        return template.format_map(fields)
+    except (ValueError, IndexError):
+        return FALLBACK_TEMPLATE.format_map(fields)
+
+
+class CheckinBatchJob:
+    """
+    Generates proactive check-in messages for all users that are due.
+
+    Due users are grouped by goal and each group costs a single model call for a
+    template; per-user fields are filled locally.
+
+    Each message is appended to the session as it is at write time, not as it was
+    loaded before the model calls, so turns saved in the meantime are kept. With the
+    app's `SessionCache`, the message goes into the live in-memory session and out
+    through the cache's writer. Without one, the session file is re-loaded and
+    written back under a per-session lock.
+    """
+
+    def __init__(
+        self,
+        model: OpenAIChatCompletionsModel,
+        scheduler: Optional[CheckinScheduler] = None,
+        session_dir: str = SESSION_DIR,
+        max_concurrency: int = 8,
+        sessions: Optional[Any] = None,
+    ):
+        """
+        Args:
+            model: Writes one template per goal group.
+            scheduler: Source of due check-ins when `run` is not given any.
+            session_dir: Directory of the session files, used when `sessions` is None.
+            max_concurrency: Template requests in flight at once.
+            sessions: The `SessionCache` the app serves sessions from, if the job runs in the app's process.
+        """
+        self.model = model
+        self.scheduler = scheduler
+        self.session_dir = session_dir
+        self.sessions = sessions
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def collect_due(self, window_end: Optional[float] = None) -> List[DueCheckin]:
+        """
+        Takes the check-ins due at or before `window_end` (defaults to now) from the scheduler.
+
+        Each is advanced to its next occurrence, so a later run (e.g. the next cron
+        invocation) does not send the same check-in again.
+        """
+        if self.scheduler is None:
+            return []
+        return self.scheduler.pop_due(window_end)
+
+    async def _generate_template(self, goal: str) -> str:
+        async with self._semaphore:
+            try:
+                response_obj = await self.model.get_response(
+                    system_instructions=TEMPLATE_SYSTEM_PROMPT.format(goal=goal),
+                    input=f"Write the check-in message template for the '{goal}' group.",
+                    model_settings=ModelSettings(temperature=0.7),
+                    tools=[],
+                    output_schema=None,
+                    handoffs=[],
+                    tracing=ModelTracing.DISABLED,
+                )
+                template = response_obj.output[0].content[0].text.strip()
+            except Exception as e:
+                print(f"Error generating check-in template for '{goal}': {e}")
+                return FALLBACK_TEMPLATE
+        return template or FALLBACK_TEMPLATE
+
+    async def run(self, checkins: Optional[Iterable[DueCheckin]] = None,
+                  window_end: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Generates and stores check-in messages.
+
+        Args:
+            checkins: Due check-ins to process, e.g. a batch from `CheckinScheduler.run_worker`.
+                If omitted, all check-ins due by `window_end` are collected from the scheduler.
+            window_end: End of the due window in epoch seconds, used when `checkins` is omitted.
+
+        Returns:
+            A dictionary with the generated messages per uid and throughput figures.
+        """
+        start = time.perf_counter()
+        due = list(checkins) if checkins is not None else self.collect_due(window_end)
+        cadence_by_uid = {checkin.uid: checkin.cadence for checkin in due}
+
+        groups: Dict[str, List[UserSessionContext]] = defaultdict(list)
+        contexts = (
+            load_session_contexts(cadence_by_uid, self.session_dir) if self.sessions is None
+            else (self.sessions.get(uid) for uid in cadence_by_uid)
+        )
+        for ctx in contexts:
+            groups[goal_group_key(ctx.goal)].append(ctx)
+
+        goals = list(groups)
+        templates = await asyncio.gather(*(self._generate_template(goal) for goal in goals))
+
+        messages = {}
+        for goal, template in zip(goals, templates):
+            for ctx in groups[goal]:
+                message = fill_template(template, ctx, cadence_by_uid[ctx.uid])
+                self._append(ctx.uid, message)
+                messages[ctx.uid] = message
+
+        elapsed = time.perf_counter() - start
+        return {
+            "ok": True,
+            "messages": messages,
+            "users": len(messages),
+            "groups": len(goals),
+            "model_calls": len(goals),
+            "elapsed_s": elapsed,
+            "users_per_s": len(messages) / elapsed if elapsed else 0.0,
+        }
+
+    async def handle(self, batch: List[DueCheckin]) -> Dict[str, Any]:
+        """Adapter so the job can be passed directly as a `run_worker` handler. Returns `run`'s result."""
+        return await self.run(batch)
+
+    def _append(self, uid: str, message: str) -> None:
+        """Adds a check-in message to the session's latest state and stores it."""
+        turn = {"role": "assistant", "content": message}
+        if self.sessions is not None:
+            ctx = self.sessions.get(uid)
+            ctx.chat_history.append(turn)
+            self.sessions.put(uid, ctx)
+            return
+        with _session_locks_guard:
+            lock = _session_locks[uid]
+        with lock:
+            ctx = load_session_context(uid, self.session_dir)
+            ctx.chat_history.append(turn)
+            save_session_context(uid, ctx, self.session_dir)
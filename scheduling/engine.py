@@ -0,0 +1,162 @@
+# scheduling/engine.py
+
+import asyncio
+import calendar
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+
+from scheduling.timer_queue import TimerQueue
+from scheduling.timer_store import TimerStore
+
+CADENCES = ("daily", "weekly", "monthly")
+
+
+@dataclass
+class DueCheckin:
+    """A check-in that has come due and is handed to the worker's handler."""
+    uid: str
+    cadence: str
+    level: str
+    due_at: float
+
+
+def next_due_at(due_at: float, cadence: str) -> float:
+    """
+    Returns the next occurrence after `due_at` for the given cadence.
+    Monthly check-ins keep the day of month, clamped to the month's length.
+    """
+    if cadence == "daily":
+        return due_at + 86400
+    if cadence == "weekly":
+        return due_at + 7 * 86400
+    if cadence == "monthly":
+        current = datetime.fromtimestamp(due_at, tz=timezone.utc)
+        year, month = (current.year + 1, 1) if current.month == 12 else (current.year, current.month + 1)
+        day = min(current.day, calendar.monthrange(year, month)[1])
+        return current.replace(year=year, month=month, day=day).timestamp()
+    raise ValueError(f"Unknown cadence '{cadence}'. Expected one of {CADENCES}.")
+
+
+class CheckinScheduler:
+    """
+    Check-in scheduling engine.
+
+    Timers are persisted in a `TimerStore` and mirrored in an indexed min-heap
+    (`TimerQueue`) so the worker can find due check-ins without touching disk.
+    Cadence and level are kept in memory per uid for rescheduling after firing.
+    """
+
+    def __init__(self, store: Optional[TimerStore] = None, clock: Callable[[], float] = time.time):
+        self.store = store or TimerStore()
+        self.queue = TimerQueue()
+        self.clock = clock
+        self._meta = {}
+        self.recover()
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def recover(self) -> int:
+        """Rebuilds the in-memory queue from the store. Returns the number of pending timers."""
+        rows = self.store.load_all()
+        self._meta = {uid: (cadence, level) for uid, cadence, level, _ in rows}
+        self.queue.rebuild((uid, due_at) for uid, _, _, due_at in rows)
+        return len(rows)
+
+    def schedule(self, uid: str, cadence: str = "weekly", level: str = "beginner",
+                 start_at: Optional[float] = None) -> float:
+        """
+        Schedules (or reschedules) recurring check-ins for a uid.
+
+        Args:
+            uid: The user's session ID.
+            cadence: 'daily', 'weekly' or 'monthly'.
+            level: The user's fitness level, passed through to the handler.
+            start_at: Epoch seconds of the first check-in. Defaults to one cadence from now.
+
+        Returns:
+            The epoch time of the first check-in.
+        """
+        if cadence not in CADENCES:
+            raise ValueError(f"Unknown cadence '{cadence}'. Expected one of {CADENCES}.")
+        due_at = start_at if start_at is not None else next_due_at(self.clock(), cadence)
+        self.store.upsert(uid, cadence, level, due_at)
+        self._meta[uid] = (cadence, level)
+        self.queue.push(uid, due_at)
+        return due_at
+
+    def cancel(self, uid: str) -> bool:
+        """Cancels all future check-ins for a uid."""
+        self._meta.pop(uid, None)
+        removed = self.queue.cancel(uid)
+        return self.store.delete(uid) or removed
+
+    def next_checkin(self, uid: str) -> Optional[float]:
+        return self.queue.due_at(uid)
+
+    def pop_due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[DueCheckin]:
+        """
+        Removes due check-ins from the queue and claims each in the store by moving it
+        to its next occurrence, in one transaction.
+
+        A claim only succeeds if the stored due time is still the one this queue holds,
+        so when several processes share the database each check-in fires in one of them.
+        Check-ins claimed elsewhere are re-queued at their stored due time instead.
+        """
+        now = self.clock() if now is None else now
+        due = {}
+        claims = []
+        for uid, due_at in self.queue.pop_due(now, limit):
+            cadence, level = self._meta[uid]
+            following = next_due_at(due_at, cadence)
+            # Skip occurrences missed while the process was down rather than firing a backlog.
+            while following <= now:
+                following = next_due_at(following, cadence)
+            due[uid] = (DueCheckin(uid=uid, cadence=cadence, level=level, due_at=due_at), following)
+            claims.append((uid, due_at, following))
+        claimed = set(self.store.claim_many(claims)) if claims else set()
+
+        fired = []
+        for uid, (checkin, following) in due.items():
+            if uid in claimed:
+                self.queue.push(uid, following)
+                fired.append(checkin)
+                continue
+            row = self.store.get(uid)
+            if row is None:
+                self._meta.pop(uid, None)
+            else:
+                self._meta[uid] = (row[1], row[2])
+                self.queue.push(uid, row[3])
+        return fired
+
+    async def run_worker(
+        self,
+        handler: Callable[[List[DueCheckin]], Awaitable[None]],
+        stop_event: Optional[asyncio.Event] = None,
+        batch_size: int = 500,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """
+        Fires due check-ins in batches until `stop_event` is set.
+
+        The worker sleeps until the earliest timer is due (capped at `poll_interval`
+        so newly scheduled timers are picked up) and hands each batch to `handler`.
+        """
+        stop_event = stop_event or asyncio.Event()
+        while not stop_event.is_set():
+            batch = self.pop_due(limit=batch_size)
+            if batch:
+                try:
+                    await handler(batch)
+                except Exception as e:
+                    print(f"Error handling check-in batch of {len(batch)}: {e}")
+                continue
+            head = self.queue.peek()
+            delay = poll_interval if head is None else min(poll_interval, max(0.0, head[1] - self.clock()))
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,139 @@
+# scheduling/timer_queue.py
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Heap entries are [due_at, seq, uid]; seq breaks ties in insertion order.
+_DUE, _SEQ, _UID = 0, 1, 2
+
+
+class TimerQueue:
+    """
+    Indexed binary min-heap of check-in due times keyed by uid.
+
+    Keeps a uid -> heap position map so that insert, reschedule and cancel are
+    all O(log n), and popping due entries is O(k log n) for k due timers.
+    """
+
+    def __init__(self):
+        self._heap: List[list] = []
+        self._pos: Dict[str, int] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._pos
+
+    def push(self, uid: str, due_at: float) -> None:
+        """Adds a timer for uid, or moves it if the uid is already queued."""
+        index = self._pos.get(uid)
+        self._seq += 1
+        if index is not None:
+            entry = self._heap[index]
+            old_due = entry[_DUE]
+            entry[_DUE] = due_at
+            entry[_SEQ] = self._seq
+            if due_at < old_due:
+                self._sift_up(index)
+            else:
+                self._sift_down(index)
+            return
+        self._heap.append([due_at, self._seq, uid])
+        self._pos[uid] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def cancel(self, uid: str) -> bool:
+        """Removes the timer for uid. Returns True if it was queued."""
+        index = self._pos.pop(uid, None)
+        if index is None:
+            return False
+        last = self._heap.pop()
+        if index < len(self._heap):
+            self._heap[index] = last
+            self._pos[last[_UID]] = index
+            self._sift_up(index)
+            self._sift_down(self._pos[last[_UID]])
+        return True
+
+    def due_at(self, uid: str) -> Optional[float]:
+        index = self._pos.get(uid)
+        return None if index is None else self._heap[index][_DUE]
+
+    def peek(self) -> Optional[Tuple[str, float]]:
+        """Returns (uid, due_at) of the earliest timer without removing it."""
+        if not self._heap:
+            return None
+        entry = self._heap[0]
+        return entry[_UID], entry[_DUE]
+
+    def pop_due(self, now: float, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Removes and returns up to `limit` timers due at or before `now`, earliest first."""
+        due = []
+        while self._heap and self._heap[0][_DUE] <= now:
+            if limit is not None and len(due) >= limit:
+                break
+            entry = self._heap[0]
+            self.cancel(entry[_UID])
+            due.append((entry[_UID], entry[_DUE]))
+        return due
+
+    def rebuild(self, timers: Iterable[Tuple[str, float]]) -> None:
+        """Replaces the queue contents in O(n), used when recovering from the store."""
+        self._heap = []
+        for uid, due_at in timers:
+            self._seq += 1
+            self._heap.append([due_at, self._seq, uid])
+        for index in range(len(self._heap) // 2 - 1, -1, -1):
+            self._sift_down_no_index(index)
+        self._pos = {entry[_UID]: index for index, entry in enumerate(self._heap)}
+
+    def _less(self, a: list, b: list) -> bool:
+        return (a[_DUE], a[_SEQ]) < (b[_DUE], b[_SEQ])
+
+    def _sift_up(self, index: int) -> None:
+        heap = self._heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if not self._less(entry, heap[parent]):
+                break
+            heap[index] = heap[parent]
+            self._pos[heap[index][_UID]] = index
+            index = parent
+        heap[index] = entry
+        self._pos[entry[_UID]] = index
+
+    def _sift_down(self, index: int) -> None:
+        heap = self._heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and self._less(heap[child + 1], heap[child]):
+                child += 1
+            if not self._less(heap[child], entry):
+                break
+            heap[index] = heap[child]
+            self._pos[heap[index][_UID]] = index
+            index = child
+        heap[index] = entry
+        self._pos[entry[_UID]] = index
+
+    def _sift_down_no_index(self, index: int) -> None:
+        heap = self._heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and self._less(heap[child + 1], heap[child]):
+                child += 1
+            if not self._less(heap[child], entry):
+                break
+            heap[index] = heap[child]
+            index = child
+        heap[index] = entry
@@ -0,0 +1,104 @@
+# scheduling/timer_store.py
+
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+# (uid, cadence, level, due_at)
+TimerRow = Tuple[str, str, str, float]
+
+
+class TimerStore:
+    """
+    SQLite-backed persistent store for scheduled check-ins.
+
+    One row per uid; re-scheduling a uid replaces its row. The store is the
+    source of truth across restarts, the in-memory queue is rebuilt from it.
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkins (
+                uid TEXT PRIMARY KEY,
+                cadence TEXT NOT NULL,
+                level TEXT NOT NULL,
+                due_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_checkins_due ON checkins (due_at)")
+        self._conn.commit()
+
+    def upsert(self, uid: str, cadence: str, level: str, due_at: float) -> None:
+        """Inserts or replaces the check-in for a uid."""
+        self.upsert_many([(uid, cadence, level, due_at)])
+
+    def upsert_many(self, rows: Iterable[TimerRow]) -> None:
+        """Inserts or replaces many check-ins in a single transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkins (uid, cadence, level, due_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def claim_many(self, claims: Iterable[Tuple[str, float, float]]) -> List[str]:
+        """
+        Moves due check-ins to their next due time, each only if it is still due when expected.
+
+        Args:
+            claims: (uid, due_at as last seen, next due_at) per check-in.
+
+        Returns:
+            The uids claimed here. The others were advanced, rescheduled or cancelled elsewhere,
+            e.g. by another process sharing the database, and must not fire.
+        """
+        claimed = []
+        with self._lock, self._conn:
+            for uid, due_at, following in claims:
+                cursor = self._conn.execute(
+                    "UPDATE checkins SET due_at = ? WHERE uid = ? AND due_at = ?", (following, uid, due_at)
+                )
+                if cursor.rowcount:
+                    claimed.append(uid)
+        return claimed
+
+    def delete(self, uid: str) -> bool:
+        """Deletes the check-in for a uid. Returns True if a row was removed."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM checkins WHERE uid = ?", (uid,))
+            return cursor.rowcount > 0
+
+    def get(self, uid: str) -> Optional[TimerRow]:
+        """Returns the stored check-in for a uid, if any."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT uid, cadence, level, due_at FROM checkins WHERE uid = ?", (uid,)
+            ).fetchone()
+
+    def load_all(self) -> List[TimerRow]:
+        """Returns every pending check-in, used to recover the queue after a restart."""
+        with self._lock:
+            return self._conn.execute("SELECT uid, cadence, level, due_at FROM checkins").fetchall()
+
+    def load_due(self, until: float) -> List[TimerRow]:
+        """Returns check-ins due at or before `until`, ordered by due time."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT uid, cadence, level, due_at FROM checkins WHERE due_at <= ? ORDER BY due_at",
+                (until,),
+            ).fetchall()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM checkins").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,292 @@
+# serving/worker_pool.py
+
+import asyncio
+import concurrent.futures
+import hashlib
+import importlib
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections import defaultdict
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, List, Optional
+
+from guardrails.response_pipeline import history_turn
+from storage.session_store import SESSION_DIR
+
+DEFAULT_AGENT_FACTORY = "agent:HealthPlannerAgent"
+
+
+def load_factory(spec: str) -> Callable[[], Any]:
+    """Resolves a "module:callable" spec. Specs are passed to workers instead of objects so they pickle."""
+    module_name, attr = spec.split(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def journal_path_for(session_dir: str, index: int) -> str:
+    return os.path.join(session_dir, f".journal-{index}")
+
+
+def _worker_main(index: int, requests, responses, agent_factory: str, session_dir: str, cache_capacity: int,
+                 shared_cache_path: Optional[str] = None):
+    if shared_cache_path:
+        # Read by the agent when it first opens the shared cache (see caching/shared_cache.py).
+        os.environ["SHARED_CACHE_PATH"] = shared_cache_path
+    asyncio.run(_serve(index, requests, responses, agent_factory, session_dir, cache_capacity))
+
+
+async def _serve(index: int, requests, responses, agent_factory: str, session_dir: str, cache_capacity: int):
+    """Worker process: one event loop, one agent and one warm session cache."""
+    from storage.session_cache import SessionCache
+
+    agent = load_factory(agent_factory)()
+    cache = SessionCache(cache_capacity, session_dir, journal_path=journal_path_for(session_dir, index)).start()
+    session_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+    loop = asyncio.get_running_loop()
+    pending = set()
+
+    async def handle(request_id: int, uid: str, user_input: str):
+        # Turns for the same session are applied in arrival order.
+        async with session_locks[uid]:
+            ctx = cache.get(uid)
+            try:
+                result = await agent.run(user_input, ctx)
+            except Exception as e:
+                result = {"ok": False, "response": f"An error occurred: {e}"}
+            ctx.chat_history.append({"role": "user", "content": user_input})
+            ctx.chat_history.append(history_turn(result))
+            cache.put(uid, ctx)
+        # Only the event loop thread writes to the pipe, so no lock is needed.
+        responses.send((request_id, result))
+
+    while True:
+        try:
+            request = await loop.run_in_executor(None, requests.recv)
+        except EOFError:
+            request = None
+        if request is None:
+            break
+        task = asyncio.create_task(handle(*request))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+    cache.close()
+
+
+class _WorkerSlot:
+    """Dispatcher-side handle of one worker: its process and the pipe ends we own."""
+
+    def __init__(self, process, requests, responses):
+        self.process = process
+        self.requests = requests
+        self.responses = responses
+        self.send_lock = threading.Lock()
+
+
+class WorkerPool:
+    """
+    Serves agent turns from N worker processes, each with its own event loop and agent.
+
+    Sessions are routed to workers by rendezvous hashing of the uid, so a session
+    always lands on the same worker and its cached context stays warm. When a worker
+    dies it is respawned in the same slot (its journal is replayed on start); if
+    respawning is disabled, its sessions move to the surviving workers after the
+    dispatcher replays the dead worker's journal to disk. Turns the dead worker had
+    accepted but not answered are re-dispatched, so delivery is at least once.
+
+    Each worker gets its own pair of pipes instead of a shared multiprocessing.Queue:
+    a worker killed while holding a shared queue's lock would wedge all the others.
+
+    With `shared_cache_path`, all workers map the same cache file, so a plan or
+    answer generated by one worker is served by the others.
+    """
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        agent_factory: str = DEFAULT_AGENT_FACTORY,
+        session_dir: str = SESSION_DIR,
+        cache_capacity: int = 1024,
+        respawn: bool = True,
+        shared_cache_path: Optional[str] = None,
+    ):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.agent_factory = agent_factory
+        self.session_dir = session_dir
+        self.cache_capacity = cache_capacity
+        self.respawn = respawn
+        self.shared_cache_path = shared_cache_path
+
+        self._mp = multiprocessing.get_context("spawn")
+        self._slots: List[Optional[_WorkerSlot]] = [None] * self.num_workers
+        self._live: List[int] = []
+        self._inflight: Dict[int, tuple] = {}
+        self._request_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stop = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self._counters = {"dispatched": [0] * self.num_workers, "restarts": 0, "rerouted": 0}
+
+    def start(self) -> "WorkerPool":
+        os.makedirs(self.session_dir, exist_ok=True)
+        for index in range(self.num_workers):
+            self._slots[index] = self._spawn(index)
+            self._live.append(index)
+        self._monitor = threading.Thread(target=self._monitor_loop, name="worker-pool-monitor", daemon=True)
+        self._monitor.start()
+        return self
+
+    def _spawn(self, index: int) -> _WorkerSlot:
+        request_reader, request_writer = self._mp.Pipe(duplex=False)
+        response_reader, response_writer = self._mp.Pipe(duplex=False)
+        process = self._mp.Process(
+            target=_worker_main,
+            args=(index, request_reader, response_writer, self.agent_factory,
+                  self.session_dir, self.cache_capacity, self.shared_cache_path),
+            name=f"health-agent-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        # Close our copies of the child's ends so a dead worker shows up as EOF.
+        request_reader.close()
+        response_writer.close()
+        return _WorkerSlot(process, request_writer, response_reader)
+
+    def worker_for(self, uid: str) -> int:
+        """Returns the worker slot that owns `uid` among the live workers."""
+        with self._lock:
+            return self._owner(uid)
+
+    def _owner(self, uid: str) -> int:
+        # Rendezvous hashing: removing a worker only moves the sessions it owned.
+        if not self._live:
+            raise RuntimeError("No live workers in the pool.")
+        return max(self._live, key=lambda index: hashlib.blake2b(f"{uid}:{index}".encode(), digest_size=8).digest())
+
+    def worker_pid(self, index: int) -> Optional[int]:
+        slot = self._slots[index]
+        return slot.process.pid if slot is not None else None
+
+    def submit(self, uid: str, user_input: str) -> concurrent.futures.Future:
+        """Sends a turn to the worker owning `uid`. The future resolves to the agent's response dict."""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._dispatch(next(self._request_ids), uid, user_input, future)
+        return future
+
+    def _dispatch(self, request_id: int, uid: str, user_input: str, future: concurrent.futures.Future):
+        with self._lock:
+            index = self._owner(uid)
+            self._inflight[request_id] = (index, uid, user_input, future)
+            self._counters["dispatched"][index] += 1
+            slot = self._slots[index]
+        try:
+            with slot.send_lock:
+                slot.requests.send((request_id, uid, user_input))
+        except OSError:
+            # The worker is gone; the monitor re-dispatches everything in flight for its slot.
+            pass
+
+    async def run(self, uid: str, user_input: str) -> Dict[str, Any]:
+        return await asyncio.wrap_future(self.submit(uid, user_input))
+
+    def run_sync(self, uid: str, user_input: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.submit(uid, user_input).result(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.num_workers,
+                "live": list(self._live),
+                "inflight": len(self._inflight),
+                "dispatched": list(self._counters["dispatched"]),
+                "restarts": self._counters["restarts"],
+                "rerouted": self._counters["rerouted"],
+            }
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Lets workers finish in-flight turns and flush their session caches, then stops them."""
+        self._stopping.set()
+        for index in list(self._live):
+            slot = self._slots[index]
+            try:
+                with slot.send_lock:
+                    slot.requests.send(None)
+            except OSError:
+                pass
+        # The monitor keeps draining responses while workers finish, so none are lost.
+        for index in list(self._live):
+            process = self._slots[index].process
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._stop.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout)
+
+    def __enter__(self) -> "WorkerPool":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _monitor_loop(self):
+        last_check = time.monotonic()
+        while not self._stop.is_set():
+            with self._lock:
+                readers = {self._slots[index].responses: index for index in self._live}
+            dead = set()
+            for reader in wait(list(readers), timeout=0.2):
+                try:
+                    request_id, result = reader.recv()
+                except (EOFError, OSError):
+                    dead.add(readers[reader])
+                    continue
+                with self._lock:
+                    entry = self._inflight.pop(request_id, None)
+                if entry is not None and not entry[3].done():
+                    entry[3].set_result(result)
+            if dead or time.monotonic() - last_check > 0.2:
+                self._check_workers(dead)
+                last_check = time.monotonic()
+
+    def _check_workers(self, dead: set):
+        if self._stopping.is_set():
+            return
+        for index in list(self._live):
+            slot = self._slots[index]
+            if index not in dead and slot.process.is_alive():
+                continue
+            slot.process.join(1)
+            print(f"[POOL] Worker {index} exited with code {slot.process.exitcode}")
+            replacement = self._spawn(index) if self.respawn else None
+            if replacement is None:
+                from storage.session_cache import SessionCache
+                # Replaying the journal puts the dead worker's unflushed sessions on disk for their new owners.
+                SessionCache(session_dir=self.session_dir, journal_path=journal_path_for(self.session_dir, index)).close()
+
+            with self._lock:
+                # Swapping the slot and collecting its orphans under one lock means a turn is either
+                # sent to the replacement or re-dispatched below, never lost in between.
+                if replacement is not None:
+                    # The replacement replays the slot's journal on start, so the slot's sessions stay put.
+                    self._slots[index] = replacement
+                    self._counters["restarts"] += 1
+                else:
+                    self._live.remove(index)
+                orphaned = [(rid, entry) for rid, entry in self._inflight.items() if entry[0] == index]
+                for rid, _ in orphaned:
+                    del self._inflight[rid]
+                self._counters["rerouted"] += len(orphaned)
+            slot.requests.close()
+            slot.responses.close()
+
+            for rid, (_, uid, user_input, future) in orphaned:
+                try:
+                    self._dispatch(rid, uid, user_input, future)
+                except RuntimeError as e:
+                    future.set_exception(e)
@@ -0,0 +1,346 @@
+# storage/session_archive.py
+"""
+Cold tier for idle sessions.
+
+`archive_cold_sessions` moves session files that have not been written for
+`idle_days` into gzip archives under `<session_dir>/archive/`, one archive per
+day of last activity. Each session is stored as its own gzip member (compact
+JSON), and `index.json` maps the uid to its archive, offset and length. A
+lookup is therefore one dict access plus one seek and read. The session
+loaders in `storage.session_store` call `rehydrate` when a session file is
+missing, which moves the session back to the hot tier on first access.
+
+Rehydrated sessions stay in their archive file but are dropped from the
+index. `compact` (run by `archive_cold_sessions` after each pass) rewrites
+archives that are mostly such dead members, and deletes archives with none
+left.
+
+The archive job usually runs as a separate process from the servers that
+rehydrate. Every change to the index therefore holds an exclusive `fcntl`
+lock on `index.lock` and re-reads the index under it, so neither side
+overwrites entries the other just added or removed.
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: the index is then only protected within one process.
+    fcntl = None
+
+from storage.session_store import SESSION_DIR, list_session_ids, session_path
+
+ARCHIVE_DIRNAME = "archive"
+INDEX_FILENAME = "index.json"
+LOCK_FILENAME = "index.lock"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+DEFAULT_IDLE_DAYS = 30
+
+
+@dataclass
+class ArchiveReport:
+    archived: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    bytes_reclaimed: int = 0
+
+    @property
+    def space_saved(self) -> float:
+        """Fraction of the disk space the archived sessions no longer take."""
+        return 1 - self.bytes_after / self.bytes_before if self.bytes_before else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {**asdict(self), "space_saved": self.space_saved}
+
+
+class SessionArchive:
+    """The archive index of one session directory, with gzip-member storage per day."""
+
+    def __init__(self, session_dir: str = SESSION_DIR):
+        self.session_dir = session_dir
+        self.archive_dir = os.path.join(session_dir, ARCHIVE_DIRNAME)
+        self.index_path = os.path.join(self.archive_dir, INDEX_FILENAME)
+        self.lock_path = os.path.join(self.archive_dir, LOCK_FILENAME)
+        self._index: Dict[str, List] = {}
+        self._index_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+        self._rehydrate_ms = deque(maxlen=1024)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._load_index()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load_index())
+
+    def archive(self, session_ids: List[str]) -> ArchiveReport:
+        """
+        Moves sessions from the hot directory into the day archive of their last write.
+
+        Args:
+            session_ids: Sessions to archive; IDs without a session file are skipped.
+
+        Returns:
+            How many sessions were archived and the bytes they took before and after.
+        """
+        report = ArchiveReport()
+        os.makedirs(self.archive_dir, exist_ok=True)
+        with self._locked_index() as index:
+            moved: List[Tuple[str, str, os.stat_result]] = []
+            by_day: Dict[str, List[Tuple[str, str, os.stat_result]]] = {}
+            for session_id in session_ids:
+                file_path = session_path(session_id, self.session_dir)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                day = time.strftime("%Y-%m-%d", time.gmtime(stat.st_mtime))
+                by_day.setdefault(day, []).append((session_id, file_path, stat))
+
+            for day, sessions in sorted(by_day.items()):
+                name = f"{day}{ARCHIVE_SUFFIX}"
+                with open(os.path.join(self.archive_dir, name), "ab") as archive:
+                    for session_id, file_path, stat in sessions:
+                        with open(file_path, "r") as f:
+                            data = json.load(f)
+                        member = gzip.compress(json.dumps(data, separators=(",", ":")).encode(), mtime=0)
+                        offset = archive.tell()
+                        archive.write(member)
+                        index[session_id] = [name, offset, len(member)]
+                        moved.append((session_id, file_path, stat))
+                        report.archived += 1
+                        report.bytes_before += stat.st_size
+                        report.bytes_after += len(member)
+                    archive.flush()
+                    os.fsync(archive.fileno())
+
+            # The index is replaced before the hot files are removed, so a crash in between
+            # leaves a session in both tiers rather than in neither.
+            self._write_index(index)
+            # A session written again meanwhile stays hot, and its archived copy is dropped.
+            still_hot = [(session_id, stat) for session_id, file_path, stat in moved
+                         if not self._remove_hot(file_path, stat)]
+            if still_hot:
+                for session_id, stat in still_hot:
+                    report.archived -= 1
+                    report.bytes_before -= stat.st_size
+                    report.bytes_after -= index.pop(session_id)[2]
+                self._write_index(index)
+        return report
+
+    def compact(self, min_dead_fraction: float = 0.5) -> int:
+        """
+        Rewrites archives in which at least `min_dead_fraction` of the bytes are rehydrated sessions.
+
+        Only members the index still points at are copied, into a new file; the index is switched
+        to it before the old file is deleted. Archives with no members left are deleted.
+
+        Returns:
+            The bytes freed.
+        """
+        if not os.path.isdir(self.archive_dir):
+            return 0
+        reclaimed = 0
+        with self._locked_index() as index:
+            live: Dict[str, List[str]] = {}
+            for session_id, (name, _, _) in index.items():
+                live.setdefault(name, []).append(session_id)
+            names = [name for name in os.listdir(self.archive_dir) if name.endswith(ARCHIVE_SUFFIX)]
+            taken = set(names)
+            obsolete = []
+            for name in sorted(names):
+                size = os.path.getsize(os.path.join(self.archive_dir, name))
+                members = sorted(live.get(name, []), key=lambda session_id: index[session_id][1])
+                live_bytes = sum(index[session_id][2] for session_id in members)
+                if members and size - live_bytes < size * min_dead_fraction:
+                    continue
+                if members:
+                    self._rewrite(name, members, index, taken)
+                obsolete.append(name)
+                reclaimed += size - live_bytes
+            if obsolete:
+                self._write_index(index)
+                for name in obsolete:
+                    os.remove(os.path.join(self.archive_dir, name))
+        return reclaimed
+
+    def rehydrate(self, session_id: str) -> bool:
+        """
+        Restores an archived session to its hot session file.
+
+        Returns:
+            True if the session was in the archive and is now a session file again.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            # Sessions that were never archived are the common miss; they skip the file lock.
+            if session_id not in self._load_index():
+                return False
+        with self._locked_index() as index:
+            entry = index.get(session_id)
+            if entry is None:
+                return False  # Rehydrated by another process meanwhile.
+            name, offset, length = entry
+            with open(os.path.join(self.archive_dir, name), "rb") as archive:
+                archive.seek(offset)
+                data = json.loads(gzip.decompress(archive.read(length)))
+            file_path = session_path(session_id, self.session_dir)
+            tmp_path = f"{file_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp_path, file_path)
+            del index[session_id]
+            self._write_index(index)
+            self._rehydrate_ms.append((time.perf_counter() - started) * 1000)
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = sorted(self._rehydrate_ms)
+            archived = len(self._load_index())
+        return {
+            "archived": archived,
+            "rehydrations": len(latencies),
+            "rehydrate_ms_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+            "rehydrate_ms_max": latencies[-1] if latencies else 0.0,
+        }
+
+    @staticmethod
+    def _remove_hot(file_path: str, archived: os.stat_result) -> bool:
+        """
+        Removes a hot session file if it is still the one archived. Returns False if it was written again.
+
+        The file is renamed aside before it is compared, so a `SessionWriter` replacing it in between
+        creates a new hot file instead of having its snapshot deleted.
+        """
+        aside = f"{file_path}.archiving"
+        try:
+            os.replace(file_path, aside)
+        except FileNotFoundError:
+            return True
+        stat = os.stat(aside)
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == (archived.st_ino, archived.st_mtime_ns, archived.st_size):
+            os.remove(aside)
+            return True
+        # A newer snapshot: put it back, unless an even newer one was written since the rename.
+        try:
+            os.link(aside, file_path)
+        except FileExistsError:
+            pass
+        os.remove(aside)
+        return False
+
+    def _rewrite(self, name: str, members: List[str], index: Dict[str, List], taken: set) -> None:
+        """Copies `members` of archive `name` into a new archive file and points their index entries at it."""
+        day = name[:-len(ARCHIVE_SUFFIX)].split(".")[0]
+        generation = 1
+        while f"{day}.{generation}{ARCHIVE_SUFFIX}" in taken:
+            generation += 1
+        new_name = f"{day}.{generation}{ARCHIVE_SUFFIX}"
+        with open(os.path.join(self.archive_dir, name), "rb") as source, \
+                open(os.path.join(self.archive_dir, new_name), "wb") as target:
+            for session_id in members:
+                _, offset, length = index[session_id]
+                source.seek(offset)
+                index[session_id] = [new_name, target.tell(), length]
+                target.write(source.read(length))
+            target.flush()
+            os.fsync(target.fileno())
+        taken.add(new_name)
+
+    @contextmanager
+    def _locked_index(self) -> Iterator[Dict[str, List]]:
+        """
+        Holds the index lock across processes and yields a copy of the index as it is on disk.
+
+        Changes to the copy are only kept if the caller passes it to `_write_index` before leaving.
+        """
+        with self._lock:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    # Forced: mtime granularity could hide a replace made just before the lock was taken.
+                    self._index_mtime = None
+                    yield dict(self._load_index())
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load_index(self) -> Dict[str, List]:
+        # Re-read only when another process (e.g. the archive job) replaced the index.
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except FileNotFoundError:
+            self._index, self._index_mtime = {}, None
+            return self._index
+        if mtime != self._index_mtime:
+            with open(self.index_path, "r") as f:
+                self._index = json.load(f)
+            self._index_mtime = mtime
+        return self._index
+
+    def _write_index(self, index: Dict[str, List]) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+        self._index = index
+        self._index_mtime = os.stat(self.index_path).st_mtime_ns
+
+
+_archives: Dict[str, SessionArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def archive_for(session_dir: str = SESSION_DIR) -> SessionArchive:
+    """The shared `SessionArchive` of a session directory, so its index is loaded once per process."""
+    key = os.path.abspath(session_dir)
+    with _archives_lock:
+        archive = _archives.get(key)
+        if archive is None:
+            archive = _archives[key] = SessionArchive(session_dir)
+        return archive
+
+
+def archive_cold_sessions(
+    session_dir: str = SESSION_DIR,
+    idle_days: float = DEFAULT_IDLE_DAYS,
+    now: Optional[float] = None,
+) -> ArchiveReport:
+    """
+    Archives every session whose file has not been written for `idle_days`.
+
+    Returns:
+        The number of sessions archived, the space they take before and after, and the
+        space `compact` freed from archives of rehydrated sessions.
+    """
+    cutoff = (time.time() if now is None else now) - idle_days * 86400
+    cold = [
+        session_id for session_id in list_session_ids(session_dir)
+        if os.path.getmtime(session_path(session_id, session_dir)) < cutoff
+    ]
+    archive = archive_for(session_dir)
+    report = archive.archive(cold)
+    report.bytes_reclaimed = archive.compact()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move idle sessions into compressed archives.")
+    parser.add_argument("--session-dir", default=SESSION_DIR)
+    parser.add_argument("--idle-days", type=float, default=DEFAULT_IDLE_DAYS)
+    args = parser.parse_args()
+    print(json.dumps(archive_cold_sessions(args.session_dir, args.idle_days).to_dict(), indent=4))
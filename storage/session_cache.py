@@ -0,0 +1,193 @@
+# storage/session_cache.py
+
+import atexit
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from context import LeanSessionContext
+from storage.session_store import SESSION_DIR, load_lean_session_context, save_session_context
+from storage.write_pipeline import SessionWriter
+
+
+class SessionCache:
+    """
+    Bounded LRU cache of hot sessions in front of the session files.
+
+    `put()` only marks a session dirty and appends its snapshot to an append-only
+    journal; session files are written later, by `flush()` (on an interval when the
+    background flusher runs) or when a dirty session is evicted. On start-up any
+    snapshots left in the journal by a crash are replayed to the session files.
+
+    With a `writer`, `put()` instead hands the snapshot to the `SessionWriter`, which
+    persists it in the background within its batch interval; no journal is kept.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        session_dir: str = SESSION_DIR,
+        journal_path: Optional[str] = None,
+        flush_interval: float = 5.0,
+        fsync: bool = False,
+        writer: Optional[SessionWriter] = None,
+    ):
+        """
+        Args:
+            capacity: Maximum number of sessions kept in memory.
+            session_dir: Directory of the session JSON files.
+            journal_path: Write-ahead journal file. Defaults to `<session_dir>/.journal`;
+                pass an empty string to disable journaling.
+            flush_interval: Seconds between background flushes once `start()` is called.
+            fsync: fsync the journal on every write (survives power loss, not just a crash).
+            writer: Background writer for `put()`; replaces the journal and the interval flushes.
+        """
+        self.capacity = capacity
+        self.session_dir = session_dir
+        self.journal_path = os.path.join(session_dir, ".journal") if journal_path is None else journal_path
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.writer = writer
+
+        self._sessions: "OrderedDict[str, LeanSessionContext]" = OrderedDict()
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._journal = None
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "flushes": 0, "writes": 0}
+
+        os.makedirs(session_dir, exist_ok=True)
+        if self.journal_path:
+            self.recover()
+            if writer is None:
+                self._journal = open(self.journal_path, "a")
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str) -> LeanSessionContext:
+        """Returns the cached session, loading it from disk on a miss."""
+        with self._lock:
+            ctx = self._sessions.get(session_id)
+            if ctx is not None:
+                self._sessions.move_to_end(session_id)
+                self._counters["hits"] += 1
+                return ctx
+            self._counters["misses"] += 1
+            ctx = load_lean_session_context(session_id, self.session_dir)
+            self._sessions[session_id] = ctx
+            self._evict_if_needed()
+            return ctx
+
+    def put(self, session_id: str, ctx: LeanSessionContext) -> None:
+        """Stores a session as dirty; it reaches its session file on the next flush or eviction."""
+        with self._lock:
+            self._sessions[session_id] = ctx
+            self._sessions.move_to_end(session_id)
+            if self.writer is not None:
+                self.writer.submit(session_id, ctx)
+            else:
+                self._dirty.add(session_id)
+                self._append_journal(session_id, ctx)
+            self._evict_if_needed()
+
+    def flush(self) -> int:
+        """Writes all dirty sessions to disk and truncates the journal. Returns the number written."""
+        if self.writer is not None:
+            written = self.writer.stats()["written"]
+            self.writer.flush()
+            return self.writer.stats()["written"] - written
+        with self._lock:
+            dirty = [(sid, self._sessions[sid]) for sid in self._dirty if sid in self._sessions]
+            for session_id, ctx in dirty:
+                save_session_context(session_id, ctx, self.session_dir)
+            self._dirty.clear()
+            self._counters["writes"] += len(dirty)
+            self._counters["flushes"] += 1
+            if self._journal is not None:
+                self._journal.truncate(0)
+                self._journal.seek(0)
+            return len(dirty)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            stats = {
+                **self._counters,
+                "size": len(self._sessions),
+                "dirty": len(self._dirty),
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            }
+        if self.writer is not None:
+            stats.update({f"writer_{name}": value for name, value in self.writer.stats().items()})
+        return stats
+
+    def start(self) -> "SessionCache":
+        """Starts the background write-behind flusher and flushes again at interpreter exit."""
+        if self.writer is not None:
+            self.writer.start()
+            return self
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="session-cache-flusher", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+        return self
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            return
+        self._stop.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join(timeout=self.flush_interval + 1)
+        self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def recover(self) -> int:
+        """Replays snapshots left in the journal to the session files. Returns the number restored."""
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return 0
+        latest = {}
+        with open(self.journal_path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # A torn final line from the crash; everything before it is intact.
+                latest[record["uid"]] = record["data"]
+        for session_id, data in latest.items():
+            save_session_context(session_id, LeanSessionContext.from_dict(data, validate=False), self.session_dir)
+        open(self.journal_path, "w").close()
+        return len(latest)
+
+    def _append_journal(self, session_id: str, ctx: LeanSessionContext) -> None:
+        if self._journal is None:
+            return
+        self._journal.write(json.dumps({"uid": session_id, "data": ctx.to_dict()}, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    def _evict_if_needed(self) -> None:
+        while len(self._sessions) > self.capacity:
+            session_id, ctx = self._sessions.popitem(last=False)
+            self._counters["evictions"] += 1
+            if session_id in self._dirty:
+                save_session_context(session_id, ctx, self.session_dir)
+                self._dirty.discard(session_id)
+                self._counters["writes"] += 1
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Error flushing session cache: {e}")
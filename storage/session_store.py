@@ -0,0 +1,85 @@
+# storage/session_store.py
+
+import json
+import os
+from typing import Iterable, Iterator, List
+
+from context import LeanSessionContext, UserSessionContext
+
+SESSION_DIR = "sessions"
+
+
+def session_path(session_id: str, session_dir: str = SESSION_DIR) -> str:
+    return os.path.join(session_dir, f"{session_id}.json")
+
+
+def _stored(session_id: str, session_dir: str) -> bool:
+    """True if the session has a file, rehydrating it from the archive first if it was archived."""
+    if os.path.exists(session_path(session_id, session_dir)):
+        return True
+    from storage.session_archive import archive_for
+    return archive_for(session_dir).rehydrate(session_id)
+
+
+def save_session_context(session_id: str, ctx: UserSessionContext, session_dir: str = SESSION_DIR):
+    """Saves the UserSessionContext to a JSON file."""
+    os.makedirs(session_dir, exist_ok=True)
+    file_path = session_path(session_id, session_dir)
+    # Write to a temporary file first so a crash mid-write never leaves a truncated session.
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(ctx.model_dump(), f, indent=4)
+    os.replace(tmp_path, file_path)
+
+
+def load_session_context(session_id: str, session_dir: str = SESSION_DIR) -> UserSessionContext:
+    """Loads the UserSessionContext from a JSON file, or creates a new one if not found."""
+    file_path = session_path(session_id, session_dir)
+    if _stored(session_id, session_dir):
+        try:
+            with open(file_path, "r") as f:
+                data = json.load(f)
+                return UserSessionContext(**data)
+        except (json.JSONDecodeError, TypeError):
+            # If file is corrupted or not a valid context, create a new one
+            return UserSessionContext(uid=session_id)
+    return UserSessionContext(uid=session_id) # Create new if not found, use existing session_id
+
+
+def load_lean_session_context(session_id: str, session_dir: str = SESSION_DIR,
+                              validate: bool = True) -> LeanSessionContext:
+    """
+    Loads a session into the slotted in-memory representation.
+    Files on disk are validated by default since they may have been edited or corrupted.
+    """
+    file_path = session_path(session_id, session_dir)
+    if _stored(session_id, session_dir):
+        try:
+            with open(file_path, "r") as f:
+                return LeanSessionContext.loads(f.read(), validate=validate)
+        except (ValueError, TypeError):
+            return LeanSessionContext(uid=session_id)
+    return LeanSessionContext(uid=session_id)
+
+
+def list_session_ids(session_dir: str = SESSION_DIR) -> List[str]:
+    """Returns the IDs of the hot sessions in `session_dir`; archived sessions are not listed."""
+    if not os.path.isdir(session_dir):
+        return []
+    return [name[:-5] for name in os.listdir(session_dir) if name.endswith(".json")]
+
+
+def load_session_contexts(session_ids: Iterable[str], session_dir: str = SESSION_DIR) -> Iterator[UserSessionContext]:
+    """Loads several sessions, skipping IDs that have no stored file or archive entry."""
+    for session_id in session_ids:
+        if _stored(session_id, session_dir):
+            yield load_session_context(session_id, session_dir)
+
+
+def save_session_contexts(contexts: Iterable[UserSessionContext], session_dir: str = SESSION_DIR) -> int:
+    """Saves several sessions keyed by their uid. Returns the number written."""
+    written = 0
+    for ctx in contexts:
+        save_session_context(ctx.uid, ctx, session_dir)
+        written += 1
+    return written
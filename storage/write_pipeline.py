@@ -0,0 +1,242 @@
+# storage/write_pipeline.py
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from storage.session_store import SESSION_DIR, session_path
+
+
+class SessionWriter:
+    """
+    Background writer that takes session persistence off the response path.
+
+    `submit()` snapshots a session and returns at once; a writer thread persists the
+    snapshots in batches. Updates to the same uid that arrive before their batch is
+    written are coalesced, so only the latest snapshot reaches disk. A batch writes
+    every session to a temporary file, fsyncs the files, renames them into place and
+    then fsyncs the directory once, so a burst of turns costs one round of syncs
+    instead of one per turn. When more than `max_pending` sessions are waiting,
+    `submit()` blocks until the writer catches up.
+
+    A batch that fails to write is retried after a delay that doubles with each
+    consecutive failure, up to `max_backoff`. A snapshot that has failed
+    `max_attempts` times is logged and moved to `dead_letter`, so a full disk
+    or an unwritable directory cannot keep the writer spinning. `close()` makes
+    one final attempt and returns even if that attempt fails.
+    """
+
+    def __init__(
+        self,
+        session_dir: str = SESSION_DIR,
+        batch_interval: float = 0.05,
+        max_pending: int = 256,
+        fsync: bool = True,
+        max_attempts: int = 5,
+        retry_backoff: float = 0.1,
+        max_backoff: float = 5.0,
+    ):
+        """
+        Args:
+            session_dir: Directory of the session JSON files.
+            batch_interval: Seconds the writer waits after the first pending update so later ones join its batch.
+            max_pending: Pending sessions above which `submit()` blocks (backpressure).
+            fsync: fsync each batch so written sessions survive power loss, not just a crash.
+            max_attempts: Failed writes of one snapshot after which it is given up on (see `dead_letter`).
+            retry_backoff: Seconds before retrying a failed batch, doubled after each further failure.
+            max_backoff: Longest wait between retries.
+        """
+        self.session_dir = session_dir
+        self.batch_interval = batch_interval
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        # Snapshots given up on after `max_attempts` failed writes, by session id.
+        self.dead_letter: Dict[str, str] = {}
+
+        self._pending: Dict[str, str] = {}
+        self._attempts: Dict[str, int] = {}
+        self._failures = 0
+        self._retry_at = 0.0
+        self._writing = False
+        self._stopping = False
+        self._cond = threading.Condition()
+        # Held while a batch is taken and written, so batches reach disk in the order they were taken.
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._latencies_ms = deque(maxlen=1024)
+        self._counters = {
+            "submitted": 0, "coalesced": 0, "written": 0, "batches": 0,
+            "errors": 0, "dropped": 0, "backpressure_waits": 0, "max_depth": 0,
+        }
+        os.makedirs(session_dir, exist_ok=True)
+
+    def submit(self, session_id: str, ctx: Any) -> None:
+        """Queues a snapshot of `ctx` for writing. Blocks only while the queue is over `max_pending`."""
+        # Serialized here so later turns mutating `ctx` cannot race with the writer thread.
+        payload = json.dumps(ctx.model_dump(), indent=4)
+        with self._cond:
+            if session_id in self._pending:
+                self._counters["coalesced"] += 1
+            elif len(self._pending) >= self.max_pending and self._thread is not None:
+                self._counters["backpressure_waits"] += 1
+                while len(self._pending) >= self.max_pending and not self._stopping:
+                    self._cond.wait()
+            self._pending[session_id] = payload
+            # A newer snapshot gets attempts of its own.
+            self._attempts.pop(session_id, None)
+            self._counters["submitted"] += 1
+            self._counters["max_depth"] = max(self._counters["max_depth"], len(self._pending))
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every submitted snapshot is on disk.
+
+        Without a running writer thread, or without a `timeout`, the pending snapshots are
+        written in the caller, in one attempt that does not wait out the retry backoff.
+
+        Returns:
+            False if `timeout` passed first or the write failed.
+        """
+        if self._thread is None or timeout is None:
+            return self._write_pending()
+        with self._cond:
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def start(self) -> "SessionWriter":
+        """Starts the writer thread and flushes whatever is pending at interpreter exit."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="session-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def close(self) -> None:
+        """Stops the writer and makes one final attempt to write everything submitted so far."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        if not self._write_pending():
+            with self._cond:
+                lost, self._pending = self._pending, {}
+                self.dead_letter.update(lost)
+                self._counters["dropped"] += len(lost)
+            if lost:
+                print(f"Gave up on {len(lost)} unsaved session(s) at close: {', '.join(sorted(lost))}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            latencies = sorted(self._latencies_ms)
+            depth = len(self._pending)
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "depth": depth,
+            "write_ms_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+            "write_ms_p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0,
+        }
+
+    def _run(self) -> None:
+        # Pending snapshots left at stop are written by close(), in one last attempt.
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stopping)
+                if self._stopping:
+                    return
+                # Give a burst of updates the chance to coalesce into this batch. Every submit notifies,
+                # so the window runs to a deadline rather than ending at the next submit.
+                deadline = time.monotonic() + self.batch_interval
+                while not self._stopping and deadline > time.monotonic():
+                    self._cond.wait(deadline - time.monotonic())
+                # After a failed batch, wait out the backoff even if new updates arrive.
+                while not self._stopping and self._retry_at > time.monotonic():
+                    self._cond.wait(self._retry_at - time.monotonic())
+                if self._stopping:
+                    return
+            self._write_pending()
+
+    def _write_pending(self) -> bool:
+        """Writes the pending snapshots in one batch. Returns False if the write failed."""
+        with self._write_lock:
+            with self._cond:
+                if not self._pending:
+                    return True
+                batch, self._pending = self._pending, {}
+                self._writing = True
+                self._cond.notify_all()  # Wake submitters blocked on backpressure.
+            started = time.perf_counter()
+            try:
+                self._write_batch(batch)
+            except OSError as e:
+                self._retry_later(batch, e)
+                return False
+            else:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with self._cond:
+                    self._counters["written"] += len(batch)
+                    self._counters["batches"] += 1
+                    self._latencies_ms.append(elapsed_ms / len(batch))
+                    self._failures = 0
+                    self._retry_at = 0.0
+                    for session_id in batch:
+                        self._attempts.pop(session_id, None)
+                        self.dead_letter.pop(session_id, None)
+                return True
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _retry_later(self, batch: Dict[str, str], error: OSError) -> None:
+        """Puts a failed batch back for a delayed retry, giving up on snapshots out of attempts."""
+        dropped = []
+        with self._cond:
+            self._counters["errors"] += 1
+            self._failures += 1
+            self._retry_at = time.monotonic() + min(self.max_backoff, self.retry_backoff * 2 ** (self._failures - 1))
+            for session_id, payload in batch.items():
+                if session_id in self._pending:
+                    continue  # A newer snapshot arrived meanwhile and replaces this one.
+                attempts = self._attempts.get(session_id, 0) + 1
+                if attempts >= self.max_attempts:
+                    self._attempts.pop(session_id, None)
+                    self.dead_letter[session_id] = payload
+                    dropped.append(session_id)
+                else:
+                    self._attempts[session_id] = attempts
+                    self._pending[session_id] = payload
+            self._counters["dropped"] += len(dropped)
+        print(f"Error writing session batch: {error}")
+        if dropped:
+            print(f"Gave up on session(s) after {self.max_attempts} failed writes: {', '.join(sorted(dropped))}")
+
+    def _write_batch(self, batch: Dict[str, str]) -> None:
+        paths = []
+        for session_id, payload in batch.items():
+            file_path = session_path(session_id, self.session_dir)
+            tmp_path = f"{file_path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            paths.append((tmp_path, file_path))
+        for tmp_path, file_path in paths:
+            os.replace(tmp_path, file_path)
+        if self.fsync and hasattr(os, "O_DIRECTORY"):
+            # One directory sync makes all of the batch's renames durable.
+            dir_fd = os.open(self.session_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
@@ -0,0 +1,46 @@
+from benchmarks.suite import HIGHER, LOWER, compare, direction, run_suite
+
+
+def _report(commit, **results):
+    return {"commit": commit, "results": results}
+
+
+def test_direction_is_inferred_from_metric_names():
+    """
+    Tests which way is better for the metric naming patterns used by the benchmarks.
+    """
+    assert direction("agent_turn_ms") == LOWER
+    assert direction("guardrail_screen_us") == LOWER
+    assert direction("batch_with_parsing_s") == LOWER
+    assert direction("tokens[intent]") == LOWER
+    assert direction("plans_per_s") == HIGHER
+    assert direction("accuracy") == HIGHER
+    assert direction("lean_bytes_per_session_100") == LOWER
+    assert direction("n_plans") is None
+
+
+def test_compare_flags_regressions_beyond_the_threshold():
+    """
+    Tests that timings gate at the noise threshold and deterministic metrics at the exact one.
+    """
+    base = _report("a", hot_paths={"agent_turn_ms": 10.0, "session_load_ms": 1.0, "n_plans": 5.0},
+                   intent_eval={"accuracy": 0.80})
+    head = _report("b", hot_paths={"agent_turn_ms": 12.0, "session_load_ms": 2.0, "n_plans": 9.0},
+                   intent_eval={"accuracy": 0.78})
+    status = {row["metric"]: row["status"] for row in compare(base, head, threshold=0.35)}
+    assert status == {
+        "hot_paths.agent_turn_ms": "ok",
+        "hot_paths.session_load_ms": "regressed",
+        "hot_paths.n_plans": "info",
+        "intent_eval.accuracy": "regressed",
+    }
+
+
+def test_run_suite_collects_metrics_and_errors():
+    """
+    Tests that a run records each benchmark's metrics and reports unknown benchmarks as errors.
+    """
+    report = run_suite(["prompts", "does_not_exist"], repeat=2)
+    assert report["repeat"] == 2
+    assert report["results"]["prompts"]["tokens[intent]"] > 0
+    assert "does_not_exist" in report["errors"]
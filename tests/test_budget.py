@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agent import HealthPlannerAgent
+from context import UserSessionContext
+from llm.budget import BudgetedModel, BudgetExceeded, TurnBudget, use_budget
+from llm.model_router import ModelRouter
+from llm.prompts import PROMPTS
+
+
+class FakeModel:
+    """Answers the intent prompt instantly and every other prompt after `delay` seconds."""
+
+    def __init__(self, intent: str, delay: float):
+        self.intent = intent
+        self.delay = delay
+        self.calls = 0
+
+    async def get_response(self, system_instructions, **kwargs):
+        self.calls += 1
+        if system_instructions == PROMPTS["intent"].static:
+            text = self.intent
+        else:
+            await asyncio.sleep(self.delay)
+            text = "slow answer"
+        return SimpleNamespace(output=[SimpleNamespace(content=[SimpleNamespace(text=text)])], response_id=None)
+
+
+class SlowTool:
+    name = "SlowTool"
+
+    async def run(self, *args, **kwargs):
+        await asyncio.sleep(5)
+
+
+def make_agent(intent: str, delay: float, budget_s: float = 0.3) -> HealthPlannerAgent:
+    agent = HealthPlannerAgent(turn_budget_s=budget_s)
+    agent.fake_model = FakeModel(intent, delay)
+    agent.models = ModelRouter.single(BudgetedModel(agent.fake_model))
+    return agent
+
+
+@pytest.mark.asyncio
+async def test_budget_cancels_slow_calls():
+    """
+    Tests that a call is cut off at the deadline and recorded in the trace.
+    """
+    budget = TurnBudget(0.3)
+    with pytest.raises(BudgetExceeded):
+        await budget.run(asyncio.sleep(5), "slow")
+    assert budget.trace[-1]["step"] == "slow" and budget.trace[-1]["status"] == "timeout"
+    assert budget.elapsed() < 1
+    with pytest.raises(BudgetExceeded):
+        await budget.run(asyncio.sleep(0), "late")
+    assert budget.trace[-1]["status"] == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_budgeted_model_only_applies_inside_a_turn():
+    """
+    Tests that the model wrapper is bounded by the current budget and passes through otherwise.
+    """
+    model = BudgetedModel(FakeModel("other", delay=0.2))
+    assert (await model.get_response("x")).output[0].content[0].text == "slow answer"
+    with use_budget(TurnBudget(0.1)):
+        with pytest.raises(BudgetExceeded):
+            await model.get_response("x")
+
+
+@pytest.mark.asyncio
+async def test_slow_general_answer_degrades_to_template():
+    """
+    Tests that a turn whose model call overruns still answers within the budget.
+    """
+    agent = make_agent("ask_general_question", delay=5)
+    result = await agent.run("why is sleep important for recovery?", UserSessionContext())
+    assert result["ok"] is False
+    assert "took longer than expected" in result["response"]
+    assert result["degraded"] == ["answer"]
+
+
+@pytest.mark.asyncio
+async def test_slow_answer_is_not_served_a_near_miss_from_the_cache():
+    """
+    Tests that running out of time does not lower the cache's threshold for a different health question.
+    """
+    agent = make_agent("ask_general_question", delay=5)
+    agent.answer_cache.store("How much water should an adult drink per day?", "About 2 to 3 litres a day.")
+    for question in ["How much water should a child drink per day?", "How much water should an adult drink per week?"]:
+        result = await agent.run(question, UserSessionContext())
+        assert "took longer than expected" in result["response"]
+        assert result["degraded"] == ["answer"]
+
+
+@pytest.mark.asyncio
+async def test_short_budget_skips_diet_extraction():
+    """
+    Tests that a nearly spent budget skips diet extraction but still builds the meal plan locally.
+    """
+    agent = make_agent("ask_meal_plan", delay=5)
+    ctx = UserSessionContext(goal={"name": "Weight Loss", "action": "lose"}, diet_preferences="vegetarian")
+    result = await agent.run("give me a meal plan", ctx)
+    assert result["degraded"] == ["diet_extraction"]
+    assert agent.fake_model.calls == 1
+    assert ctx.meal_plan and len(ctx.meal_plan) == 7
+
+
+@pytest.mark.asyncio
+async def test_slow_tool_serves_stored_plan():
+    """
+    Tests that a workout tool overrunning the budget falls back to the plan already on the session.
+    """
+    agent = make_agent("ask_workout_plan", delay=0)
+    agent.tools["workout_recommender"] = SlowTool()
+    ctx = UserSessionContext(goal={"name": "Muscle Gain", "action": "gain"},
+                             workout_plan=["Day 1: Push - Bench press 3 x 10"])
+    result = await agent.run("give me a workout plan", ctx)
+    assert result["degraded"] == ["workout_plan"]
+    assert "Day 1: Push - Bench press 3 x 10" in result["response"]
@@ -0,0 +1,121 @@
+import time
+
+import pytest
+from agents import ModelSettings
+from agents.items import ModelResponse
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText, ResponseTextDeltaEvent
+
+from llm.cassette import AUTO, RECORD, CassetteMiss, CassetteModel, _adapter
+from llm.model_router import CLASSIFY, FAST, ModelRouter
+from llm.tracing import ModelTracing
+
+
+def text_response(text, input_tokens=10, output_tokens=1):
+    """A `ModelResponse` holding one assistant message, as the chat-completions model returns it."""
+    message = ResponseOutputMessage(
+        id="msg", type="message", role="assistant", status="completed",
+        content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+    )
+    usage = Usage(requests=1, input_tokens=input_tokens, output_tokens=output_tokens,
+                  total_tokens=input_tokens + output_tokens)
+    return ModelResponse(output=[message], usage=usage, response_id=None)
+
+
+class CountingModel:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def get_response(self, *args, input=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return text_response(f"{input} #{self.calls}")
+
+    async def stream_response(self, *args, **kwargs):
+        for i, word in enumerate(["Hello", " there"]):
+            time.sleep(self.delay)
+            yield ResponseTextDeltaEvent(type="response.output_text.delta", delta=word, item_id="msg",
+                                         output_index=0, content_index=0, sequence_number=i, logprobs=[])
+
+
+def call(text, temperature=0.0):
+    return dict(system_instructions="Be brief.", input=text, model_settings=ModelSettings(temperature=temperature),
+                tools=[], output_schema=None, handoffs=[], tracing=ModelTracing.DISABLED)
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_without_the_model(tmp_path):
+    """
+    Tests that replay serves recorded responses, with usage, by request fingerprint.
+    """
+    path = str(tmp_path / "calls.jsonl.gz")
+    model = CountingModel()
+    recorder = CassetteModel(path, model, mode=RECORD)
+    await recorder.get_response(**call("hi"))
+    await recorder.get_response(**call("bye"))
+
+    replay = CassetteModel(path)
+    response = await replay.get_response(**call("bye"))
+    assert response.output[0].content[0].text == "bye #2"
+    assert response.usage.input_tokens == 10
+    assert len(replay) == 2 and replay.stats()["hits"] == 1
+    # Any change to the request is a different fingerprint.
+    with pytest.raises(CassetteMiss):
+        await replay.get_response(**call("bye", temperature=0.7))
+    assert model.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_requests_replay_in_order_and_auto_records_misses(tmp_path):
+    """
+    Tests that repeated recordings of one request are served in turn, and AUTO mode fills gaps.
+    """
+    path = str(tmp_path / "calls.jsonl.gz")
+    model = CountingModel()
+    recorder = CassetteModel(path, model, mode=RECORD)
+    await recorder.get_response(**call("hi"))
+    await recorder.get_response(**call("hi"))
+
+    replay = CassetteModel(path)
+    texts = [(await replay.get_response(**call("hi"))).output[0].content[0].text for _ in range(3)]
+    assert texts == ["hi #1", "hi #2", "hi #1"]
+
+    auto = CassetteModel(path, model, mode=AUTO)
+    await auto.get_response(**call("hi"))
+    await auto.get_response(**call("new"))
+    assert model.calls == 3 and len(CassetteModel(path)) == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_replay_reproduces_events_and_timing(tmp_path):
+    """
+    Tests that streamed events are replayed in order, with the recorded pacing when asked.
+    """
+    path = str(tmp_path / "stream.jsonl.gz")
+    recorder = CassetteModel(path, CountingModel(delay=0.05), mode=RECORD)
+    recorded = [event.delta async for event in recorder.stream_response(**call("hi"))]
+
+    _adapter("stream")  # Built once per process on first replay; not part of the replay being timed.
+    fast = CassetteModel(path)
+    started = time.perf_counter()
+    assert [event.delta async for event in fast.stream_response(**call("hi"))] == recorded
+    assert time.perf_counter() - started < 0.05
+
+    paced = CassetteModel(path, latency_scale=1.0)
+    started = time.perf_counter()
+    assert [event.delta async for event in paced.stream_response(**call("hi"))] == ["Hello", " there"]
+    assert time.perf_counter() - started >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_router_replays_a_cassette_without_api_keys(tmp_path):
+    """
+    Tests that MODEL_CASSETTE in replay mode builds the tiers from the cassette alone.
+    """
+    path = str(tmp_path / "agent.jsonl.gz")
+    await CassetteModel(path, CountingModel(), mode=RECORD, name=FAST).get_response(**call("hi"))
+
+    router = ModelRouter.from_env({"MODEL_CASSETTE": path})
+    response = await router.for_task(CLASSIFY).get_response(**call("hi"))
+    assert response.output[0].content[0].text == "hi #1"
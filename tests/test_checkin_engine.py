@@ -0,0 +1,100 @@
+import asyncio
+import random
+
+import pytest
+from scheduling.engine import CheckinScheduler, next_due_at
+from scheduling.timer_queue import TimerQueue
+from scheduling.timer_store import TimerStore
+
+
+def test_timer_queue_orders_and_cancels():
+    """
+    Tests that the indexed heap pops in due order after random inserts, moves and cancels.
+    """
+    queue = TimerQueue()
+    rng = random.Random(7)
+    expected = {}
+    for i in range(2000):
+        uid = f"u{rng.randrange(500)}"
+        if rng.random() < 0.2:
+            queue.cancel(uid)
+            expected.pop(uid, None)
+        else:
+            due = rng.uniform(0, 1000)
+            queue.push(uid, due)
+            expected[uid] = due
+
+    popped = queue.pop_due(now=float("inf"))
+    assert [uid for uid, _ in popped] == sorted(expected, key=expected.get)
+    assert len(queue) == 0
+
+
+def test_next_due_at_monthly_clamps_day():
+    """
+    Tests that a monthly check-in on Jan 31st moves to the last day of February.
+    """
+    jan_31 = 1706659200.0  # 2024-01-31T00:00:00Z
+    assert next_due_at(jan_31, "monthly") == 1709164800.0  # 2024-02-29T00:00:00Z
+
+
+def test_scheduler_fires_and_reschedules(tmp_path):
+    """
+    Tests that due check-ins fire once, are re-queued at the next cadence and survive a restart.
+    """
+    db_path = str(tmp_path / "checkins.db")
+    scheduler = CheckinScheduler(TimerStore(db_path), clock=lambda: 0.0)
+    scheduler.schedule("a", cadence="daily", start_at=10.0)
+    scheduler.schedule("b", cadence="weekly", start_at=20.0)
+    scheduler.schedule("c", cadence="daily", start_at=500.0)
+    scheduler.cancel("c")
+
+    fired = scheduler.pop_due(now=30.0)
+    assert [checkin.uid for checkin in fired] == ["a", "b"]
+    assert scheduler.pop_due(now=30.0) == []
+
+    restarted = CheckinScheduler(TimerStore(db_path))
+    assert len(restarted) == 2
+    assert restarted.next_checkin("a") == 10.0 + 86400
+    assert restarted.next_checkin("b") == 20.0 + 7 * 86400
+    assert restarted.next_checkin("c") is None
+
+
+def test_schedulers_sharing_a_database_fire_each_checkin_once(tmp_path):
+    """
+    Tests that two processes' schedulers on one database claim each due check-in once, and the loser catches up.
+    """
+    db_path = str(tmp_path / "checkins.db")
+    first = CheckinScheduler(TimerStore(db_path), clock=lambda: 0.0)
+    first.schedule("a", cadence="daily", start_at=10.0)
+    first.schedule("b", cadence="weekly", start_at=20.0)
+    second = CheckinScheduler(TimerStore(db_path), clock=lambda: 0.0)
+
+    assert [checkin.uid for checkin in first.pop_due(now=30.0)] == ["a", "b"]
+    assert second.pop_due(now=30.0) == []
+    assert second.next_checkin("a") == 10.0 + 86400
+    assert second.next_checkin("b") == 20.0 + 7 * 86400
+
+    first.cancel("a")
+    assert [checkin.uid for checkin in second.pop_due(now=10.0 + 86400)] == []
+    assert second.next_checkin("a") is None
+
+
+@pytest.mark.asyncio
+async def test_worker_delivers_batches():
+    """
+    Tests that the asyncio worker hands due check-ins to the handler in bounded batches.
+    """
+    scheduler = CheckinScheduler(TimerStore(), clock=lambda: 100.0)
+    for i in range(25):
+        scheduler.schedule(f"u{i}", cadence="daily", start_at=float(i))
+
+    batches = []
+    stop = asyncio.Event()
+
+    async def handler(batch):
+        batches.append(batch)
+        if sum(len(b) for b in batches) == 25:
+            stop.set()
+
+    await asyncio.wait_for(scheduler.run_worker(handler, stop, batch_size=10, poll_interval=0.01), timeout=2)
+    assert [len(batch) for batch in batches] == [10, 10, 5]
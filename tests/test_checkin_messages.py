@@ -0,0 +1,134 @@
+import pytest
+from context import UserSessionContext
+from scheduling.checkin_messages import CheckinBatchJob, goal_group_key
+from scheduling.engine import CheckinScheduler
+from scheduling.timer_store import TimerStore
+from storage.session_cache import SessionCache
+from storage.session_store import load_session_context, save_session_context
+from storage.write_pipeline import SessionWriter
+
+
+class MockTemplateModel:
+    def __init__(self):
+        self.calls = []
+
+    async def get_response(self, **kwargs):
+        self.calls.append(kwargs["system_instructions"])
+
+        class MockContent:
+            text = "Hey {name}, how is your {goal} going this {cadence}?"
+
+        class MockOutput:
+            content = [MockContent()]
+
+        class MockResponseObj:
+            output = [MockOutput()]
+
+        return MockResponseObj()
+
+
+@pytest.mark.asyncio
+async def test_checkin_batch_job_groups_by_goal(tmp_path):
+    """
+    Tests that due users are grouped by goal with one model call per group and saved back.
+    """
+    session_dir = str(tmp_path)
+    goals = {
+        "a": {"name": "Weight Loss", "action": "lose"},
+        "b": {"name": "weight  loss", "action": "lose"},
+        "c": {"name": "Muscle Gain", "action": "gain"},
+        "d": None,
+    }
+    scheduler = CheckinScheduler(TimerStore(), clock=lambda: 100.0)
+    for uid, goal in goals.items():
+        save_session_context(uid, UserSessionContext(uid=uid, name=uid.upper(), goal=goal), session_dir)
+        scheduler.schedule(uid, cadence="weekly", start_at=50.0)
+    scheduler.schedule("not-due", cadence="daily", start_at=500.0)
+
+    model = MockTemplateModel()
+    result = await CheckinBatchJob(model, scheduler, session_dir=session_dir).run()
+
+    assert result["users"] == 4
+    assert result["groups"] == 3
+    assert len(model.calls) == 3
+    assert result["messages"]["a"] == "Hey A, how is your weight loss going this weekly?"
+    stored = load_session_context("c", session_dir)
+    assert stored.chat_history[-1] == {"role": "assistant", "content": "Hey C, how is your muscle gain going this weekly?"}
+
+
+@pytest.mark.asyncio
+async def test_checkin_batch_job_sends_each_checkin_once(tmp_path):
+    """
+    Tests that a second run does not resend check-ins the first one sent, and the timers move on.
+    """
+    session_dir = str(tmp_path)
+    save_session_context("a", UserSessionContext(uid="a", name="A"), session_dir)
+    scheduler = CheckinScheduler(TimerStore(), clock=lambda: 100.0)
+    scheduler.schedule("a", cadence="daily", start_at=50.0)
+
+    job = CheckinBatchJob(MockTemplateModel(), scheduler, session_dir=session_dir)
+    assert (await job.run())["users"] == 1
+    assert (await job.run())["users"] == 0
+    assert len(load_session_context("a", session_dir).chat_history) == 1
+    assert scheduler.next_checkin("a") == 50.0 + 24 * 3600
+    assert scheduler.store.load_due(100.0) == []
+
+
+class TurnDuringTemplateModel(MockTemplateModel):
+    """Saves a user turn to the session while the template is being written, as a live turn would."""
+
+    def __init__(self, save_turn):
+        super().__init__()
+        self.save_turn = save_turn
+
+    async def get_response(self, **kwargs):
+        self.save_turn()
+        return await super().get_response(**kwargs)
+
+
+@pytest.mark.asyncio
+async def test_checkin_keeps_turns_saved_while_templates_are_written(tmp_path):
+    """
+    Tests that the check-in is appended to the session as stored at write time, not as loaded before.
+    """
+    session_dir = str(tmp_path)
+    save_session_context("a", UserSessionContext(uid="a", name="A"), session_dir)
+    scheduler = CheckinScheduler(TimerStore(), clock=lambda: 100.0)
+    scheduler.schedule("a", cadence="daily", start_at=50.0)
+
+    def save_turn():
+        ctx = load_session_context("a", session_dir)
+        ctx.chat_history.append({"role": "user", "content": "I ran 5k today"})
+        save_session_context("a", ctx, session_dir)
+
+    await CheckinBatchJob(TurnDuringTemplateModel(save_turn), scheduler, session_dir=session_dir).run()
+    history = load_session_context("a", session_dir).chat_history
+    assert [turn["role"] for turn in history] == ["user", "assistant"]
+
+
+@pytest.mark.asyncio
+async def test_checkin_reaches_the_apps_in_memory_session(tmp_path):
+    """
+    Tests that with the app's SessionCache the check-in lands in the live session and is written by its writer.
+    """
+    session_dir = str(tmp_path)
+    scheduler = CheckinScheduler(TimerStore(), clock=lambda: 100.0)
+    scheduler.schedule("a", cadence="daily", start_at=50.0)
+    cache = SessionCache(session_dir=session_dir, writer=SessionWriter(session_dir=session_dir)).start()
+    live = cache.get("a")
+    live.name = "A"
+    cache.put("a", live)
+
+    await CheckinBatchJob(MockTemplateModel(), scheduler, session_dir=session_dir, sessions=cache).run()
+    assert live.chat_history[-1]["content"] == "Hey A, how is your general health going this daily?"
+    cache.close()
+    assert load_session_context("a", session_dir).chat_history[-1]["content"] == live.chat_history[-1]["content"]
+
+
+def test_goal_group_key_normalizes():
+    """
+    Tests goal normalization used for grouping.
+    """
+    assert goal_group_key(None) == "general health"
+    assert goal_group_key({"name": "Increase_Biceps  Size"}) == "increase biceps size"
+    assert goal_group_key({"action": "gain", "unit": "kg"}) == "gain kg"
@@ -0,0 +1,52 @@
+import sys
+
+import pytest
+from context import ChatTurn, LeanSessionContext, UserSessionContext, build_model_input
+
+
+def test_lean_context_round_trip():
+    """
+    Tests that the lean context serializes to the same dict as the pydantic model.
+    """
+    ctx = UserSessionContext(
+        uid="abc",
+        goal={"name": "Weight Loss"},
+        chat_history=[{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}],
+    )
+    lean = LeanSessionContext.from_context(ctx)
+
+    assert lean.to_dict() == ctx.model_dump()
+    assert LeanSessionContext.loads(lean.dumps(), validate=False).to_dict() == ctx.model_dump()
+    assert lean.to_context() == ctx
+
+
+def test_lean_context_chat_history_behaves_like_dicts():
+    """
+    Tests that appended dicts become slotted turns with interned roles and dict-style access.
+    """
+    lean = LeanSessionContext(uid="abc")
+    lean.chat_history.append({"role": "".join(["us", "er"]), "content": "hello"})
+
+    turn = lean.chat_history[0]
+    assert isinstance(turn, ChatTurn)
+    assert turn["role"] is sys.intern("user")
+    assert turn == {"role": "user", "content": "hello"}
+    assert build_model_input(lean, "next") == [
+        {"role": "user", "content": "hello"},
+        {"role": "user", "content": "next"},
+    ]
+
+    lean.chat_history = []
+    assert lean.chat_history == []
+    lean.chat_history.append(ChatTurn("assistant", "ok"))
+    assert lean.to_dict()["chat_history"] == [{"role": "assistant", "content": "ok"}]
+
+
+def test_lean_context_validates_untrusted_data():
+    """
+    Tests that validation runs when requested and is skipped otherwise.
+    """
+    bad = {"uid": "abc", "chat_history": "not a list"}
+    with pytest.raises(ValueError):
+        LeanSessionContext.from_dict(bad, validate=True)
+    assert LeanSessionContext.from_dict({"uid": "abc"}, validate=False).uid == "abc"
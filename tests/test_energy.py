@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from nutrition.energy import (
+    GAIN, LOSE, MAINTAIN, UserStats, compute_targets, describe_goal, normalize_goal,
+    targets_for_goal, targets_for_goals,
+)
+
+
+def test_normalize_goal_units():
+    """
+    Tests that weight and duration units are normalized to kg and days.
+    """
+    parsed = normalize_goal({"action": "lose", "quantity": 10, "unit": "pounds",
+                             "duration_value": 2, "duration_unit": "weeks"})
+    assert parsed["kind"] == LOSE
+    assert parsed["delta_kg"] == pytest.approx(4.5359, rel=1e-3)
+    assert parsed["days"] == 14
+
+    parsed = normalize_goal({"action": "increase", "quantity": None, "unit": "biceps_size"})
+    assert parsed["kind"] == GAIN
+    assert np.isnan(parsed["delta_kg"]) and np.isnan(parsed["days"])
+    assert normalize_goal(None)["kind"] == MAINTAIN
+
+
+def test_targets_follow_energy_balance():
+    """
+    Tests that a weight-loss goal sets a capped deficit below maintenance and macros add up.
+    """
+    stats = UserStats(weight_kg=80, height_cm=180, age=35, sex="male", activity="moderate")
+    maintain = targets_for_goal({"action": "maintain"}, stats)
+    tdee = (10 * 80 + 6.25 * 180 - 5 * 35 + 5) * 1.55
+    assert maintain.calories == pytest.approx(tdee)
+
+    lose = targets_for_goal({"action": "lose", "quantity": 4, "unit": "kg",
+                             "duration_value": 2, "duration_unit": "months"}, stats)
+    assert maintain.calories - lose.calories == pytest.approx(4 * 7700 / (2 * 30.44), rel=1e-3)
+
+    crash = targets_for_goal({"action": "lose", "quantity": 20, "unit": "kg",
+                              "duration_value": 1, "duration_unit": "months"}, stats)
+    assert maintain.calories - crash.calories == pytest.approx(1000)
+
+    for targets in (maintain, lose, crash):
+        kcal = targets.protein_g * 4 + targets.carbs_g * 4 + targets.fat_g * 9
+        assert kcal == pytest.approx(targets.calories, rel=1e-4)
+
+
+def test_minimum_intake_floor():
+    """
+    Tests that aggressive goals never drop below the minimum daily intake.
+    """
+    stats = UserStats(weight_kg=50, height_cm=155, age=60, sex="female", activity="sedentary")
+    targets = targets_for_goal({"action": "lose", "quantity": 30, "unit": "lbs",
+                                "duration_value": 3, "duration_unit": "weeks"}, stats)
+    assert targets.calories == 1200
+
+
+def test_batch_matches_single_user():
+    """
+    Tests that population targets equal the per-user results row by row.
+    """
+    goals = [
+        {"action": "lose", "quantity": 5, "unit": "kg", "duration_value": 3, "duration_unit": "months"},
+        {"action": "gain", "quantity": 3, "unit": "kg", "duration_value": 10, "duration_unit": "weeks"},
+        {"action": "improve", "unit": "fitness_level"},
+        None,
+    ]
+    stats = [UserStats(), UserStats(90, 185, 22, "male", "active"), None, UserStats(sex="female")]
+    batch = targets_for_goals(goals, stats)
+    assert batch.shape == (4, 4)
+    for row, goal, user in zip(batch, goals, stats):
+        assert row == pytest.approx(targets_for_goal(goal, user).as_array(), rel=1e-5)
+
+
+def test_compute_targets_vectorized():
+    """
+    Tests that compute_targets handles a large population in one call.
+    """
+    n = 10_000
+    rng = np.random.default_rng(0)
+    result = compute_targets(
+        rng.integers(0, 3, n), rng.uniform(1, 10, n), rng.uniform(30, 180, n),
+        rng.uniform(50, 110, n), rng.uniform(150, 200, n), rng.uniform(18, 70, n),
+        np.full(n, -78.0), np.full(n, 1.55), np.full(n, 1350.0),
+    )
+    assert result.shape == (n, 4)
+    assert np.all(result[:, 0] >= 1350)
+    assert np.all(result >= 0)
+
+
+def test_describe_goal():
+    """
+    Tests the compact goal summary used in prompts.
+    """
+    goal = {"name": "Weight Loss", "action": "lose", "quantity": 10, "unit": "pounds",
+            "duration_value": 3, "duration_unit": "months"}
+    assert describe_goal(goal) == "Weight Loss: lose 4.5 kg in 91 days (0.35 kg/week)"
+    assert describe_goal({"name": "Improve Fitness", "action": "improve"}) == "Improve Fitness"
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from llm.budget import BudgetExceeded, TurnBudget, use_budget
+from llm.intent_batcher import IntentBatcher, parse_labels
+from llm.mock_server import default_responder
+
+
+class ClassifierModel:
+    """Answers like the mock server (single or batched intent prompt) after `delay` seconds."""
+
+    def __init__(self, delay: float = 0.02, broken_batches: bool = False):
+        self.delay = delay
+        self.broken_batches = broken_batches
+        self.requests = []
+
+    async def get_response(self, system_instructions, input, **kwargs):
+        self.requests.append(len(input) if "Batch mode" not in system_instructions else "batch")
+        await asyncio.sleep(self.delay)
+        text = default_responder([{"role": "system", "content": system_instructions}, *input])
+        if self.broken_batches and "Batch mode" in system_instructions:
+            text = "log_water, ask_meal_plan"
+        return SimpleNamespace(output=[SimpleNamespace(content=[SimpleNamespace(text=text)])])
+
+
+def turn(text):
+    return [{"role": "assistant", "content": "Hi! How can I help?"}, {"role": "user", "content": text}]
+
+
+QUERIES = ["i drank 500ml of water", "give me a meal plan", "i hurt my knee", "suggest some exercises"]
+LABELS = ["log_water", "ask_meal_plan", "handle_injury", "ask_workout_plan"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_classifications_share_one_request():
+    """
+    Tests that an idle batcher sends at once, and turns arriving meanwhile are batched and scattered back.
+    """
+    model = ClassifierModel()
+    batcher = IntentBatcher(lambda: model, max_batch=16, max_wait_ms=5)
+
+    labels = await asyncio.gather(*(batcher.classify(turn(text)) for text in ["what is a calorie?"] + QUERIES))
+    assert labels == ["ask_general_question"] + LABELS
+    assert model.requests == [2, "batch"]
+    assert batcher.stats()["mean_batch_size"] == 4
+
+
+def test_turns_on_separate_event_loops_are_batched_per_loop():
+    """
+    Tests that threads each running their own `asyncio.run` on one batcher all get their labels back.
+    """
+    model = ClassifierModel(delay=0.05)
+    batcher = IntentBatcher(lambda: model, max_batch=16, max_wait_ms=5)
+    results = {}
+
+    async def classify_all():
+        return await asyncio.gather(*(batcher.classify(turn(text)) for text in ["what is a calorie?"] + QUERIES))
+
+    def worker(i):
+        results[i] = asyncio.run(classify_all())
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads)
+    assert list(results.values()) == [["ask_general_question"] + LABELS] * 8
+    assert model.requests.count("batch") == 8
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting():
+    """
+    Tests that reaching max_batch sends the batch at once, long before max_wait_ms.
+    """
+    model = ClassifierModel()
+    batcher = IntentBatcher(lambda: model, max_batch=3, max_wait_ms=10_000)
+    first = asyncio.ensure_future(batcher.classify(turn("hello")))
+    await asyncio.sleep(0)
+    labels = await asyncio.wait_for(asyncio.gather(*(batcher.classify(turn(text)) for text in QUERIES[:3])), 1.0)
+    assert labels == LABELS[:3]
+    await first
+
+
+@pytest.mark.asyncio
+async def test_unparseable_batch_falls_back_to_single_requests():
+    """
+    Tests that a batched answer without one label per query is retried query by query.
+    """
+    model = ClassifierModel(broken_batches=True)
+    batcher = IntentBatcher(lambda: model, max_batch=16, max_wait_ms=5)
+    labels = await asyncio.gather(*(batcher.classify(turn(text)) for text in ["hello"] + QUERIES))
+    assert labels[1:] == LABELS
+    assert batcher.fallbacks == 1 and model.requests.count(2) == 1 + len(QUERIES)
+
+
+@pytest.mark.asyncio
+async def test_a_turn_out_of_budget_stops_waiting_without_cancelling_the_batch():
+    """
+    Tests that one turn's deadline ends its own wait while the shared request still answers the others.
+    """
+    model = ClassifierModel(delay=0.2)
+    batcher = IntentBatcher(lambda: model, max_batch=16, max_wait_ms=5)
+
+    async def with_budget(text, seconds):
+        with use_budget(TurnBudget(seconds)):
+            return await batcher.classify(turn(text))
+
+    results = await asyncio.gather(batcher.classify(turn("hello")), with_budget(QUERIES[0], 0.3),
+                                   batcher.classify(turn(QUERIES[1])), return_exceptions=True)
+    assert isinstance(results[1], BudgetExceeded)
+    assert results[2] == "ask_meal_plan"
+
+
+def test_parse_labels_requires_one_label_per_query():
+    """
+    Tests JSON arrays, fenced blocks and {"labels": [...]} objects, and rejects count mismatches.
+    """
+    assert parse_labels('["log_water", "other"]', 2) == ["log_water", "other"]
+    assert parse_labels('```json\n["other"]\n```', 1) == ["other"]
+    assert parse_labels('{"labels": ["other"]}', 1) == ["other"]
+    assert parse_labels('["other"]', 2) is None
+    assert parse_labels("other", 1) is None
@@ -0,0 +1,56 @@
+import pytest
+
+from agent import INTENTS
+from benchmarks.bench_intent_eval import evaluate, load_corpus
+from llm.cassette import CassetteModel
+from llm.model_router import CLASSIFY
+from tests.test_cassette import text_response
+
+
+def test_corpus_covers_every_intent():
+    """
+    Tests that the labeled corpus only uses known intents and has examples of each.
+    """
+    corpus = load_corpus()
+    labels = {example["intent"] for example in corpus}
+    assert labels == set(INTENTS)
+    assert any(example["source"] == "session" for example in corpus)
+
+
+class LabelModel:
+    """Answers each utterance with a fixed label and reports fixed token usage."""
+
+    def __init__(self, labels):
+        self.labels = labels
+
+    async def get_response(self, *args, input=None, **kwargs):
+        return text_response(self.labels[input[-1]["content"]], input_tokens=100, output_tokens=2)
+
+
+@pytest.mark.asyncio
+async def test_evaluate_scores_and_replays_a_backend(tmp_path):
+    """
+    Tests accuracy, confusion, token counts and cost, and that a recorded run replays identically.
+    """
+    corpus = [
+        {"text": "i drank 500ml of water", "intent": "log_water"},
+        {"text": "i hurt my knee", "intent": "handle_injury"},
+        {"text": "give meal plan", "intent": "ask_meal_plan"},
+    ]
+    model = LabelModel({
+        "i drank 500ml of water": "log_water",
+        "i hurt my knee": "handle_injury",
+        "give meal plan": "ask_workout_plan",
+    })
+    cassette = str(tmp_path / "intent.jsonl.gz")
+
+    report = await evaluate(model, corpus, price=(1.0, 2.0), record_path=cassette)
+
+    assert report["accuracy"] == pytest.approx(2 / 3)
+    assert report["confusion"]["ask_meal_plan"] == {"ask_workout_plan": 1}
+    assert report["recall"]["log_water"] == 1.0
+    assert report["input_tokens"] == 300 and report["output_tokens"] == 6
+    assert report["cost_usd_per_1k"] == pytest.approx((300 + 12) / 1_000_000 / 3 * 1000)
+    replayed = await evaluate(CassetteModel(cassette, name=CLASSIFY), corpus, price=(1.0, 2.0))
+    assert replayed["confusion"] == report["confusion"]
+    assert replayed["input_tokens"] == 300
@@ -7,7 +7,7 @@ from agents import OpenAIChatCompletionsModel, AsyncOpenAI
 @pytest.mark.asyncio
 async def test_meal_planner_tool():
     """
-    Tests the MealPlannerTool with a sample goal and diet preference.
+    Tests the model-generated MealPlannerTool path with a sample goal and diet preference.
     """
     # Create a mock for the AsyncOpenAI client
     mock_openai_client = AsyncMock()
@@ -29,7 +29,7 @@ day_2:
 """
     mock_model.chat.return_value = mock_response
 
-    tool = MealPlannerTool()
+    tool = MealPlannerTool(local=False)
     goal = {
         "action": "lose",
         "quantity": 5,
@@ -46,3 +46,22 @@ day_2:
     assert "day_1" in result["meal_plan"]
     assert "day_2" in result["meal_plan"]
     mock_model.chat.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_meal_planner_tool_local_plan():
+    """
+    Tests that the MealPlannerTool builds the plan from the food database without a model call.
+    """
+    mock_model = MagicMock()
+    tool = MealPlannerTool()
+    goal = {"action": "lose", "quantity": 5, "unit": "kg", "duration_value": 2, "duration_unit": "months"}
+
+    result = await tool.run(mock_model, "vegetarian, no mushrooms", goal)
+
+    assert result["ok"] is True
+    assert result["source"] == "food_db"
+    assert list(result["meal_plan"]) == [f"day_{d}" for d in range(1, 8)]
+    assert all(len(meals) == 4 for meals in result["meal_plan"].values())
+    assert not any("mushroom" in meal.lower() for meals in result["meal_plan"].values() for meal in meals)
+    assert mock_model.method_calls == []
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from nutrition.energy import targets_for_goal
+from nutrition.food_db import SLOT_BITS, TAG_BITS, FoodDatabase, load_records, parse_diet_preferences
+from nutrition.meal_solver import MealPlanSolver, NoMatchingFoods
+
+
+@pytest.fixture(scope="module")
+def food_db():
+    return FoodDatabase.load()
+
+
+def test_parse_diet_preferences():
+    """
+    Tests that free-text preferences map to diet tags and excluded words.
+    """
+    diet = parse_diet_preferences("Vegan, gluten-free, no mushrooms and avoid tomatoes")
+    assert set(diet.tags) == {"vegan", "vegetarian", "dairy_free", "gluten_free"}
+    assert diet.exclude == ("mushroom", "tomato")
+    assert parse_diet_preferences("None").mask == 0
+    assert parse_diet_preferences("no nuts please").tags == ("nut_free",)
+
+
+def test_compiled_records_are_memory_mapped(tmp_path, food_db):
+    """
+    Tests that the compiled food table is cached and memory-mapped on the next load.
+    """
+    cache_path = str(tmp_path / "foods.npy")
+    first = load_records(cache_path=cache_path)
+    second = load_records(cache_path=cache_path)
+    assert isinstance(second, np.memmap)
+    assert len(first) == len(second) == len(food_db)
+
+
+def test_query_indexes(food_db):
+    """
+    Tests tag, slot and nutrient-range queries.
+    """
+    diet = parse_diet_preferences("vegetarian, no eggs")
+    rows = food_db.query(slot="breakfast", diet=diet, ranges={"protein_g": (15, 100)})
+    assert rows.size > 0
+    records = food_db.records[rows]
+    assert np.all(records["tags"] & TAG_BITS["vegetarian"])
+    assert np.all(records["slots"] & SLOT_BITS["breakfast"])
+    assert np.all(records["protein_g"] >= 15)
+    assert not any("egg" in name.lower() for name in records["name"])
+
+    in_range = food_db.in_range("calories", 100, 200)
+    assert np.all((food_db.nutrients[in_range, 0] >= 100) & (food_db.nutrients[in_range, 0] <= 200))
+
+
+@pytest.mark.parametrize("prefs, action", [
+    ("none", "maintain"),
+    ("vegetarian", "lose"),
+    ("vegan, gluten free", "gain"),
+    ("halal, no fish", "lose"),
+])
+def test_solver_meets_targets(food_db, prefs, action):
+    """
+    Tests that each day of a solved plan respects the diet and stays near the calorie target.
+    """
+    diet = parse_diet_preferences(prefs)
+    plan = MealPlanSolver(food_db).solve(targets_for_goal({"action": action}), diet)
+
+    assert len(plan.days) == 7
+    assert plan.max_calorie_error() < 0.15
+    for day in plan.days:
+        assert [meal.slot for meal in day] == ["breakfast", "lunch", "dinner", "snack"]
+        assert len({meal.food for meal in day}) == 4
+        for meal in day:
+            assert food_db.records["tags"][meal.food] & diet.mask == diet.mask
+
+
+def test_solver_rejects_impossible_diet(food_db):
+    """
+    Tests that a diet excluding every food for a slot raises NoMatchingFoods.
+    """
+    diet = parse_diet_preferences("vegan, no fruit, no nut, no legume, no grain, no bar, no seed, no drink")
+    with pytest.raises(NoMatchingFoods):
+        MealPlanSolver(food_db).solve(targets_for_goal(None), diet)
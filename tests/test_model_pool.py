@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from llm.model_pool import ModelPool, PoolMember
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class FakeModel:
+    def __init__(self, fail_with: int = None, delay: float = 0.0):
+        self.fail_with = fail_with
+        self.delay = delay
+        self.calls = 0
+
+    async def get_response(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail_with:
+            raise ProviderError(self.fail_with)
+        return "ok"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_pool_spreads_load_by_weight():
+    """
+    Tests that concurrent calls go to the least-loaded member, in proportion to weight.
+    """
+    heavy, light = FakeModel(delay=0.01), FakeModel(delay=0.01)
+    pool = ModelPool([PoolMember("heavy", heavy, weight=2.0, rpm=100), PoolMember("light", light, rpm=100)])
+    await asyncio.gather(*(pool.get_response() for _ in range(30)))
+    assert (heavy.calls, light.calls) == (20, 10)
+    stats = pool.stats()
+    assert stats["heavy"]["requests"] == 20 and stats["heavy"]["utilization"] == 0.2
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_member_cools_down_and_call_fails_over():
+    """
+    Tests that a 429 marks the key unhealthy and the call is retried on another key.
+    """
+    clock = FakeClock()
+    limited, healthy = FakeModel(fail_with=429), FakeModel()
+    pool = ModelPool([PoolMember("limited", limited), PoolMember("healthy", healthy)], clock=clock)
+    assert await pool.get_response() == "ok"
+    assert await pool.get_response() == "ok"
+    assert (limited.calls, healthy.calls) == (1, 2)
+    assert pool.stats()["limited"]["healthy"] is False
+
+    clock.now += 60
+    limited.fail_with = None
+    assert pool.pick().name == "limited"
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_propagate():
+    """
+    Tests that client errors are raised at once and do not cool the key down.
+    """
+    bad = FakeModel(fail_with=400)
+    other = FakeModel()
+    pool = ModelPool([PoolMember("bad", bad, weight=10), PoolMember("other", other)])
+    with pytest.raises(ProviderError):
+        await pool.get_response()
+    assert other.calls == 0
+    assert pool.stats()["bad"]["healthy"] is True
+
+
+@pytest.mark.asyncio
+async def test_all_members_failing_raises_last_error():
+    """
+    Tests that a call fails once every member has returned a server error.
+    """
+    pool = ModelPool([PoolMember("a", FakeModel(fail_with=503)), PoolMember("b", FakeModel(fail_with=500))])
+    with pytest.raises(ProviderError):
+        await pool.get_response()
+    assert all(not member["healthy"] for member in pool.stats().values())
+
+
+@pytest.mark.asyncio
+async def test_members_without_rpm_are_not_limited_client_side():
+    """
+    Tests that a member with no configured RPM takes any number of calls in a minute, and one with an RPM waits.
+    """
+    clock = FakeClock()
+    pool = ModelPool([PoolMember("open", FakeModel())], clock=clock)
+    await asyncio.wait_for(asyncio.gather(*(pool.get_response() for _ in range(50))), 1.0)
+    assert pool.members[0].available_at(clock.now) == clock.now
+
+    limited = PoolMember("limited", FakeModel(), rpm=2)
+    await ModelPool([limited], clock=clock).get_response()
+    await ModelPool([limited], clock=clock).get_response()
+    assert limited.available_at(clock.now) == clock.now + 60
+
+
+def test_from_env_builds_one_member_per_key():
+    """
+    Tests that several keys become several members, secrets stay out of the names, and only GEMINI_RPM limits rate.
+    """
+    pool = ModelPool.from_env({"GEMINI_API_KEYS": "key-aaaa1111, key-bbbb2222", "GEMINI_RPM": "30"})
+    assert [m.name for m in pool.members] == ["key0-1111", "key1-2222"]
+    assert all(m.rpm == 30 for m in pool.members)
+    assert all(m.model._client.max_retries == 0 for m in pool.members)
+    assert all(m.rpm is None for m in ModelPool.from_env({"GEMINI_API_KEY": "key-cccc3333"}).members)
+    with pytest.raises(ValueError):
+        ModelPool.from_env({})
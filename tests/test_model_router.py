@@ -0,0 +1,66 @@
+import pytest
+
+from llm.model_router import CLASSIFY, EXTRACT, FAST, GENERATE, STANDARD, ModelRouter, parse_routes
+
+
+class NamedModel:
+    def __init__(self, name: str, fail: bool = False):
+        self.name = name
+        self.fail = fail
+
+    async def get_response(self, **kwargs):
+        if self.fail:
+            raise RuntimeError("provider error")
+        return self.name
+
+
+@pytest.mark.asyncio
+async def test_tasks_route_to_their_tier():
+    """
+    Tests that classification and extraction use the fast tier and generation the standard one.
+    """
+    router = ModelRouter({FAST: NamedModel("lite"), STANDARD: NamedModel("flash")})
+    assert await router.for_task(CLASSIFY).get_response() == "lite"
+    assert await router.for_task(EXTRACT).get_response() == "lite"
+    assert await router.for_task(GENERATE).get_response() == "flash"
+    stats = router.stats()
+    assert stats[FAST]["calls"] == 2 and stats[STANDARD]["calls"] == 1
+    assert stats[FAST]["tasks"] == [CLASSIFY, EXTRACT]
+
+
+@pytest.mark.asyncio
+async def test_routes_are_configurable_and_counted():
+    """
+    Tests route overrides, error counting and quality counters per tier.
+    """
+    router = ModelRouter({FAST: NamedModel("lite", fail=True), STANDARD: NamedModel("flash")},
+                         parse_routes("extract=standard"))
+    assert await router.for_task(EXTRACT).get_response() == "flash"
+    with pytest.raises(RuntimeError):
+        await router.for_task(CLASSIFY).get_response()
+    router.record_quality(CLASSIFY, True)
+    router.record_quality(CLASSIFY, False)
+    stats = router.stats()
+    assert stats[FAST]["errors"] == 1
+    assert stats[FAST]["quality_rate"] == 0.5
+    assert stats[STANDARD]["tasks"] == [EXTRACT, GENERATE]
+
+
+def test_invalid_routes_are_rejected():
+    """
+    Tests that unknown tasks or tiers fail at configuration time.
+    """
+    with pytest.raises(ValueError):
+        parse_routes("summarize=fast")
+    with pytest.raises(ValueError):
+        ModelRouter({FAST: NamedModel("lite"), STANDARD: NamedModel("flash")}, {GENERATE: "huge"})
+
+
+def test_from_env_builds_a_pool_per_tier():
+    """
+    Tests that each tier gets its own pool with the configured model.
+    """
+    router = ModelRouter.from_env({"GEMINI_API_KEY": "key-1234", "GEMINI_FAST_MODEL": "models/tiny"})
+    fast_model = router.tiers[FAST].members[0].model
+    assert fast_model.model == "models/tiny"
+    assert router.tiers[STANDARD].members[0].model.model == "models/gemini-2.0-flash"
@@ -0,0 +1,74 @@
+from context import LeanSessionContext, UserSessionContext, build_model_input
+from guardrails import pii_redactor
+from guardrails.pii_redactor import redact, redacted_content
+
+
+def test_redact_replaces_each_kind_and_keeps_labels():
+    """
+    Tests emails, phones, IDs and introduced names, keeping the label text around each value.
+    """
+    text = ("Hi, my name is Dana Whitfield. Mail dana.w@example.co.uk or call (555) 201-3344 / +44 20 7946 0958. "
+            "Member ID: HX448812, SSN 123-45-6789, card 4111 1111 1111 1111. Dr. Patel agreed.")
+    assert redact(text) == ("Hi, my name is [NAME]. Mail [EMAIL] or call [PHONE] / [PHONE]. "
+                            "Member ID: [ID], SSN [ID], card [ID]. Dr. [NAME] agreed.")
+
+
+def test_redact_leaves_ordinary_health_messages_alone():
+    """
+    Tests that quantities, dates, diets and capitalised foods are not mistaken for PII.
+    """
+    for text in ["I drank 500ml of water and walked 12000 steps on 2024-05-01",
+                 "3x10 squats, I'm 35, I weigh 82 kg and I am Vegan",
+                 "I am Sore after leg day, I'm Tired",
+                 "Swap the Greek yogurt, and my account of the week: 5 runs",
+                 "This is a detailed answer about training."]:
+        assert redact(text) is text
+
+
+def test_i_am_is_health_context_and_ids_may_follow_is():
+    """
+    Tests that capitalised words after "I am" / "I'm" are kept, and "my id is ..." is redacted like "ID: ...".
+    """
+    for text in ["I am Type Two diabetic", "I'm New York based", "I am Sore after leg day"]:
+        assert redact(text) is text
+    assert redact("My id is 12345") == "My id is [ID]"
+    assert redact("my policy number is AB-99812, my policy is to rest on Sundays") == (
+        "my policy number is [ID], my policy is to rest on Sundays")
+
+
+def test_history_is_redacted_once_and_stored_redacted(monkeypatch):
+    """
+    Tests that each turn is scanned once, and sessions are saved with only the redacted text.
+    """
+    calls = []
+    matcher = pii_redactor._matcher()
+    monkeypatch.setattr(pii_redactor, "_matcher", lambda: calls.append(1) or matcher)
+
+    history = [{"role": "user", "content": "email me at sam@example.com"},
+               {"role": "assistant", "content": "Sure, I will."}]
+    lean = LeanSessionContext(uid="abc", chat_history=history)
+    for _ in range(3):
+        messages = build_model_input(lean, "thanks, my number is 555-201-3344")
+    assert messages[0] == {"role": "user", "content": "email me at [EMAIL]"}
+    assert messages[-1]["content"] == "thanks, my number is 555-201-3344"  # Sent as typed.
+    scans = len(calls)
+
+    stored = lean.dumps()
+    assert "sam@example.com" not in stored
+    assert lean.to_dict()["chat_history"] == [{"role": "user", "content": "email me at [EMAIL]"}, history[1]]
+    assert lean.chat_history[0]["content"] == "email me at sam@example.com"  # Kept as typed in memory.
+    reloaded = LeanSessionContext.loads(stored, validate=False)
+    assert build_model_input(reloaded, "ok")[0]["content"] == "email me at [EMAIL]"
+    assert len(calls) == scans
+
+
+def test_dict_turns_are_sent_and_dumped_redacted():
+    """
+    Tests that UserSessionContext turns get the same model view, and model_dump stores no raw PII.
+    """
+    ctx = UserSessionContext(uid="abc", chat_history=[{"role": "user", "content": "call me Alex", "meta": {"x": 1}}])
+    assert build_model_input(ctx, "hi")[0] == {"role": "user", "content": "call me [NAME]"}
+    assert redacted_content(ctx.chat_history[0]) == "call me [NAME]"
+    assert ctx.model_dump()["chat_history"] == [{"role": "user", "content": "call me [NAME]", "meta": {"x": 1}}]
+    assert ctx.chat_history[0]["content"] == "call me Alex"
+    assert "Alex" not in ctx.model_dump_json()
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import agents  # noqa: F401  Imported up front so the first turn's short budget is not spent importing it.
+import pytest
+
+from agent import HealthPlannerAgent
+from context import UserSessionContext
+from llm.budget import BudgetedModel
+from llm.model_router import ModelRouter
+from llm.prompts import PROMPTS
+from planning.plan_prefetch import PlanPrefetcher
+
+
+class IntentModel:
+    def __init__(self, intent):
+        self.intent = intent
+
+    async def get_response(self, system_instructions, **kwargs):
+        text = self.intent if system_instructions == PROMPTS["intent"].static else "ok"
+        return SimpleNamespace(output=[SimpleNamespace(content=[SimpleNamespace(text=text)])])
+
+
+class CountingTool:
+    def __init__(self, name, result, delay=0.0):
+        self.name = name
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+        self.running = 0
+        self.most_running = 0
+
+    async def run(self, *args, **kwargs):
+        self.calls += 1
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_take_returns_results_for_the_same_inputs_only():
+    """
+    Tests that a follow-up gets the prefetched result (or joins it), and changed inputs drop it.
+    """
+    prefetcher = PlanPrefetcher()
+    tool = CountingTool("t", {"ok": True}, delay=0.05)
+    assert prefetcher.schedule("u1", "workout", "k1", tool.run)
+    assert prefetcher.schedule("u1", "workout", "k1", tool.run)  # Same inputs: the running job is kept.
+    assert await prefetcher.take("u1", "workout", "k1") == {"ok": True}  # Joined while running.
+
+    prefetcher.schedule("u1", "meal", "k1", tool.run)
+    await asyncio.sleep(0.1)
+    assert await prefetcher.take("u1", "meal", "k2") is None
+    assert await prefetcher.take("u1", "meal", "k1") is None  # Taken (and dropped) once.
+    assert tool.calls == 2
+    assert prefetcher.stats()["joined"] == 1 and prefetcher.stats()["stale"] == 1
+
+
+@pytest.mark.asyncio
+async def test_jobs_share_a_global_concurrency_limit_and_can_be_cancelled():
+    """
+    Tests that no more than max_concurrent jobs run at once, and cancelled jobs never deliver.
+    """
+    prefetcher = PlanPrefetcher(max_concurrent=2)
+    tool = CountingTool("t", {"ok": True}, delay=0.05)
+    for i in range(6):
+        prefetcher.schedule(f"u{i}", "meal", "k", tool.run)
+    prefetcher.cancel("u5")
+    await asyncio.sleep(0.3)
+    assert tool.most_running == 2 and tool.calls == 5
+    assert await prefetcher.take("u5", "meal", "k") is None
+    assert not PlanPrefetcher(max_concurrent=0).schedule("u", "meal", "k", tool.run)
+
+
+@pytest.mark.asyncio
+async def test_deferred_plans_are_prefetched_for_the_follow_up_turn():
+    """
+    Tests that plans cut off in the goal turn are built in the background and served on the next ask.
+    """
+    agent = HealthPlannerAgent(turn_budget_s=0.5)
+    model = IntentModel("set_or_update_goal")
+    agent.models = ModelRouter.single(BudgetedModel(model))
+    agent.tools["goal_analyzer"] = CountingTool(
+        "goal_analyzer", {"ok": True, "goal": {"name": "Muscle Gain", "action": "gain"}})
+    workout = CountingTool("workout_recommender", {"ok": True, "workout_plan": ["Day 1: Squats"]}, delay=0.3)
+    agent.tools["workout_recommender"] = workout
+    ctx = UserSessionContext()
+
+    first = await agent.run("my goal is to build muscle", ctx)
+    assert first["degraded"] == ["plans"]
+    await asyncio.sleep(0.35)
+
+    model.intent = "ask_workout_plan"
+    second = await agent.run("give me a workout plan", ctx)
+    assert "- Day 1: Squats" in second["response"]
+    assert workout.calls == 2  # The cut-off call and the prefetch; the follow-up made none.
+    assert agent.plan_prefetcher.stats()["hits"] == 1
+
+
+def test_prefetch_outlives_the_event_loop_of_the_turn_that_scheduled_it():
+    """
+    Tests that with one `asyncio.run` per turn, as in app.py, the deferred plan is still served to the next turn.
+    """
+    agent = HealthPlannerAgent(turn_budget_s=0.5)
+    model = IntentModel("set_or_update_goal")
+    agent.models = ModelRouter.single(BudgetedModel(model))
+    agent.tools["goal_analyzer"] = CountingTool(
+        "goal_analyzer", {"ok": True, "goal": {"name": "Muscle Gain", "action": "gain"}})
+    workout = CountingTool("workout_recommender", {"ok": True, "workout_plan": ["Day 1: Squats"]}, delay=0.3)
+    agent.tools["workout_recommender"] = workout
+    ctx = UserSessionContext()
+
+    assert asyncio.run(agent.run("my goal is to build muscle", ctx))["degraded"] == ["plans"]
+    time.sleep(0.35)
+    model.intent = "ask_workout_plan"
+    second = asyncio.run(agent.run("give me a workout plan", ctx))
+    assert "- Day 1: Squats" in second["response"]
+    assert workout.calls == 2
+    assert agent.plan_prefetcher.stats()["hits"] == 1
+    agent.plan_prefetcher.close()
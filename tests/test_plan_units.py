@@ -0,0 +1,78 @@
+import pytest
+
+from context import UserSessionContext
+from nutrition.energy import targets_for_goal
+from nutrition.food_db import parse_diet_preferences
+from nutrition.meal_solver import MealPlanSolver
+from planning.plan_units import (
+    meal_inputs, meal_units_from_plan, update_meal_units, update_workout_units, workout_units_from_week,
+)
+from training.workout_composer import WorkoutComposer
+
+GOAL = {"name": "Weight Loss", "action": "lose", "quantity": 5, "unit": "kg", "duration": "3 months"}
+
+
+@pytest.fixture(scope="module")
+def solver():
+    return MealPlanSolver()
+
+
+@pytest.fixture(scope="module")
+def meal_units(solver):
+    targets, diet = targets_for_goal(GOAL), parse_diet_preferences("")
+    return meal_units_from_plan(solver.solve(targets, diet), meal_inputs(targets, diet))
+
+
+def test_unchanged_inputs_keep_every_day(solver, meal_units):
+    """
+    Tests that re-running with the same goal and diet regenerates nothing.
+    """
+    units, plan, diff = update_meal_units(meal_units, targets_for_goal(GOAL), parse_diet_preferences(""), solver)
+    assert diff.changed_inputs == []
+    assert diff.regenerated == []
+    assert units["days"] == meal_units["days"]
+    assert len(plan.days) == 7
+
+
+def test_diet_change_regenerates_only_violating_days(solver, meal_units):
+    """
+    Tests that a new diet keeps compliant days and replaces the rest with compliant meals.
+    """
+    diet = parse_diet_preferences("vegetarian")
+    units, plan, diff = update_meal_units(meal_units, targets_for_goal(GOAL), diet, solver)
+    assert diff.changed_inputs == ["diet"]
+    for number, (old, new) in enumerate(zip(meal_units["days"], units["days"]), start=1):
+        if number not in diff.regenerated:
+            assert old["meals"] == new["meals"]
+    assert all(solver.food_db.allows(meal.food, diet) for day in plan.days for meal in day)
+    assert "Updated your meal plan" in diff.summary() or not diff.regenerated
+
+
+def test_injury_change_regenerates_only_affected_workout_days():
+    """
+    Tests that a new injury only replaces the days holding contraindicated exercises.
+    """
+    composer = WorkoutComposer()
+    goal = {"action": "gain"}
+    spec = composer.spec(goal, "intermediate")
+    units = workout_units_from_week(composer.compose(goal, "intermediate"), spec)
+
+    injured = composer.spec(goal, "intermediate", "my wrist hurts")
+    new_units, week, diff = update_workout_units(units, injured, composer)
+    assert diff.changed_inputs == ["injuries"]
+    assert 0 < len(diff.regenerated) < 7
+    by_name = {e.name: e for e in composer.catalog.exercises}
+    for day in week.days:
+        assert not any(by_name[item.exercise].contraindications & injured.injury_mask for item in day.items)
+    for old, new in zip(units["days"], new_units["days"]):
+        if old["day"] not in diff.regenerated:
+            assert old["items"] == new["items"]
+
+
+def test_context_round_trips_plan_units(meal_units):
+    """
+    Tests that plan units survive serialization with the session context.
+    """
+    ctx = UserSessionContext(name="Sam", uid="1", plan_units={"meal": meal_units})
+    restored = UserSessionContext(**ctx.model_dump())
+    assert restored.plan_units == {"meal": meal_units}
@@ -0,0 +1,65 @@
+import json
+import os
+
+from llm.prompts import PROMPTS, PromptRegistry
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "benchmarks", "prompt_baseline.json")
+
+
+def test_render_keeps_static_prefix_first():
+    """
+    Tests that per-call values only ever follow the static prefix, which extends its base.
+    """
+    registry = PromptRegistry()
+    registry.register("tone", "  You are helpful.   \n")
+    registry.register("medical", "Append the disclaimer:", suffix='"{disclaimer}".', base="tone")
+    first = registry.render("medical", disclaimer="A")
+    second = registry.render("medical", disclaimer="B")
+    static = registry["medical"].static
+    assert static == "You are helpful. Append the disclaimer:"
+    assert first.startswith(static) and second.startswith(static)
+    assert first != second
+    assert registry.render("tone") == "You are helpful."
+
+
+def test_usage_counts_static_and_dynamic_tokens():
+    """
+    Tests that rendering records tokens so prefix-cache savings can be measured.
+    """
+    registry = PromptRegistry()
+    registry.register("plan", "Write a plan.", suffix="Goal: {goal}")
+    registry.render("plan", goal="lose weight")
+    registry.render("plan", goal="gain")
+    usage = registry.usage()
+    counts = usage["templates"]["plan"]
+    assert counts["calls"] == 2
+    assert counts["static_tokens"] == 2 * registry["plan"].static_tokens
+    assert counts["dynamic_tokens"] == 7  # "Goal: lose weight" + "Goal: gain"
+    assert 0 < usage["cacheable_ratio"] < 1
+
+
+def test_drift_flags_size_and_text_changes():
+    """
+    Tests that a grown or edited template is flagged against its baseline.
+    """
+    registry = PromptRegistry()
+    registry.register("a", "one two three four five six seven eight nine ten")
+    registry.register("b", "unchanged")
+    baseline = registry.snapshot()
+    assert registry.drift(baseline) == []
+
+    registry.register("a", "one two three four five six seven eight nine ten eleven twelve")
+    registry.register("b", "changed")
+    messages = registry.drift({**baseline, "gone": {"hash": "x", "tokens": 1}})
+    assert any(m.startswith("a: 10 -> 12 tokens") for m in messages)
+    assert any(m.startswith("b: text changed") for m in messages)
+    assert any(m.startswith("gone:") for m in messages)
+
+
+def test_bundled_prompts_match_baseline():
+    """
+    Tests that the shipped prompts match the recorded baseline (refresh it with bench_prompts --update).
+    """
+    with open(BASELINE_PATH) as f:
+        assert PROMPTS.drift(json.load(f)) == []
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+from tools.registry import ToolRegistry
+
+
+def test_tool_registry_instantiates_on_first_use():
+    """
+    Tests that tools are constructed lazily, once, and can be replaced.
+    """
+    registry = ToolRegistry({"tracker": "tools.tracker:ProgressTrackerTool"})
+    assert not registry.is_loaded("tracker")
+
+    tracker = registry["tracker"]
+    assert tracker.name == "ProgressTrackerTool"
+    assert registry["tracker"] is tracker
+
+    registry["tracker"] = "mock"
+    assert registry["tracker"] == "mock"
+    assert list(registry) == ["tracker"]
+
+
+def test_agent_import_does_not_load_sdk():
+    """
+    Tests that importing and constructing the agent defers the agents SDK and pydantic.
+    """
+    probe = (
+        "import sys, agent; agent.HealthPlannerAgent(); "
+        "print('agents' in sys.modules, 'pydantic' in sys.modules)"
+    )
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert output.split() == ["False", "False"]
@@ -0,0 +1,67 @@
+from context import LeanSessionContext, UserSessionContext, build_model_input
+from guardrails.disclaimer_generator import GENERAL_HEALTH_DISCLAIMER, MEDICAL_DISCLAIMER
+from guardrails.guardrail_manager import GuardrailManager
+from guardrails.response_pipeline import (
+    GENERAL,
+    MEDICAL,
+    Response,
+    ResponsePipeline,
+    add_disclaimer,
+    history_turn,
+    render_turn,
+    trim_whitespace,
+)
+
+
+def test_render_matches_the_legacy_disclaimer_format():
+    """
+    Tests that finalize + render produce the text post_process_response always returned.
+    """
+    guardrails = GuardrailManager()
+    response = guardrails.finalize("Here is your plan.\n")
+
+    assert response.render() == "Here is your plan.\n\n" + GENERAL_HEALTH_DISCLAIMER
+    assert guardrails.post_process_response("Here is your plan.") == response.render()
+    assert response.body == "Here is your plan."
+    assert guardrails.finalize("Hi", needs_disclaimer=False).render() == "Hi"
+
+
+def test_segments_join_once_with_paragraphs_and_merged_disclaimers():
+    """
+    Tests that add/paragraph/extend build the same text as the old string concatenation.
+    """
+    plan = Response("Workout:").add("Day 1", "Day 2")
+    meal = Response("Meals:", disclaimers=[MEDICAL])
+    combined = Response("Intro").extend(plan).extend(meal).disclaim(GENERAL).disclaim(MEDICAL)
+
+    assert combined.body == "Intro\n\nWorkout:\nDay 1\nDay 2\n\nMeals:"
+    assert combined.disclaimers == [MEDICAL, GENERAL]
+    assert combined.render() == f"{combined.body}\n\n{MEDICAL_DISCLAIMER}\n\n{GENERAL_HEALTH_DISCLAIMER}"
+
+
+def test_pipeline_stages_and_trim():
+    """
+    Tests that stages run in order, then() leaves the original pipeline alone, and trimming keeps the middle.
+    """
+    base = ResponsePipeline(trim_whitespace)
+    full = base.then(add_disclaimer(MEDICAL))
+
+    assert base(Response("", "  a  ", "", "b\n", " ")).parts == ["a  ", "", "b"]
+    assert base("x").disclaimers == [] and full("x").disclaimers == [MEDICAL]
+
+
+def test_history_stores_the_body_and_renders_disclaimers_from_meta():
+    """
+    Tests that stored turns keep disclaimers as metadata, which the model input never includes.
+    """
+    result = {"response": "Hi\n\n" + GENERAL_HEALTH_DISCLAIMER, "body": "Hi", "disclaimers": [GENERAL]}
+    turn = history_turn(result)
+    assert turn == {"role": "assistant", "content": "Hi", "meta": {"disclaimers": [GENERAL]}}
+    assert render_turn(turn) == result["response"]
+    assert history_turn({"response": "plain"}) == {"role": "assistant", "content": "plain"}
+
+    ctx = UserSessionContext(uid="abc", chat_history=[turn])
+    lean = LeanSessionContext.from_context(ctx)
+    assert lean.to_dict()["chat_history"] == [turn]
+    for context in (ctx, lean):
+        assert build_model_input(context, "next")[0] == {"role": "assistant", "content": "Hi"}
@@ -1,5 +1,7 @@
 import pytest
 from tools.scheduler import CheckinSchedulerTool
+from scheduling.engine import CheckinScheduler
+from scheduling.timer_store import TimerStore
 
 
 @pytest.mark.asyncio
@@ -7,10 +9,24 @@ async def test_checkin_scheduler_tool():
     """
     Tests the CheckinSchedulerTool with a sample level and cadence.
     """
-    tool = CheckinSchedulerTool()
-    result = await tool.run("beginner", cadence="weekly")
+    scheduler = CheckinScheduler(TimerStore(), clock=lambda: 1000.0)
+    tool = CheckinSchedulerTool(scheduler)
+    result = await tool.run("beginner", uid="user-1", cadence="weekly")
 
     assert result["ok"] is True
     assert result["scheduled"] is True
     assert result["cadence"] == "weekly"
     assert result["level"] == "beginner"
+    assert result["next_checkin"] == 1000.0 + 7 * 86400
+    assert scheduler.store.get("user-1") == ("user-1", "weekly", "beginner", 1000.0 + 7 * 86400)
+
+
+@pytest.mark.asyncio
+async def test_checkin_scheduler_tool_rejects_bad_input():
+    """
+    Tests that the CheckinSchedulerTool refuses unknown cadences and missing uids.
+    """
+    tool = CheckinSchedulerTool(CheckinScheduler(TimerStore()))
+
+    assert (await tool.run("beginner", uid="user-1", cadence="hourly"))["ok"] is False
+    assert (await tool.run("beginner", cadence="weekly"))["ok"] is False
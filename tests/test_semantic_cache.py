@@ -0,0 +1,135 @@
+import pytest
+from agent import HealthPlannerAgent
+from caching.semantic_cache import SemanticCache, is_context_free
+from context import UserSessionContext
+from llm.model_router import ModelRouter
+
+
+class MockContent:
+    def __init__(self, text):
+        self.text = text
+
+
+class MockOutput:
+    def __init__(self, text):
+        self.content = [MockContent(text)]
+
+
+class MockResponseObj:
+    def __init__(self, text):
+        self.output = [MockOutput(text)]
+        self.response_id = None
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_response(self, **kwargs):
+        self.calls += 1
+        if "classifying user intent" in kwargs["system_instructions"]:
+            return MockResponseObj("ask_general_question")
+        return MockResponseObj("A calorie is a unit of energy.")
+
+
+class InjuryModel:
+    async def get_response(self, **kwargs):
+        if "classifying user intent" in kwargs["system_instructions"]:
+            return MockResponseObj("handle_injury")
+        return MockResponseObj("Rest and see a professional if it persists.")
+
+
+def test_semantic_cache_matches_paraphrases():
+    """
+    Tests that near-identical questions hit and unrelated ones miss.
+    """
+    cache = SemanticCache(capacity=8)
+    cache.store("What is a calorie?", "A unit of energy.")
+    cache.store("Why is exercise important?", "It keeps you healthy.")
+
+    assert cache.lookup("what's a calorie") == "A unit of energy."
+    assert cache.lookup("Why is exercise so important?") == "It keeps you healthy."
+    assert cache.lookup("What is a calorie deficit?") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_semantic_cache_tells_interrogatives_and_modals_apart():
+    """
+    Tests that questions differing only in their question word or modal verb do not share an answer.
+    """
+    cache = SemanticCache(capacity=8)
+    cache.store("Why do muscles cramp?", "Mostly fatigue and dehydration.")
+    cache.store("Should I stretch before running?", "A dynamic warm-up is better.")
+
+    assert cache.lookup("How do muscles cramp?") is None
+    assert cache.lookup("Can I stretch before running?") is None
+    assert cache.lookup("Why do muscles cramp") == "Mostly fatigue and dehydration."
+
+
+def test_semantic_cache_ttl_and_eviction():
+    """
+    Tests that entries expire after the TTL and the least recently used entry is evicted when full.
+    """
+    now = [0.0]
+    cache = SemanticCache(capacity=2, ttl=100, clock=lambda: now[0])
+    cache.store("what is protein", "protein answer")
+    cache.store("what is fiber", "fiber answer")
+    now[0] = 10.0
+    cache.lookup("what is protein")
+    cache.store("what is sodium", "sodium answer")
+
+    assert cache.lookup("what is fiber") is None
+    assert cache.lookup("what is protein") == "protein answer"
+    assert cache.stats()["evictions"] == 1
+
+    now[0] = 500.0
+    assert cache.lookup("what is protein") is None
+    assert len(cache) == 0
+
+
+def test_is_context_free():
+    """
+    Tests that personal or conversation-dependent questions are not cacheable.
+    """
+    assert is_context_free("What is a calorie?")
+    assert is_context_free("tell me about healthy eating")
+    assert not is_context_free("how many calories should I eat?")
+    assert not is_context_free("tell me more about that")
+
+
+@pytest.mark.asyncio
+async def test_agent_serves_repeated_general_question_without_model():
+    """
+    Tests that a repeated general question is answered from the cache with no model call.
+    """
+    agent = HealthPlannerAgent()
+    model = CountingModel()
+    agent.models = ModelRouter.single(model)
+
+    first = await agent.run("What is a calorie?", UserSessionContext())
+    calls_after_first = model.calls
+    second = await agent.run("what is a calorie", UserSessionContext())
+
+    assert calls_after_first == 2
+    assert model.calls == calls_after_first
+    assert second["response"] == first["response"]
+    assert second["cached"] is True
+
+
+@pytest.mark.asyncio
+async def test_injury_turns_keep_body_parts_and_unknown_injuries():
+    """
+    Tests that injury turns store each known body part once, keep injuries the catalog does not know, and stop caching.
+    """
+    agent = HealthPlannerAgent()
+    agent.models = ModelRouter.single(InjuryModel())
+    ctx = UserSessionContext()
+
+    await agent.run("I broke my collarbone, my email is sam@example.com", ctx)
+    assert ctx.injury_notes == "I broke my collarbone, my email is [EMAIL]"
+    assert not agent._is_cacheable_query("What is a calorie?", ctx)
+
+    await agent.run("I hurt my knee playing football", ctx)
+    await agent.run("my knee still hurts and now my lower back too", ctx)
+    assert ctx.injury_notes == "knee, lower back; I broke my collarbone, my email is [EMAIL]"
@@ -0,0 +1,135 @@
+import os
+import time
+
+from storage import session_archive
+
+from context import UserSessionContext
+from storage.session_archive import SessionArchive, archive_cold_sessions, archive_for
+from storage.session_store import (
+    list_session_ids, load_lean_session_context, load_session_context, load_session_contexts, save_session_context,
+    session_path,
+)
+
+
+def _save_idle(session_dir: str, session_id: str, days_idle: float, turns: int = 20) -> None:
+    history = [{"role": "user", "content": f"turn {i}: how much protein do I need?"} for i in range(turns)]
+    save_session_context(session_id, UserSessionContext(uid=session_id, name=session_id, chat_history=history),
+                         session_dir)
+    stamp = time.time() - days_idle * 86400
+    os.utime(session_path(session_id, session_dir), (stamp, stamp))
+
+
+def test_archive_moves_only_idle_sessions(tmp_path):
+    """
+    Tests that idle sessions are compressed into day archives and active ones stay hot.
+    """
+    session_dir = str(tmp_path)
+    _save_idle(session_dir, "old-1", days_idle=40)
+    _save_idle(session_dir, "old-2", days_idle=45)
+    _save_idle(session_dir, "active", days_idle=1)
+
+    report = archive_cold_sessions(session_dir, idle_days=30)
+    assert report.archived == 2
+    assert report.space_saved > 0.5
+    assert list_session_ids(session_dir) == ["active"]
+    archive_files = os.listdir(os.path.join(session_dir, "archive"))
+    assert len([name for name in archive_files if name.endswith(".jsonl.gz")]) == 2  # One per day of last activity.
+    assert "old-1" in archive_for(session_dir)
+
+
+def test_loaders_rehydrate_archived_sessions(tmp_path):
+    """
+    Tests that loading an archived session restores it transparently to the hot tier.
+    """
+    session_dir = str(tmp_path)
+    _save_idle(session_dir, "a", days_idle=40)
+    _save_idle(session_dir, "b", days_idle=40)
+    archive_cold_sessions(session_dir, idle_days=30)
+
+    ctx = load_session_context("a", session_dir)
+    assert ctx.name == "a" and len(ctx.chat_history) == 20
+    assert os.path.exists(session_path("a", session_dir))
+    assert "a" not in archive_for(session_dir)
+
+    assert load_lean_session_context("b", session_dir).name == "b"
+    assert [c.uid for c in load_session_contexts(["a", "b", "missing"], session_dir)] == ["a", "b"]
+    assert archive_for(session_dir).stats()["rehydrations"] == 2
+
+
+def test_index_is_shared_across_instances(tmp_path):
+    """
+    Tests that a second archive instance sees sessions archived by another one.
+    """
+    session_dir = str(tmp_path)
+    _save_idle(session_dir, "a", days_idle=40)
+    SessionArchive(session_dir).archive(["a", "missing"])
+    other = SessionArchive(session_dir)
+    assert len(other) == 1
+    assert other.rehydrate("a")
+    assert not other.rehydrate("a")
+
+
+def test_index_changes_reread_the_index_under_the_lock(tmp_path):
+    """
+    Tests that rehydrating with a stale cached index keeps entries another process archived meanwhile.
+    """
+    session_dir = str(tmp_path)
+    for session_id in ("a", "b"):
+        _save_idle(session_dir, session_id, days_idle=40)
+    server, job = SessionArchive(session_dir), SessionArchive(session_dir)
+    job.archive(["a"])
+    assert "a" in server
+    job.archive(["b"])
+    # As if the server read the index just before the job replaced it, within one mtime tick.
+    server._index_mtime = os.stat(server.index_path).st_mtime_ns
+    assert "b" not in server._index
+
+    assert server.rehydrate("a")
+    assert "b" in SessionArchive(session_dir) and "a" not in SessionArchive(session_dir)
+    assert load_session_context("b", session_dir).name == "b"
+
+
+def test_session_written_while_archiving_stays_hot(tmp_path, monkeypatch):
+    """
+    Tests that a snapshot saved between archiving a session and removing its hot file is kept, and the archive drops it.
+    """
+    session_dir = str(tmp_path)
+    _save_idle(session_dir, "a", days_idle=40)
+    _save_idle(session_dir, "b", days_idle=40)
+    fsync = os.fsync
+    saved = []
+
+    def fsync_then_save(fd):
+        # The archive is synced after its members are written and before any hot file is removed.
+        fsync(fd)
+        if not saved:
+            saved.append(save_session_context("a", UserSessionContext(uid="a", name="newer"), session_dir))
+
+    monkeypatch.setattr(session_archive.os, "fsync", fsync_then_save)
+    report = SessionArchive(session_dir).archive(["a", "b"])
+    monkeypatch.setattr(session_archive.os, "fsync", fsync)
+
+    assert report.archived == 1
+    assert list_session_ids(session_dir) == ["a"]
+    assert load_session_context("a", session_dir).name == "newer"
+    assert "a" not in SessionArchive(session_dir) and "b" in SessionArchive(session_dir)
+
+
+def test_compact_drops_members_of_rehydrated_sessions(tmp_path):
+    """
+    Tests that archives of mostly rehydrated sessions are rewritten with the rest, and empty ones deleted.
+    """
+    session_dir = str(tmp_path)
+    for session_id, days_idle in (("a", 40), ("b", 40), ("c", 40), ("d", 50)):
+        _save_idle(session_dir, session_id, days_idle)
+    archive = SessionArchive(session_dir)
+    archive.archive(["a", "b", "c", "d"])
+    for session_id in ("a", "b", "d"):
+        assert archive.rehydrate(session_id)
+
+    assert archive.compact() > 0
+    names = sorted(name for name in os.listdir(archive.archive_dir) if name.endswith(".jsonl.gz"))
+    assert len(names) == 1 and names[0].endswith(".1.jsonl.gz")
+    assert archive.compact() == 0
+    assert SessionArchive(session_dir).rehydrate("c")
+    assert load_session_context("c", session_dir).name == "c"
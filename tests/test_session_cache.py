@@ -0,0 +1,58 @@
+from context import LeanSessionContext
+from storage.session_cache import SessionCache
+from storage.session_store import load_session_context, save_session_context
+
+
+def test_session_cache_hits_and_write_behind(tmp_path):
+    """
+    Tests that puts stay in memory until flush, and hits/misses are counted.
+    """
+    session_dir = str(tmp_path)
+    cache = SessionCache(capacity=4, session_dir=session_dir)
+
+    ctx = cache.get("a")
+    ctx.chat_history.append({"role": "user", "content": "hi"})
+    cache.put("a", ctx)
+    assert cache.get("a") is ctx
+    assert load_session_context("a", session_dir).chat_history == []
+
+    assert cache.flush() == 1
+    assert load_session_context("a", session_dir).chat_history == [{"role": "user", "content": "hi"}]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["dirty"]) == (1, 1, 0)
+    cache.close()
+
+
+def test_session_cache_evicts_lru_and_writes_dirty(tmp_path):
+    """
+    Tests that the least recently used session is evicted and written if dirty.
+    """
+    session_dir = str(tmp_path)
+    cache = SessionCache(capacity=2, session_dir=session_dir, journal_path="")
+    cache.put("a", LeanSessionContext(uid="a", name="A"))
+    cache.put("b", LeanSessionContext(uid="b", name="B"))
+    cache.get("a")
+    cache.put("c", LeanSessionContext(uid="c", name="C"))
+
+    assert "b" not in cache
+    assert cache.stats()["evictions"] == 1
+    assert load_session_context("b", session_dir).name == "B"
+
+
+def test_session_cache_replays_journal_after_crash(tmp_path):
+    """
+    Tests that snapshots journaled before a crash are restored on the next start.
+    """
+    session_dir = str(tmp_path)
+    save_session_context("a", LeanSessionContext(uid="a", name="old"), session_dir)
+    crashed = SessionCache(session_dir=session_dir)
+    crashed.put("a", LeanSessionContext(uid="a", name="new"))
+    crashed.put("b", LeanSessionContext(uid="b", name="B"))
+    with open(crashed.journal_path, "a") as f:
+        f.write('{"uid": "torn')
+    # No flush or close: simulate the process dying here.
+
+    restarted = SessionCache(session_dir=session_dir)
+    assert restarted.get("a").name == "new"
+    assert restarted.get("b").name == "B"
+    restarted.close()
@@ -0,0 +1,233 @@
+import multiprocessing
+import os
+from types import SimpleNamespace
+
+import agents  # noqa: F401  Imported up front so the first turn's short budget is not spent importing it.
+import pytest
+
+from agent import HealthPlannerAgent
+from caching.semantic_cache import SemanticCache
+from caching.shared_cache import CacheBackend, RedisCache, SharedCache, open_shared_cache
+from context import UserSessionContext
+from llm.budget import BudgetedModel
+from llm.model_router import ModelRouter
+from llm.prompts import PROMPTS
+from serving.worker_pool import WorkerPool
+
+
+def _version(byte):
+    return bytes([byte]) * (100 + (byte * 37) % 900)
+
+
+def _write_versions(path, key, rounds):
+    cache = SharedCache(path)
+    for i in range(rounds):
+        # Every version is one repeated byte, at a length that follows from the byte and differs from the last one.
+        cache.set(key, _version(i % 251))
+    cache.close()
+
+
+class SharedCacheAgent:
+    """Answers with the pid of whichever worker first saw the input."""
+
+    def __init__(self):
+        self.cache = SharedCache.from_env()
+
+    async def run(self, user_input, ctx):
+        first = self.cache.get(user_input)
+        if first is None:
+            first = str(os.getpid()).encode()
+            self.cache.set(user_input, first)
+        return {"ok": True, "response": f"{os.getpid()}:{first.decode()}"}
+
+
+AGENT_FACTORY = "tests.test_shared_cache:SharedCacheAgent"
+
+
+def test_entries_expire_and_do_not_outgrow_a_slot(tmp_path):
+    """
+    Tests get/set/delete, TTL expiry, JSON values and rejection of items larger than a slot.
+    """
+    now = [1000.0]
+    with SharedCache(str(tmp_path / "cache"), slots=16, slot_bytes=256, clock=lambda: now[0]) as cache:
+        assert cache.set("a", b"1", ttl=10)
+        assert cache.set_json("plan", {"days": [1, 2]})
+        assert cache.get("a") == b"1" and cache.get_json("plan") == {"days": [1, 2]}
+        assert not cache.set("big", b"x" * 256)
+        now[0] += 11
+        assert cache.get("a") is None and len(cache) == 1
+        cache.delete("plan")
+        assert cache.get_json("plan") is None
+        assert cache.stats()["too_large"] == 1
+
+
+def test_clock_eviction_keeps_recently_hit_entries(tmp_path):
+    """
+    Tests that a full set evicts an entry that was not hit since the hand last passed, not one that was.
+    """
+    with SharedCache(str(tmp_path / "cache"), slots=2, ways=2) as cache:
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        assert cache.get("a") == b"1"
+        cache.set("c", b"3")
+        assert cache.get("a") == b"1" and cache.get("b") is None and cache.get("c") == b"3"
+        assert cache.stats()["evictions"] == 1
+
+
+def test_processes_share_entries_and_lock_free_reads_never_see_torn_values(tmp_path):
+    """
+    Tests that a value written by another process is read here, and reads racing its writes are whole.
+    """
+    path = str(tmp_path / "cache")
+    cache = SharedCache(path)
+    writer = multiprocessing.get_context("spawn").Process(target=_write_versions, args=(path, "k", 20000))
+    writer.start()
+    seen = set()
+    while writer.is_alive():
+        value = cache.get("k")
+        if value is not None:
+            assert value == _version(value[0])
+            seen.add(value[0])
+    writer.join()
+    assert writer.exitcode == 0 and len(seen) > 1
+    assert cache.get("k") == _version(19999 % 251)
+    cache.close()
+
+
+def test_worker_pool_workers_reuse_each_others_results(tmp_path):
+    """
+    Tests that a result stored by one worker of the pool is served by another.
+    """
+    path = str(tmp_path / "shared-cache")
+    with WorkerPool(2, AGENT_FACTORY, session_dir=str(tmp_path), shared_cache_path=path) as pool:
+        users = {pool.worker_for(f"user{i}"): f"user{i}" for i in range(20)}
+        assert len(users) == 2
+        replies = [pool.run_sync(uid, "build my plan", timeout=30)["response"] for uid in users.values()]
+    pids = [reply.split(":")[0] for reply in replies]
+    assert pids[0] != pids[1]
+    assert [reply.split(":")[1] for reply in replies] == [pids[0], pids[0]]
+
+
+class IntentModel:
+    def __init__(self, intent):
+        self.intent = intent
+
+    async def get_response(self, system_instructions, **kwargs):
+        text = self.intent if system_instructions == PROMPTS["intent"].static else "ok"
+        return SimpleNamespace(output=[SimpleNamespace(content=[SimpleNamespace(text=text)])])
+
+
+class CountingTool:
+    def __init__(self, name, result):
+        self.name = name
+        self.result = result
+        self.calls = 0
+
+    async def run(self, *args, **kwargs):
+        self.calls += 1
+        return self.result
+
+
+def _agent(cache, intent, tool):
+    agent = HealthPlannerAgent()
+    agent.models = ModelRouter.single(BudgetedModel(IntentModel(intent)))
+    agent.shared_cache = cache
+    agent.tools[tool.name] = tool
+    return agent
+
+
+@pytest.mark.asyncio
+async def test_agents_sharing_a_cache_build_a_plan_once(tmp_path):
+    """
+    Tests that a plan one agent built is reused by another for the same inputs, and rebuilt for new ones.
+    """
+    cache = SharedCache(str(tmp_path / "cache"))
+    goal = {"name": "Muscle Gain", "action": "gain"}
+    tool = CountingTool("workout_recommender", {"ok": True, "workout_plan": ["Day 1: Squats"]})
+    first, second = _agent(cache, "ask_workout_plan", tool), _agent(cache, "ask_workout_plan", tool)
+
+    reply = await first.run("give me a workout plan", UserSessionContext(uid="a", goal=goal))
+    assert "- Day 1: Squats" in reply["response"]
+    reply = await second.run("give me a workout plan", UserSessionContext(uid="b", goal=goal))
+    assert "- Day 1: Squats" in reply["response"]
+    assert tool.calls == 1
+
+    await second.run("give me a workout plan", UserSessionContext(uid="c", goal={**goal, "name": "Strength"}))
+    assert tool.calls == 2
+    cache.close()
+
+
+def test_answer_caches_share_answers_across_processes(tmp_path):
+    """
+    Tests that an answer stored by one SemanticCache is found by another through the shared backend.
+    """
+    with SharedCache(str(tmp_path / "cache")) as shared:
+        SemanticCache(shared=shared).store("What is a calorie?", "A unit of energy.")
+        other = SemanticCache(shared=shared)
+        assert other.lookup("what is a calorie") == "A unit of energy."
+        assert other.lookup("What's a calorie??") == "A unit of energy."  # Now from its own vectors.
+        assert other.stats()["shared_hits"] == 1
+        assert other.lookup("how many grams of protein in an egg") is None
+
+
+def test_shared_answers_need_the_same_question_words(tmp_path):
+    """
+    Tests that a shared answer, which skips the similarity threshold, is not served for a different question.
+    """
+    with SharedCache(str(tmp_path / "cache")) as shared:
+        SemanticCache(shared=shared).store("When to eat carbs?", "Around training.")
+        other = SemanticCache(shared=shared)
+        assert other.lookup("why eat carbs") is None
+        assert other.lookup("When to eat carbs") == "Around training."
+        assert other.stats()["shared_hits"] == 1
+
+
+def test_backends_must_implement_the_whole_interface():
+    """
+    Tests that CacheBackend is abstract, so a backend missing a method fails at construction.
+    """
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+
+class DictRedis:
+    """The subset of the redis-py client RedisCache uses, over a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiries = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiries[key] = ex
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if key.startswith(match.rstrip("*"))]
+
+
+def test_redis_backend_prefixes_keys_and_sets_expiry(tmp_path):
+    """
+    Tests the Redis-compatible backend's key prefix, TTL rounding and clear, and backend selection from env.
+    """
+    client = DictRedis()
+    cache = RedisCache(client, prefix="test:")
+    cache.set_json("plan:workout:abc", {"ok": True}, ttl=0.5)
+    assert client.expiries == {"test:plan:workout:abc": 1}
+    assert cache.get_json("plan:workout:abc") == {"ok": True}
+    cache.clear()
+    assert cache.get("plan:workout:abc") is None
+
+    assert open_shared_cache({}) is None
+    shared = open_shared_cache({"SHARED_CACHE_PATH": str(tmp_path / "cache"), "SHARED_CACHE_SLOTS": "64"})
+    assert isinstance(shared, SharedCache) and shared.capacity == 64
+    shared.close()
@@ -0,0 +1,54 @@
+import os
+import signal
+
+from serving.worker_pool import WorkerPool
+
+
+class EchoAgent:
+    async def run(self, user_input, ctx):
+        return {"ok": True, "response": f"{os.getpid()}:{len(ctx.chat_history)}:{user_input}"}
+
+
+AGENT_FACTORY = "tests.test_worker_pool:EchoAgent"
+
+
+def test_worker_pool_routes_sessions_sticky(tmp_path):
+    """
+    Tests that every turn of a session goes to the same worker and sees that worker's cached history.
+    """
+    with WorkerPool(2, AGENT_FACTORY, session_dir=str(tmp_path)) as pool:
+        for uid in ("alice", "bob", "carol"):
+            replies = [pool.run_sync(uid, f"turn {i}", timeout=30)["response"] for i in range(3)]
+            pids = {reply.split(":")[0] for reply in replies}
+            history_lengths = [int(reply.split(":")[1]) for reply in replies]
+            assert len(pids) == 1
+            assert history_lengths == [0, 2, 4]
+        assert sum(pool.stats()["dispatched"]) == 9
+
+
+def test_worker_pool_respawns_dead_worker(tmp_path):
+    """
+    Tests that a killed worker is replaced in the same slot and its sessions survive via the journal.
+    """
+    with WorkerPool(2, AGENT_FACTORY, session_dir=str(tmp_path)) as pool:
+        pool.run_sync("alice", "hello", timeout=30)
+        index = pool.worker_for("alice")
+        os.kill(pool.worker_pid(index), signal.SIGKILL)
+
+        reply = pool.run_sync("alice", "again", timeout=30)["response"]
+        assert reply.split(":")[1] == "2"
+        assert pool.stats()["restarts"] == 1
+
+
+def test_worker_pool_rebalances_without_respawn(tmp_path):
+    """
+    Tests that sessions move to a surviving worker when respawning is disabled.
+    """
+    with WorkerPool(2, AGENT_FACTORY, session_dir=str(tmp_path), respawn=False) as pool:
+        pool.run_sync("alice", "hello", timeout=30)
+        index = pool.worker_for("alice")
+        os.kill(pool.worker_pid(index), signal.SIGKILL)
+
+        reply = pool.run_sync("alice", "again", timeout=30)["response"]
+        assert reply.split(":")[1] == "2"
+        assert pool.stats()["live"] == [1 - index]
@@ -0,0 +1,102 @@
+import pytest
+
+from training.exercise_catalog import BODY_PART_BITS, ExerciseCatalog, format_injuries, merge_injury_notes, parse_injuries
+from training.workout_composer import WorkoutComposer, emphasis_patterns
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return ExerciseCatalog.load()
+
+
+def test_parse_injuries():
+    """
+    Tests that injury notes map to body parts.
+    """
+    assert parse_injuries("I sprained my left ankle and my lower back hurts") == {"ankle", "lower_back"}
+    assert parse_injuries("torn ACL last year") == {"knee"}
+    assert parse_injuries(None) == frozenset()
+    assert parse_injuries("I came back from vacation and my knee hurts") == {"knee"}
+    assert parse_injuries("I hurt my back lifting") == parse_injuries("my back is really sore") == {"lower_back"}
+
+
+def test_format_injuries_round_trips_through_parse():
+    """
+    Tests that stored injury notes list each body part once and parse back to the same parts.
+    """
+    parts = parse_injuries("my lower back hurts, and my knee, my knees!")
+    assert format_injuries(parts) == "knee, lower back"
+    assert parse_injuries(format_injuries(parts)) == parts
+    assert format_injuries(frozenset()) is None
+
+
+def test_merge_injury_notes_never_drops_what_it_cannot_parse():
+    """
+    Tests that unknown injuries and older free-text notes are kept, deduplicated and bounded, next to the parsed parts.
+    """
+    notes = merge_injury_notes(None, "I have plantar fasciitis")
+    assert notes == "I have plantar fasciitis"
+    notes = merge_injury_notes(notes, "I hurt my knee")
+    notes = merge_injury_notes(notes, "I have  plantar fasciitis")
+    assert notes == "knee; I have plantar fasciitis"
+    assert parse_injuries(notes) == {"knee"}
+
+    assert merge_injury_notes("I tore my ACL; still stiff", "my neck hurts") == "knee, neck; still stiff"
+    for i in range(10):
+        notes = merge_injury_notes(notes, f"old injury number {i}")
+    assert notes == "knee; old injury number 7; old injury number 8; old injury number 9"
+
+
+def test_emphasis_matches_whole_words_only():
+    """
+    Tests that goal words add emphasis as words, not as parts of other words or in "get back in shape".
+    """
+    assert emphasis_patterns({"name": "Get back in shape"}) == []
+    assert emphasis_patterns({"name": "Absolutely fit"}) == []
+    assert emphasis_patterns({"name": "Bigger back and biceps"}) == ["arms", "pull_v"]
+    assert emphasis_patterns({"name": "Increase_Biceps Size"}) == ["arms"]
+
+
+def test_candidates_respect_level_and_injuries(catalog):
+    """
+    Tests that catalog candidates never exceed the level or hit an injured body part.
+    """
+    knee = BODY_PART_BITS["knee"]
+    squats = catalog.candidates("squat", max_difficulty=1, injuries=knee)
+    assert squats
+    assert all(e.difficulty <= 1 and not e.contraindications & knee for e in squats)
+    assert catalog.candidates("squat", 1, knee) is squats  # cached
+
+
+@pytest.mark.parametrize("goal, level, expected_sessions", [
+    ({"action": "lose"}, "beginner", {"Full Body A", "Full Body B", "Cardio and Core", "Rest and Mobility"}),
+    ({"action": "gain"}, "advanced", {"Push", "Pull", "Legs", "Rest and Mobility"}),
+    ({"action": "improve"}, "intermediate", {"Upper Body", "Lower Body", "Cardio and Core", "Full Body A",
+                                             "Rest and Mobility"}),
+])
+def test_compose_balanced_week(catalog, goal, level, expected_sessions):
+    """
+    Tests that each goal and level gets its split with every slot filled.
+    """
+    week = WorkoutComposer(catalog).compose(goal, level)
+    assert len(week.days) == 7
+    assert {day.session for day in week.days} == expected_sessions
+    assert week.skipped == []
+    for day in week.days:
+        names = [item.exercise for item in day.items]
+        assert len(names) == len(set(names))
+
+
+def test_compose_avoids_injuries_and_adds_emphasis(catalog):
+    """
+    Tests that injured body parts are protected and goal emphasis adds arm work.
+    """
+    goal = {"name": "Increase Biceps Size", "action": "increase", "unit": "biceps_size"}
+    week = WorkoutComposer(catalog).compose(goal, "advanced", "my shoulder is sore")
+    by_name = {e.name: e for e in catalog.exercises}
+    shoulder = BODY_PART_BITS["shoulder"]
+    for day in week.days:
+        for item in day.items:
+            assert not by_name[item.exercise].contraindications & shoulder
+    strength_days = [day for day in week.days if day.session in ("Push", "Pull", "Legs")]
+    assert all(any(item.pattern == "arms" for item in day.items) for day in strength_days)
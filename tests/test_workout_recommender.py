@@ -7,7 +7,7 @@ from agents import OpenAIChatCompletionsModel, AsyncOpenAI
 @pytest.mark.asyncio
 async def test_workout_recommender_tool():
     """
-    Tests the WorkoutRecommenderTool with a sample goal.
+    Tests the model-generated WorkoutRecommenderTool path with a sample goal.
     """
     # Create a mock for the AsyncOpenAI client
     mock_openai_client = AsyncMock()
@@ -24,7 +24,7 @@ async def test_workout_recommender_tool():
 """
     mock_model.chat.return_value = mock_response
 
-    tool = WorkoutRecommenderTool()
+    tool = WorkoutRecommenderTool(local=False)
     goal = {
         "action": "lose",
         "quantity": 5,
@@ -39,3 +39,23 @@ async def test_workout_recommender_tool():
     assert isinstance(result["workout_plan"], list)
     assert len(result["workout_plan"]) > 0
     mock_model.chat.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_workout_recommender_tool_local_plan():
+    """
+    Tests that the WorkoutRecommenderTool composes a week from the catalog without a model call,
+    leaving out exercises that are unsafe for the user's injury.
+    """
+    mock_model = MagicMock()
+    tool = WorkoutRecommenderTool()
+    goal = {"name": "Weight Loss", "action": "lose", "quantity": 5, "unit": "kg"}
+
+    result = await tool.run(mock_model, "intermediate", goal, injury_notes="I hurt my knee running")
+
+    assert result["ok"] is True
+    assert result["source"] == "catalog"
+    assert result["avoided"] == ["knee"]
+    assert len(result["workout_plan"]) == 7
+    assert not any("Jogging" in day or "lunge" in day.lower() for day in result["workout_plan"])
+    assert mock_model.method_calls == []
@@ -0,0 +1,125 @@
+import threading
+import time
+
+from context import LeanSessionContext
+from storage.session_cache import SessionCache
+from storage.session_store import load_session_context
+from storage.write_pipeline import SessionWriter
+
+
+def test_writer_coalesces_updates_per_uid(tmp_path):
+    """
+    Tests that updates queued before a batch is written collapse to the latest snapshot.
+    """
+    session_dir = str(tmp_path)
+    writer = SessionWriter(session_dir)
+    for name in ("one", "two", "three"):
+        writer.submit("a", LeanSessionContext(uid="a", name=name))
+    writer.submit("b", LeanSessionContext(uid="b", name="B"))
+    assert load_session_context("a", session_dir).name == "Guest"
+
+    assert writer.flush()
+    assert load_session_context("a", session_dir).name == "three"
+    assert load_session_context("b", session_dir).name == "B"
+    stats = writer.stats()
+    assert (stats["submitted"], stats["coalesced"], stats["written"], stats["batches"]) == (4, 2, 2, 1)
+    assert stats["depth"] == 0
+
+
+def test_writer_thread_flushes_on_close(tmp_path):
+    """
+    Tests that the background writer persists everything submitted before close returns.
+    """
+    session_dir = str(tmp_path)
+    writer = SessionWriter(session_dir, batch_interval=10).start()
+    for i in range(20):
+        writer.submit(f"s{i}", LeanSessionContext(uid=f"s{i}", name=str(i)))
+    writer.close()
+    assert all(load_session_context(f"s{i}", session_dir).name == str(i) for i in range(20))
+    assert writer.stats()["write_ms_p99"] > 0
+
+
+def test_writer_thread_coalesces_a_burst_within_the_batch_interval(tmp_path):
+    """
+    Tests that submits spread over less than batch_interval are written as one batch.
+    """
+    writer = SessionWriter(str(tmp_path), batch_interval=0.2, fsync=False).start()
+    for i in range(10):
+        writer.submit(f"s{i}", LeanSessionContext(uid=f"s{i}"))
+        time.sleep(0.01)
+    assert writer.flush(timeout=2)
+    writer.close()
+    assert writer.stats()["written"] == 10
+    assert writer.stats()["batches"] == 1
+
+
+def test_writer_applies_backpressure(tmp_path):
+    """
+    Tests that submit blocks while the queue is full and resumes once a batch is taken.
+    """
+    writer = SessionWriter(str(tmp_path), batch_interval=0.2, max_pending=2, fsync=False).start()
+    writer.submit("a", LeanSessionContext(uid="a"))
+    writer.submit("b", LeanSessionContext(uid="b"))
+    done = threading.Event()
+    blocked = threading.Thread(target=lambda: (writer.submit("c", LeanSessionContext(uid="c")), done.set()))
+    blocked.start()
+    assert not done.wait(0.05)
+    assert done.wait(2)
+    writer.close()
+    assert writer.stats()["backpressure_waits"] == 1
+    assert writer.stats()["written"] == 3
+
+
+def test_session_cache_with_writer(tmp_path):
+    """
+    Tests that a cache backed by a writer persists puts without a journal.
+    """
+    session_dir = str(tmp_path)
+    cache = SessionCache(session_dir=session_dir, writer=SessionWriter(session_dir)).start()
+    ctx = cache.get("a")
+    ctx.name = "Sam"
+    cache.put("a", ctx)
+    assert cache.flush() == 1
+    assert load_session_context("a", session_dir).name == "Sam"
+    assert cache.stats()["writer_written"] == 1
+    cache.close()
+
+
+def _unwritable_dir(tmp_path):
+    # A file where the session directory should be; permissions would not stop a root test run.
+    session_dir = tmp_path / "sessions"
+    session_dir.write_text("")
+    return str(session_dir)
+
+
+def test_failed_writes_back_off_and_give_up(tmp_path):
+    """
+    Tests that a failing batch is retried with backoff and dropped to the dead letter after max_attempts.
+    """
+    writer = SessionWriter(str(tmp_path), batch_interval=0.01, max_attempts=3, retry_backoff=0.05)
+    writer.session_dir = _unwritable_dir(tmp_path)
+    writer.start()
+    started = time.monotonic()
+    writer.submit("a", LeanSessionContext(uid="a"))
+    while writer.stats()["dropped"] == 0 and time.monotonic() - started < 5:
+        time.sleep(0.01)
+    stats = writer.stats()
+    assert (stats["errors"], stats["dropped"], stats["depth"]) == (3, 1, 0)
+    assert time.monotonic() - started >= 0.05 + 0.1  # Two backoffs, the second twice the first.
+    assert set(writer.dead_letter) == {"a"}
+    writer.close()
+
+
+def test_close_and_flush_return_after_one_failed_attempt(tmp_path):
+    """
+    Tests that close and an untimed flush make one attempt and return instead of waiting on a failing disk.
+    """
+    writer = SessionWriter(str(tmp_path), batch_interval=10, max_attempts=100)
+    writer.session_dir = _unwritable_dir(tmp_path)
+    writer.start()
+    writer.submit("a", LeanSessionContext(uid="a"))
+    assert writer.flush() is False
+    started = time.monotonic()
+    writer.close()
+    assert time.monotonic() - started < 1
+    assert writer.stats()["errors"] == 2 and set(writer.dead_letter) == {"a"}
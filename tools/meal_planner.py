@@ -1,36 +1,126 @@
 #tool
 #meal_planner.py
-from typing import Any, Dict
-from agents import OpenAIChatCompletionsModel
+from typing import Any, Dict, Optional
+from agents import OpenAIChatCompletionsModel, ModelSettings
+from llm.tracing import ModelTracing
+from nutrition.energy import DailyTargets, UserStats, describe_goal, targets_for_goal
+from nutrition.food_db import FoodDatabase, parse_diet_preferences
+from nutrition.meal_solver import MealPlan, MealPlanSolver, NoMatchingFoods
+from planning.plan_units import meal_inputs, meal_units_from_plan, update_meal_units
 
 
 class MealPlannerTool:
     """
     A tool for generating a 7-day meal plan based on user preferences and goals.
+
+    Plans are assembled locally from the bundled food database; the model is only
+    asked to write the plan when the diet rules out every food for some meal, or
+    to phrase a local plan when `phrase=True`.
     """
     name = "MealPlannerTool"
 
+    def __init__(self, food_db: Optional[FoodDatabase] = None, local: bool = True):
+        self.local = local
+        self._food_db = food_db
+        self._solver: Optional[MealPlanSolver] = None
+
+    @property
+    def solver(self) -> MealPlanSolver:
+        if self._solver is None:
+            self._solver = MealPlanSolver(self._food_db)
+        return self._solver
+
     async def run(
         self,
         model: OpenAIChatCompletionsModel,
         diet_preferences: str,
         parsed_goal: Dict,
+        phrase: bool = False,
+        user_stats: Optional[UserStats] = None,
+        previous_units: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
-        Generates a 7-day meal plan using the Gemini model.
+        Generates a 7-day meal plan.
 
         Args:
-            model: The Gemini model to use for generating the meal plan.
+            model: The Gemini model, used only for the fallback and for phrasing.
             diet_preferences: The user's dietary preferences.
             parsed_goal: A dictionary containing the user's parsed goal.
+            phrase: Ask the model for a short friendly summary of the local plan.
+            user_stats: Body measurements for the calorie targets; population defaults if omitted.
+            previous_units: The stored plan units (`ctx.plan_units["meal"]`). When given, only the
+                days that no longer fit the new goal or diet are regenerated.
 
         Returns:
-            A dictionary containing the 7-day meal plan.
+            A dictionary containing the 7-day meal plan and, for local plans, the
+            daily targets, per-day totals, the plan units to store and, when
+            `previous_units` was given, the diff against the previous plan.
         """
+        targets = targets_for_goal(parsed_goal, user_stats)
+        if self.local:
+            diet = parse_diet_preferences(diet_preferences)
+            diff = None
+            try:
+                if previous_units and previous_units.get("days"):
+                    units, plan, diff = update_meal_units(previous_units, targets, diet, self.solver)
+                else:
+                    plan = self.solver.solve(targets, diet)
+                    units = meal_units_from_plan(plan, meal_inputs(targets, diet))
+            except NoMatchingFoods as e:
+                print(f"Falling back to a model-generated meal plan: {e}")
+            else:
+                result = {
+                    "ok": True,
+                    "meal_plan": plan.to_meal_plan(),
+                    "targets": plan.targets.to_dict(),
+                    "daily_calories": [round(float(c)) for c in plan.daily_totals()[:, 0]],
+                    "plan_units": units,
+                    "source": "food_db",
+                }
+                if diff is not None:
+                    result["diff"] = diff.to_dict()
+                if phrase and model is not None:
+                    summary = await self._phrase_plan(model, plan, diet_preferences)
+                    if summary:
+                        result["summary"] = summary
+                return result
+
+        return await self._generate_with_model(model, diet_preferences, parsed_goal, targets)
+
+    async def _phrase_plan(self, model: OpenAIChatCompletionsModel, plan: MealPlan, diet_preferences: str) -> str:
+        """Asks the model for a short introduction to a plan that is already computed."""
+        day_one = "\n".join(plan.to_meal_plan()["day_1"])
+        try:
+            response_obj = await model.get_response(
+                system_instructions="You are a professional nutritionist. Introduce the meal plan in at most 3 sentences.",
+                input=(
+                    f"Diet: {diet_preferences or 'no restrictions'}. "
+                    f"Daily targets: {plan.targets.compact()}.\n"
+                    f"Day 1:\n{day_one}"
+                ),
+                model_settings=ModelSettings(temperature=0.7),
+                tools=[],
+                output_schema=None,
+                handoffs=[],
+                tracing=ModelTracing.DISABLED,
+            )
+            return response_obj.output[0].content[0].text.strip()
+        except (IndexError, AttributeError) as e:
+            print(f"Error phrasing meal plan: {e}")
+            return ""
+
+    async def _generate_with_model(
+        self,
+        model: OpenAIChatCompletionsModel,
+        diet_preferences: str,
+        parsed_goal: Dict,
+        targets: DailyTargets,
+    ) -> Dict[str, Any]:
         prompt = f"""
         Generate a 7-day meal plan for a user with the following preferences and goals:
         - Diet: {diet_preferences}
-        - Goal: {parsed_goal['action']} {parsed_goal['quantity']} {parsed_goal['unit']} in {parsed_goal['duration_value']} {parsed_goal['duration_unit']}
+        - Goal: {describe_goal(parsed_goal)}
+        - Daily targets: {targets.compact()}
 
         The meal plan should include breakfast, lunch, dinner, and a snack for each day.
         Please provide the output in a structured format, with each day as a key (e.g., "day_1", "day_2", etc.) and the meals as a list of strings.
@@ -55,4 +145,4 @@ class MealPlannerTool:
             elif line and current_day:
                 meal_plan[current_day].append(line)
 
-        return {"ok": True, "meal_plan": meal_plan}
\ No newline at end of file
+        return {"ok": True, "meal_plan": meal_plan}
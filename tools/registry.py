@@ -0,0 +1,53 @@
+#tool
+#registry.py
+import importlib
+from typing import Any, Dict, Iterator, MutableMapping
+
+# Tool name -> "module:ClassName". Modules are imported only when the tool is first used.
+DEFAULT_TOOLS = {
+    "goal_analyzer": "tools.goal_analyzer:GoalAnalyzerTool",
+    "meal_planner": "tools.meal_planner:MealPlannerTool",
+    "workout_recommender": "tools.workout_recommender:WorkoutRecommenderTool",
+    "scheduler": "tools.scheduler:CheckinSchedulerTool",
+    "tracker": "tools.tracker:ProgressTrackerTool",
+}
+
+
+class ToolRegistry(MutableMapping):
+    """
+    A dict-like registry that imports and instantiates each tool on first access.
+
+    Assigning an instance (e.g. a mock in tests) replaces the lazy entry.
+    """
+
+    def __init__(self, specs: Dict[str, str] = None):
+        self._specs = dict(DEFAULT_TOOLS if specs is None else specs)
+        self._instances: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        tool = self._instances.get(name)
+        if tool is None:
+            if name not in self._specs:
+                raise KeyError(name)
+            module_name, class_name = self._specs[name].split(":")
+            tool = getattr(importlib.import_module(module_name), class_name)()
+            self._instances[name] = tool
+        return tool
+
+    def __setitem__(self, name: str, tool: Any) -> None:
+        self._instances[name] = tool
+
+    def __delitem__(self, name: str) -> None:
+        found = self._instances.pop(name, None) is not None
+        found = self._specs.pop(name, None) is not None or found
+        if not found:
+            raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter({**self._specs, **self._instances})
+
+    def __len__(self) -> int:
+        return len(set(self._specs) | set(self._instances))
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
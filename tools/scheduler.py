@@ -1,16 +1,34 @@
 #tool
 #scheduler.py
+import os
 from typing import Dict, Optional
+
+from scheduling.engine import CADENCES, CheckinScheduler
+from scheduling.timer_store import TimerStore
+
+CHECKIN_DB_PATH = os.getenv("CHECKIN_DB_PATH", "checkins.db")
+
+
 class CheckinSchedulerTool:
     """
     A tool for scheduling check-ins with the user.
     """
     name = "CheckinSchedulerTool"
 
+    def __init__(self, scheduler: Optional[CheckinScheduler] = None):
+        # The default engine is opened on first use so constructing the tool stays cheap.
+        self._scheduler = scheduler
+
+    @property
+    def scheduler(self) -> CheckinScheduler:
+        if self._scheduler is None:
+            self._scheduler = CheckinScheduler(TimerStore(CHECKIN_DB_PATH))
+        return self._scheduler
+
     async def run(
         self,
         level: str,
-        uid: Optional[int] = None,
+        uid: Optional[str] = None,
         cadence: str = 'weekly'
     ) -> Dict:
         """
@@ -18,12 +36,23 @@ class CheckinSchedulerTool:
 
         Args:
             level: The user's fitness level.
-            uid: The user's ID (optional).
+            uid: The user's session ID. Required to persist the check-in.
             cadence: The desired check-in cadence ('daily', 'weekly', 'monthly').
 
         Returns:
             A dictionary indicating the result of the scheduling operation.
         """
-        # In a real-world scenario, this tool would interact with a calendar or scheduling service.
-        # For now, it just returns a confirmation.
-        return {"ok": True, "scheduled": True, "cadence": cadence, "level": level}
\ No newline at end of file
+        if cadence not in CADENCES:
+            return {"ok": False, "error": f"Unsupported cadence '{cadence}'. Choose daily, weekly or monthly."}
+        if uid is None:
+            return {"ok": False, "error": "A user ID is required to schedule a check-in."}
+
+        next_checkin = self.scheduler.schedule(str(uid), cadence=cadence, level=level)
+        return {
+            "ok": True,
+            "scheduled": True,
+            "uid": str(uid),
+            "cadence": cadence,
+            "level": level,
+            "next_checkin": next_checkin,
+        }
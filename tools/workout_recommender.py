@@ -59,40 +59,114 @@
 #             "workout_plan": clean_text   # <-- Return a STRING, not a list
 #         }
 # workout_recommender.py
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from agents import OpenAIChatCompletionsModel
 from agents.run import ModelSettings
-from agents import ModelTracing
+from llm.tracing import ModelTracing
+from nutrition.energy import describe_goal
+from planning.plan_units import update_workout_units
+from training.exercise_catalog import ExerciseCatalog
+from training.workout_composer import WorkoutComposer, WorkoutWeek
 
 
 class WorkoutRecommenderTool:
     """
     A tool for recommending a workout plan based on the user's goal and fitness level.
+
+    Plans are composed locally from the exercise catalog, honouring injury notes;
+    the model is only asked for a free-form explanation when `explain=True`.
     """
     name = "WorkoutRecommenderTool"
 
+    def __init__(self, catalog: Optional[ExerciseCatalog] = None, local: bool = True):
+        self.local = local
+        self._catalog = catalog
+        self._composer: Optional[WorkoutComposer] = None
+
+    @property
+    def composer(self) -> WorkoutComposer:
+        if self._composer is None:
+            self._composer = WorkoutComposer(self._catalog)
+        return self._composer
+
     async def run(
         self,
         model: OpenAIChatCompletionsModel,
         level: str,
         goal: Dict[str, Any],
+        injury_notes: Optional[str] = None,
+        explain: bool = False,
+        previous_units: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Recommends a workout plan based on the user's goal and fitness level.
 
         Args:
-            model: The Gemini model to use for generating the workout plan.
+            model: The Gemini model, used for explanations and when local composition is disabled.
             level: The user's fitness level ('beginner', 'intermediate', or 'advanced').
             goal: A dictionary containing the user's parsed goal.
+            injury_notes: The user's injury notes; unsafe exercises are left out.
+            explain: Ask the model to explain the composed plan in a few sentences.
+            previous_units: The stored plan units (`ctx.plan_units["workout"]`). When given, only the
+                days affected by the changed goal, level or injuries are regenerated.
 
         Returns:
-            A dictionary containing the recommended workout plan.
+            A dictionary containing the recommended workout plan, the plan units to store and,
+            when `previous_units` was given, the diff against the previous plan.
         """
+        if not self.local:
+            return await self._generate_with_model(model, level, goal)
 
+        spec = self.composer.spec(goal, level, injury_notes)
+        # With no stored units every day counts as changed, which composes the whole week.
+        units, week, diff = update_workout_units(previous_units or {"inputs": {}, "days": []}, spec, self.composer)
+        result = {
+            "ok": True,
+            "workout_plan": week.to_workout_plan(),
+            "plan_units": units,
+            "source": "catalog",
+        }
+        if previous_units and previous_units.get("days"):
+            result["diff"] = diff.to_dict()
+        if week.injuries:
+            result["avoided"] = sorted(week.injuries)
+        if explain and model is not None:
+            explanation = await self._explain_plan(model, week, goal)
+            if explanation:
+                result["explanation"] = explanation
+        return result
+
+    async def _explain_plan(self, model: OpenAIChatCompletionsModel, week: WorkoutWeek, goal: Dict[str, Any]) -> str:
+        """Asks the model why the composed week suits the goal."""
+        avoided = ", ".join(sorted(week.injuries)) or "none"
+        try:
+            response_obj = await model.get_response(
+                system_instructions="You are a professional fitness coach. Explain the plan's structure in at most 4 sentences.",
+                input=(
+                    f"Goal: {describe_goal(goal)}. Injuries to protect: {avoided}.\n"
+                    + "\n".join(week.to_workout_plan())
+                ),
+                model_settings=ModelSettings(),
+                tools=[],
+                output_schema=None,
+                handoffs=[],
+                tracing=ModelTracing.DISABLED,
+            )
+            return response_obj.output[0].content[0].text.strip()
+        except (IndexError, AttributeError) as e:
+            print(f"Error explaining workout plan: {e}")
+            return ""
+
+    async def _generate_with_model(
+        self,
+        model: OpenAIChatCompletionsModel,
+        level: str,
+        goal: Dict[str, Any],
+    ) -> Dict[str, Any]:
         prompt = f"""
 Generate a 7-day workout plan for a user with the following fitness level and goals:
 - Fitness Level: {level}
-- Goal: {goal.get("action", "")} {goal.get("quantity", "")} {goal.get("unit", "")} in {goal.get("duration_value", "")} {goal.get("duration_unit", "")}
+- Goal: {describe_goal(goal)}
 
 The workout plan should be tailored to the user's fitness level and goals.
 Provide the output as a list of lines (one workout per day).
@@ -0,0 +1,178 @@
+# training/exercise_catalog.py
+"""
+Local exercise catalog used to compose workout plans without a model call.
+
+Each exercise carries a movement pattern, the muscles it trains, its equipment,
+a difficulty from 1 (beginner) to 3 (advanced) and the body parts it is unsafe
+for. Exercises are indexed by pattern, sorted by difficulty, and contraindications
+are bitmasks so an injury filter is a single AND per exercise.
+"""
+import csv
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DEFAULT_EXERCISES_CSV = os.path.join(DATA_DIR, "exercises.csv")
+
+PATTERNS = (
+    "squat", "hinge", "lunge", "push_h", "push_v", "pull_h", "pull_v",
+    "arms", "calves", "core", "cardio", "mobility",
+)
+LEVELS = {"beginner": 1, "intermediate": 2, "advanced": 3}
+BODY_PARTS = ("knee", "lower_back", "shoulder", "wrist", "elbow", "ankle", "hip", "neck", "hamstrings")
+BODY_PART_BITS = {part: 1 << i for i, part in enumerate(BODY_PARTS)}
+
+# Words near a plain "back" that make it the body part rather than "came back from vacation".
+_HURT = (r"(?:pain\w*|hurt\w*|aches?|aching|achy|injur\w*|strain\w*|sprain\w*|spasms?|sore\w*|tweak\w*"
+         r"|pulled|stiff|threw out|thrown out)")
+# Words in free-text injury notes that point at a body part.
+_INJURY_PATTERNS = {
+    "knee": r"\b(?:knees?|acl|mcl|menisc\w*|patell\w*)\b",
+    "lower_back": (rf"\b(?:lower back|spine|spinal|discs?|sciatica|lumbar)\b"
+                   rf"|\b{_HURT}\s+(?:\w+\s+){{0,2}}back\b|\bback\s+(?:\w+\s+){{0,2}}{_HURT}"),
+    "shoulder": r"\b(?:shoulders?|rotator|cuff)\b",
+    "wrist": r"\b(?:wrists?|carpal)\b",
+    "elbow": r"\belbows?\b",
+    "ankle": r"\b(?:ankles?|achilles|foot|feet|shin splints?)\b",
+    "hip": r"\b(?:hips?|groin)\b",
+    "neck": r"\bneck\b",
+    "hamstrings": r"\bhamstrings?\b",
+}
+_INJURY_RES = {part: re.compile(pattern) for part, pattern in _INJURY_PATTERNS.items()}
+# Injury messages that name no known body part ("I broke my collarbone") are kept as written, the most recent few.
+MAX_FREE_INJURY_NOTES = 3
+MAX_FREE_INJURY_NOTE_CHARS = 160
+
+
+@dataclass(frozen=True)
+class Exercise:
+    name: str
+    pattern: str
+    muscles: Tuple[str, ...]
+    equipment: str
+    difficulty: int
+    contraindications: int
+
+
+def parse_injuries(notes: Optional[str]) -> FrozenSet[str]:
+    """Body parts mentioned in `ctx.injury_notes`, e.g. "sprained my left ankle" -> {"ankle"}."""
+    if not notes:
+        return frozenset()
+    lowered = notes.lower()
+    return frozenset(part for part, pattern in _INJURY_RES.items() if pattern.search(lowered))
+
+
+def format_injuries(parts: Iterable[str]) -> Optional[str]:
+    """The form kept in `ctx.injury_notes`: body parts only, e.g. {"lower_back", "knee"} -> "knee, lower back"."""
+    # Spaces rather than underscores, so `parse_injuries` reads the notes back to the same parts.
+    return ", ".join(sorted(part.replace("_", " ") for part in parts)) or None
+
+
+def merge_injury_notes(notes: Optional[str], message: str) -> Optional[str]:
+    """
+    `ctx.injury_notes` after an injury message, e.g. "knee, lower back; I broke my collarbone".
+
+    Body parts found in the notes or the message come first, in `format_injuries` form. They are
+    followed by the messages that named none, deduplicated and bounded, so an injury the patterns
+    do not know is never dropped. Notes stored before this format are read the same way.
+    """
+    free: Dict[str, str] = {}
+    for note in (notes or "").split(";") + [message.replace(";", ",")]:
+        note = " ".join(note.split())[:MAX_FREE_INJURY_NOTE_CHARS]
+        if note and not parse_injuries(note):
+            free.pop(note.lower(), None)
+            free[note.lower()] = note
+    kept = list(free.values())[-MAX_FREE_INJURY_NOTES:]
+    parts = format_injuries(parse_injuries(notes) | parse_injuries(message))
+    return "; ".join(([parts] if parts else []) + kept) or None
+
+
+def injury_mask(parts: Iterable[str]) -> int:
+    mask = 0
+    for part in parts:
+        mask |= BODY_PART_BITS[part]
+    return mask
+
+
+def level_value(level: Optional[str]) -> int:
+    return LEVELS.get((level or "beginner").lower(), 1)
+
+
+def _split(value: str) -> Tuple[str, ...]:
+    return tuple(item.strip() for item in value.split("|") if item.strip())
+
+
+class ExerciseCatalog:
+    """Exercises indexed by movement pattern and sorted by difficulty within each pattern."""
+
+    def __init__(self, exercises: List[Exercise]):
+        self.exercises = exercises
+        self._by_pattern: Dict[str, List[Exercise]] = {pattern: [] for pattern in PATTERNS}
+        for exercise in sorted(exercises, key=lambda e: (e.difficulty, e.name)):
+            self._by_pattern[exercise.pattern].append(exercise)
+        # Cache of filtered candidate lists; the key space is small (pattern x level x injuries x equipment).
+        self._candidates: Dict[tuple, List[Exercise]] = {}
+
+    @classmethod
+    def load(cls, csv_path: str = DEFAULT_EXERCISES_CSV) -> "ExerciseCatalog":
+        exercises = []
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["pattern"] not in PATTERNS:
+                    raise ValueError(f"Unknown movement pattern {row['pattern']!r} for {row['name']!r}")
+                exercises.append(Exercise(
+                    name=row["name"],
+                    pattern=row["pattern"],
+                    muscles=_split(row["muscles"]),
+                    equipment=row["equipment"],
+                    difficulty=int(row["difficulty"]),
+                    contraindications=injury_mask(_split(row["contraindications"])),
+                ))
+        return cls(exercises)
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def candidates(
+        self,
+        pattern: str,
+        max_difficulty: int = 3,
+        injuries: int = 0,
+        equipment: Optional[FrozenSet[str]] = None,
+    ) -> List[Exercise]:
+        """
+        Exercises for a pattern that suit the level and avoid the injured body parts.
+
+        Args:
+            pattern: Movement pattern, one of PATTERNS.
+            max_difficulty: Highest difficulty allowed (1 beginner to 3 advanced).
+            injuries: Bitmask of injured body parts (see `injury_mask`).
+            equipment: Allowed equipment, or None for any.
+
+        Returns:
+            Matching exercises, hardest first, so the most level-appropriate option leads.
+        """
+        key = (pattern, max_difficulty, injuries, equipment)
+        cached = self._candidates.get(key)
+        if cached is None:
+            cached = [
+                exercise for exercise in reversed(self._by_pattern[pattern])
+                if exercise.difficulty <= max_difficulty
+                and not exercise.contraindications & injuries
+                and (equipment is None or exercise.equipment in equipment)
+            ]
+            self._candidates[key] = cached
+        return cached
+
+
+_default_catalog: Optional[ExerciseCatalog] = None
+
+
+def default_catalog() -> ExerciseCatalog:
+    """The bundled catalog, loaded once per process."""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = ExerciseCatalog.load()
+    return _default_catalog
@@ -0,0 +1,214 @@
+# training/workout_composer.py
+"""
+Rule-based weekly workout composer.
+
+A goal kind and fitness level pick a 7-day split of session templates; each
+template is a list of movement patterns that is filled from the exercise
+catalog, skipping anything contraindicated by the user's injuries. Composing a
+week is a few dictionary lookups per slot, so it takes well under a millisecond.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from nutrition.energy import GAIN, LOSE, normalize_goal
+from training.exercise_catalog import (
+    ExerciseCatalog, default_catalog, injury_mask, level_value, parse_injuries,
+)
+
+SESSIONS = {
+    "full_body_a": ("Full Body A", ("squat", "push_h", "pull_h", "hinge", "core")),
+    "full_body_b": ("Full Body B", ("lunge", "push_v", "pull_v", "hinge", "core")),
+    "upper": ("Upper Body", ("push_h", "pull_h", "push_v", "pull_v", "arms", "arms")),
+    "lower": ("Lower Body", ("squat", "hinge", "lunge", "calves", "core")),
+    "push": ("Push", ("push_h", "push_v", "push_h", "arms", "core")),
+    "pull": ("Pull", ("pull_v", "pull_h", "pull_h", "arms", "core")),
+    "legs": ("Legs", ("squat", "hinge", "lunge", "calves", "core")),
+    "cardio": ("Cardio and Core", ("cardio", "core", "mobility")),
+    "rest": ("Rest and Mobility", ("mobility", "mobility")),
+}
+
+# 7-day splits by goal kind and level (1 beginner, 2 intermediate, 3 advanced).
+SPLITS = {
+    LOSE: {
+        1: ("full_body_a", "cardio", "full_body_b", "rest", "full_body_a", "cardio", "rest"),
+        2: ("full_body_a", "cardio", "full_body_b", "cardio", "full_body_a", "cardio", "rest"),
+        3: ("upper", "lower", "cardio", "upper", "lower", "cardio", "rest"),
+    },
+    GAIN: {
+        1: ("full_body_a", "rest", "full_body_b", "rest", "full_body_a", "cardio", "rest"),
+        2: ("upper", "lower", "rest", "upper", "lower", "cardio", "rest"),
+        3: ("push", "pull", "legs", "rest", "push", "pull", "legs"),
+    },
+    "default": {
+        1: ("full_body_a", "cardio", "rest", "full_body_b", "cardio", "rest", "rest"),
+        2: ("upper", "cardio", "lower", "rest", "full_body_a", "cardio", "rest"),
+        3: ("upper", "lower", "cardio", "push", "pull", "legs", "rest"),
+    },
+}
+
+# Goal words (regexes matched as whole words) that add an extra pattern to every strength session.
+EMPHASIS = {
+    r"biceps?": "arms", r"triceps?": "arms", r"arms?": "arms",
+    r"chest": "push_h", r"shoulders?": "push_v",
+    # The muscles, not "get back in shape" or "back to running".
+    r"(?<!get )(?<!getting )(?<!got )(?<!come )(?<!coming )(?<!came )back(?! (?:in|into|to|on|from)\b)": "pull_v",
+    r"abs": "core", r"core": "core", r"legs?": "squat", r"glutes?": "hinge", r"calf|calves": "calves",
+}
+_EMPHASIS_RES = [(re.compile(rf"\b(?:{word})\b"), pattern) for word, pattern in EMPHASIS.items()]
+
+# Sets x reps by goal kind, then level.
+SCHEMES = {
+    GAIN: {1: "3 x 10", 2: "4 x 8-12", 3: "4-5 x 6-10"},
+    LOSE: {1: "2 x 12", 2: "3 x 12-15", 3: "4 x 12-15"},
+    "default": {1: "2 x 10", 2: "3 x 10", 3: "3 x 8-12"},
+}
+CARDIO_MINUTES = {LOSE: {1: 25, 2: 35, 3: 45}, "default": {1: 20, 2: 30, 3: 40}}
+
+
+@dataclass
+class WorkoutItem:
+    exercise: str
+    pattern: str
+    prescription: str
+
+    def describe(self) -> str:
+        return f"{self.exercise} {self.prescription}"
+
+
+@dataclass
+class WorkoutDay:
+    day: int
+    session: str
+    items: List[WorkoutItem] = field(default_factory=list)
+
+    def describe(self) -> str:
+        if not self.items:
+            return f"Day {self.day}: {self.session}"
+        return f"Day {self.day}: {self.session} - " + ", ".join(item.describe() for item in self.items)
+
+
+@dataclass
+class WorkoutWeek:
+    days: List[WorkoutDay]
+    level: int
+    injuries: FrozenSet[str]
+    skipped: List[str] = field(default_factory=list)
+
+    def to_workout_plan(self) -> List[str]:
+        """The list-of-lines shape stored in `ctx.workout_plan`."""
+        return [day.describe() for day in self.days]
+
+
+def emphasis_patterns(goal: Optional[Dict]) -> List[str]:
+    text = " ".join(str((goal or {}).get(key) or "") for key in ("name", "unit")).lower().replace("_", " ")
+    return sorted({pattern for word, pattern in _EMPHASIS_RES if word.search(" ".join(text.split()))})
+
+
+@dataclass(frozen=True)
+class WeekSpec:
+    """Everything a week's days are derived from; two equal specs compose identical weeks."""
+    split: tuple
+    difficulty: int
+    injuries: FrozenSet[str]
+    injury_mask: int
+    scheme: str
+    cardio_minutes: int
+    emphasis: tuple
+    equipment: Optional[FrozenSet[str]] = None
+
+
+class WorkoutComposer:
+    """Builds a balanced weekly split for a goal, level and injury notes."""
+
+    def __init__(self, catalog: Optional[ExerciseCatalog] = None):
+        self.catalog = catalog or default_catalog()
+
+    @staticmethod
+    def spec(
+        goal: Optional[Dict],
+        level: str = "beginner",
+        injury_notes: Optional[str] = None,
+        equipment: Optional[FrozenSet[str]] = None,
+    ) -> WeekSpec:
+        kind = normalize_goal(goal)["kind"]
+        difficulty = level_value(level)
+        injuries = parse_injuries(injury_notes)
+        return WeekSpec(
+            split=SPLITS.get(kind, SPLITS["default"])[difficulty],
+            difficulty=difficulty,
+            injuries=injuries,
+            injury_mask=injury_mask(injuries),
+            scheme=SCHEMES.get(kind, SCHEMES["default"])[difficulty],
+            cardio_minutes=CARDIO_MINUTES.get(kind, CARDIO_MINUTES["default"])[difficulty],
+            emphasis=tuple(emphasis_patterns(goal)),
+            equipment=equipment,
+        )
+
+    def compose(
+        self,
+        goal: Optional[Dict],
+        level: str = "beginner",
+        injury_notes: Optional[str] = None,
+        equipment: Optional[FrozenSet[str]] = None,
+    ) -> WorkoutWeek:
+        """
+        Composes a 7-day workout plan.
+
+        Args:
+            goal: Parsed goal dict from `GoalAnalyzerTool`.
+            level: 'beginner', 'intermediate' or 'advanced'.
+            injury_notes: Free-text injury notes; exercises unsafe for the mentioned body parts are left out.
+            equipment: Allowed equipment, or None for any.
+
+        Returns:
+            The composed week, including patterns that had to be skipped because of injuries.
+        """
+        spec = self.spec(goal, level, injury_notes, equipment)
+        days, skipped = [], []
+        for day_number in range(1, len(spec.split) + 1):
+            day, missing = self.compose_day(spec, day_number)
+            days.append(day)
+            skipped.extend(f"day {day_number} {pattern}" for pattern in missing)
+        return WorkoutWeek(days=days, level=spec.difficulty, injuries=spec.injuries, skipped=skipped)
+
+    def compose_day(self, spec: WeekSpec, day_number: int) -> Tuple[WorkoutDay, List[str]]:
+        """
+        Composes one day of the week. Days do not depend on each other, so a single
+        day can be regenerated without touching the rest of the plan.
+
+        Returns:
+            The day and the patterns that had no safe exercise.
+        """
+        session_key = spec.split[day_number - 1]
+        title, patterns = SESSIONS[session_key]
+        if session_key not in ("cardio", "rest"):
+            patterns = patterns + spec.emphasis
+        day = WorkoutDay(day=day_number, session=title)
+        chosen, missing = set(), []
+        for pattern in patterns:
+            options = [
+                exercise
+                for exercise in self.catalog.candidates(pattern, spec.difficulty, spec.injury_mask, spec.equipment)
+                if exercise.name not in chosen
+            ]
+            if not options:
+                missing.append(pattern)
+                continue
+            # Rotate through the few most level-appropriate options by day so repeated sessions vary.
+            exercise = options[day_number % min(len(options), 3)]
+            chosen.add(exercise.name)
+            day.items.append(WorkoutItem(
+                exercise.name, pattern, self._prescription(pattern, spec.scheme, spec.cardio_minutes)
+            ))
+        return day, missing
+
+    @staticmethod
+    def _prescription(pattern: str, scheme: str, minutes: int) -> str:
+        if pattern == "cardio":
+            return f"{minutes} min"
+        if pattern == "mobility":
+            return "5 min"
+        if pattern == "core":
+            return "3 x 30-45 s"
+        return scheme